@@ -42,7 +42,7 @@ with the following modifications:
 """
 
 
-from typing import Iterable, List, Optional, Tuple
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 from btclib.alias import Octets, String
 from btclib.bech32 import decode, encode
@@ -62,10 +62,42 @@ def has_segwit_prefix(addr: String) -> bool:
     return any(str_addr.startswith(net.hrp + "1") for net in NETWORKS.values())
 
 
+def _bytes_to_5bit(data: bytes) -> List[int]:
+    "Direct 8-to-5 bit conversion, with padding."
+    nbits = len(data) * 8
+    pad_bits = -nbits % 5
+    acc = int.from_bytes(data, byteorder="big", signed=False) << pad_bits
+    shift = nbits + pad_bits
+    return [(acc >> s) & 31 for s in range(shift - 5, -5, -5)]
+
+
+def _5bit_to_bytes(data: Sequence[int]) -> List[int]:
+    "Direct 5-to-8 bit conversion, without padding."
+    acc = 0
+    for value in data:
+        if value < 0 or value > 31:
+            raise BTClibValueError(f"invalid value: {value}")
+        acc = acc << 5 | value
+    nbits = len(data) * 5
+    pad_bits = nbits % 8
+    if pad_bits >= 5:
+        raise BTClibValueError("zero padding of more than 4 bits in 5-to-8 conversion")
+    if acc & ((1 << pad_bits) - 1):
+        raise BTClibValueError("non-zero padding in 5-to-8 conversion")
+    return list((acc >> pad_bits).to_bytes(nbits // 8, byteorder="big", signed=False))
+
+
 def power_of_2_base_conversion(
     data: Iterable[int], from_bits: int, to_bits: int, pad: bool = True
 ) -> List[int]:
     "Convert a power-of-two digit sequence to another power-of-two base."
+
+    # direct conversions for the bech32 cases, without bit-by-bit accumulation
+    if from_bits == 8 and to_bits == 5 and pad and isinstance(data, (bytes, bytearray)):
+        return _bytes_to_5bit(data)
+    if from_bits == 5 and to_bits == 8 and not pad and isinstance(data, Sequence):
+        return _5bit_to_bytes(data)
+
     acc = 0
     bits = 0
     ret = []
@@ -129,6 +161,15 @@ def address_from_witness(
     return _address_from_witness(wit_ver, wit_prg, hrp)
 
 
+def address_from_witness_many(
+    witnesses: Iterable[Tuple[int, Octets]], network: str = "mainnet"
+) -> List[str]:
+    "Encode many bech32 native SegWit addresses from (version, program) pairs."
+
+    hrp = NETWORKS[network].hrp
+    return [_address_from_witness(ver, prg, hrp) for ver, prg in witnesses]
+
+
 def witness_from_address(b32addr: String) -> Tuple[int, bytes, str]:
     """Return the witness from a bech32 native SegWit address.
 
@@ -157,6 +198,17 @@ def witness_from_address(b32addr: String) -> Tuple[int, bytes, str]:
     return wit_ver, wit_prog, network
 
 
+def witness_from_address_many(
+    b32addrs: Iterable[String],
+) -> List[Tuple[int, bytes, str]]:
+    """Return the witnesses from many bech32 native SegWit addresses.
+
+    The returned data structures are: version, program, network.
+    """
+
+    return [witness_from_address(b32addr) for b32addr in b32addrs]
+
+
 # 1.+2. = 3. bech32 address from pub_key/script_pub_key
 
 
@@ -34,27 +34,58 @@ https://github.com/keis/base58, with the following modifications:
 * interface mimics the native python3 base64 interface, i.e.
   it supports encoding bytes-like objects to ASCII bytes,
   and decoding ASCII bytes-like objects or ASCII strings to bytes.
+* table-driven decoding and limb-based (58^10) integer conversion
+* added b58encode_many and b58decode_many batch functions
 """
 
-from typing import Optional
+from typing import Iterable, List, Optional
 
 from btclib.alias import Octets, String
-from btclib.exceptions import BTClibValueError
+from btclib.exceptions import BTClibTypeError, BTClibValueError
 from btclib.hashes import hash256
 from btclib.utils import bytes_from_octets
 
 _ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
 __BASE = len(_ALPHABET)
 
+# 256-entry decoding table: -1 marks characters not in the alphabet
+_DECODE_TABLE = [-1] * 256
+for _i, _char in enumerate(_ALPHABET):
+    _DECODE_TABLE[_char] = _i
+
+# integers are processed in limbs of _LIMB_SIZE base58 digits:
+# this reduces the number of (expensive) big-int divmod/multiplications
+_LIMB_SIZE = 10
+_LIMB_BASE = __BASE**_LIMB_SIZE
+# all the 58*58 two-digit encodings
+_PAIRS = [bytes((a, b)) for a in _ALPHABET for b in _ALPHABET]
+_PAIR_BASE = __BASE * __BASE
+
+
+def _b58encode_limb(limb: int) -> bytes:
+    "Return the fixed size (_LIMB_SIZE digits) base58 encoding of a limb."
+    digits = []
+    for _ in range(_LIMB_SIZE // 2):
+        limb, idx = divmod(limb, _PAIR_BASE)
+        digits.append(_PAIRS[idx])
+    return b"".join(reversed(digits))
+
 
 def _b58encode_from_int(i: int) -> bytes:
 
-    result = b""
-    while i or len(result) == 0:
+    # less significant limbs first
+    limbs = []
+    while i >= _LIMB_BASE:
+        i, limb = divmod(i, _LIMB_BASE)
+        limbs.append(_b58encode_limb(limb))
+    # most significant limb, without leading zeros
+    result = bytearray()
+    while i or not result:
         i, idx = divmod(i, __BASE)
-        result = _ALPHABET[idx : idx + 1] + result
-
-    return result
+        result.append(_ALPHABET[idx])
+    result.reverse()
+    limbs.append(bytes(result))
+    return b"".join(reversed(limbs))
 
 
 def _b58encode(v: bytes) -> bytes:
@@ -82,18 +113,41 @@ def b58encode(v: Octets, in_size: Optional[int] = None) -> bytes:
     return _b58encode(v + h256[:4])
 
 
+def b58encode_many(vs: Iterable[Octets], in_size: Optional[int] = None) -> List[bytes]:
+    """Encode many bytes-like objects using Base58Check."""
+
+    return [b58encode(v, in_size) for v in vs]
+
+
 def _b58decode_to_int(v: bytes) -> int:
 
+    # characters are assumed to be valid
+    table = _DECODE_TABLE
     i = 0
-    for char in v:
-        i *= __BASE
-        i += _ALPHABET.index(char)
+    vlen = len(v)
+    # the first limb absorbs the remainder
+    start = vlen % _LIMB_SIZE or _LIMB_SIZE
+    for char in v[:start]:
+        i = i * __BASE + table[char]
+    for end in range(start + _LIMB_SIZE, vlen + 1, _LIMB_SIZE):
+        limb = 0
+        for char in v[end - _LIMB_SIZE : end]:
+            limb = limb * __BASE + table[char]
+        i = i * _LIMB_BASE + limb
     return i
 
 
 def _b58decode(v: bytes) -> bytes:
 
-    if any(x not in _ALPHABET for x in v):
+    # any bytes-like object (e.g. memoryview)
+    if not isinstance(v, bytes):
+        try:
+            v = bytes(memoryview(v))
+        except TypeError as e:
+            err_msg = f"not a bytes-like object: {type(v).__name__}"
+            raise BTClibTypeError(err_msg) from e
+    # delete all valid characters: anything left is invalid
+    if v.translate(None, _ALPHABET):
         msg = "Base58 string contains invalid characters"
         raise BTClibValueError(msg)
 
@@ -141,3 +195,12 @@ def b58decode(v: String, out_size: Optional[int] = None) -> bytes:
     err_msg = "valid checksum, invalid decoded size: "
     err_msg += f"{len(result)} bytes instead of {out_size}"
     raise BTClibValueError(err_msg)
+
+
+def b58decode_many(vs: Iterable[String], out_size: Optional[int] = None) -> List[bytes]:
+    """Decode many Base58Check encoded bytes-like objects or ASCII strings.
+
+    Optionally, it also ensures required output size.
+    """
+
+    return [b58decode(v, out_size) for v in vs]
@@ -43,28 +43,73 @@ with the following modifications:
 * interface mimics the native python3 base64 interface, i.e.
   it supports encoding bytes-like objects to ASCII bytes,
   and decoding ASCII bytes-like objects or ASCII strings to bytes.
+* table-driven polymod, processing two symbols at a time,
+  with cached HRP polymod states
 """
 
 
-from typing import Iterable, List, Optional, Tuple
+import functools
+from typing import List, Optional, Sequence, Tuple
 
 from btclib.alias import String
 from btclib.exceptions import BTClibValueError
 
 _ALPHABET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_ALPHABET_SET = frozenset(_ALPHABET)
+_DECODE_TABLE = {char: i for i, char in enumerate(_ALPHABET)}
 _BECH32_1_CONST = 1
 _BECH32_M_CONST = 0x2BC830A3
 
+_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
 
-def _polymod(values: Iterable[int]) -> int:
-    "Internal function that computes the bech32 checksum."
-    generator = [0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3]
-    chk = 1
-    for value in values:
-        top = chk >> 25
-        chk = (chk & 0x1FFFFFF) << 5 ^ value
+
+def _generator_table() -> List[int]:
+    "Return the XOR of the generators selected by each 5-bit top value."
+    table = []
+    for top in range(32):
+        g = 0
         for i in range(5):
-            chk ^= generator[i] if ((top >> i) & 1) else 0
+            if (top >> i) & 1:
+                g ^= _GENERATOR[i]
+        table.append(g)
+    return table
+
+
+# one symbol (5 bits) at a time
+_GEN_TABLE_5 = _generator_table()
+
+
+def _pair_table() -> List[int]:
+    """Return the polymod contribution of the top 10 bits.
+
+    Being polymod linear over GF(2), two consecutive steps
+    can be merged: the contribution of the top two 5-bit groups
+    only depends on them and can be tabulated.
+    """
+    table = []
+    for top in range(1024):
+        g1 = _GEN_TABLE_5[top >> 5]
+        table.append((g1 & 0x1FFFFFF) << 5 ^ _GEN_TABLE_5[(top & 31) ^ (g1 >> 25)])
+    return table
+
+
+# two symbols (10 bits) at a time
+_GEN_TABLE_10 = _pair_table()
+
+
+def _polymod(values: Sequence[int], chk: int = 1) -> int:
+    """Internal function that computes the bech32 checksum.
+
+    The optional chk argument is the polymod state
+    to start from, e.g. the one after processing the HRP.
+    """
+    table = _GEN_TABLE_10
+    n = len(values) - len(values) % 2
+    for i in range(0, n, 2):
+        pair = values[i] << 5 | values[i + 1]
+        chk = (chk & 0xFFFFF) << 10 ^ pair ^ table[chk >> 20]
+    if n != len(values):
+        chk = (chk & 0x1FFFFFF) << 5 ^ values[n] ^ _GEN_TABLE_5[chk >> 25]
     return chk
 
 
@@ -73,10 +118,15 @@ def _hrp_expand(hrp: str) -> List[int]:
     return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
 
 
+@functools.lru_cache()
+def _hrp_polymod(hrp: str) -> int:
+    "Return the (cached) polymod state after processing the expanded HRP."
+    return _polymod(_hrp_expand(hrp))
+
+
 def _create_checksum(hrp: str, data: List[int], m: int) -> List[int]:
     "Compute the checksum values given HRP and data."
-    values = _hrp_expand(hrp) + data
-    polymod = _polymod(values + [0, 0, 0, 0, 0, 0]) ^ m
+    polymod = _polymod(data + [0, 0, 0, 0, 0, 0], _hrp_polymod(hrp)) ^ m
     return [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
 
 
@@ -89,7 +139,7 @@ def _m_from_wit_ver(data: List[int]) -> int:
 
 def _verify_checksum(hrp: str, data: List[int], m: int) -> bool:
     "Verify a checksum given HRP and converted data characters."
-    return _polymod(_hrp_expand(hrp) + data) == m
+    return _polymod(data, _hrp_polymod(hrp)) == m
 
 
 def _decode(bech: String) -> Tuple[str, List[int], List[int]]:
@@ -121,11 +171,11 @@ def _decode(bech: String) -> Tuple[str, List[int], List[int]]:
     bech = bech.lower()
     hrp = bech[:pos]
 
-    if any(x not in _ALPHABET for x in bech[-6:]):
+    if not _ALPHABET_SET.issuperset(bech[-6:]):
         raise BTClibValueError(f"invalid character in checksum: {bech}")
-    if any(x not in _ALPHABET for x in bech[pos + 1 :]):
+    if not _ALPHABET_SET.issuperset(bech[pos + 1 :]):
         raise BTClibValueError(f"invalid data character: {bech}")
-    data = [_ALPHABET.find(x) for x in bech[pos + 1 :]]
+    data = [_DECODE_TABLE[x] for x in bech[pos + 1 :]]
 
     return hrp, data[:-6], data[-6:]
 
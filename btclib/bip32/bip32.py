@@ -41,6 +41,7 @@ from btclib import base58
 from btclib.alias import INF, BinaryData, Octets, Point, String
 from btclib.bip32.der_path import BIP32DerPath, indexes_from_bip32_path
 from btclib.ecc.curve import mult, secp256k1
+from btclib.ecc.point import CurvePoint
 from btclib.ecc.sec_point import bytes_from_point, point_from_octets
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import hash160
@@ -357,8 +358,11 @@ def __ckd(xkey: _ExtendedBIP32KeyData, index: int) -> None:
         ).digest()
         xkey.chain_code = hmac_[32:]
         offset = int.from_bytes(hmac_[:32], byteorder="big", signed=False)
-        xkey.pub_key_point = ec.add(xkey.pub_key_point, mult(offset))
-        xkey.key = bytes_from_point(xkey.pub_key_point)
+        # lazy-normalized points: a single modular inversion is needed
+        Q = CurvePoint(xkey.pub_key_point, ec, check_validity=False)
+        Q = Q + offset * CurvePoint.generator(ec)
+        xkey.key = Q.to_bytes()
+        xkey.pub_key_point = Q.aff
         xkey.prv_key_int = 0
 
 
@@ -28,6 +28,7 @@ from btclib.ecc.curve_group import _double_mult, _mult
 from btclib.ecc.der import Sig
 from btclib.ecc.number_theory import mod_inv
 from btclib.ecc.rfc6979 import _rfc6979_
+from btclib.ecc.sig_cache import get_sig_cache
 from btclib.exceptions import BTClibRuntimeError, BTClibValueError
 from btclib.hashes import challenge_, reduce_to_hlen
 from btclib.to_prv_key import PrvKey, int_from_prv_key
@@ -219,7 +220,18 @@ def verify_(
     lower_s: bool = True,
     hf: HashF = sha256,
 ) -> bool:
-    """ECDSA signature verification (SEC 1 v.2 section 4.1.4)."""
+    """ECDSA signature verification (SEC 1 v.2 section 4.1.4).
+
+    Successful verifications are remembered
+    by the process-wide signature cache, if any (see set_sig_cache).
+    """
+
+    sig_cache = get_sig_cache()
+    if sig_cache is not None:
+        algorithm = f"ecdsa{'_lower_s' if lower_s else ''}_{hf().name}"
+        entry = sig_cache.entry(algorithm, msg_hash, key, sig)
+        if entry in sig_cache:
+            return True
 
     # all kind of Exceptions are catched because
     # verify must always return a bool
@@ -227,8 +239,10 @@ def verify_(
         assert_as_valid_(msg_hash, key, sig, lower_s, hf)
     except Exception:  # pylint: disable=broad-except
         return False
-    else:
-        return True
+
+    if sig_cache is not None:
+        sig_cache.add(entry)
+    return True
 
 
 def verify(
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Lazy-normalized elliptic curve point with operator arithmetic.
+
+CurvePoint keeps Jacobian coordinates internally,
+so that chained operations (e.g. P + t*G) do not pay
+a modular inversion at each step:
+affine coordinates (and the SEC bytes representation)
+are computed only when requested, and then cached.
+
+The point also remembers if it has already been checked
+to be on the curve: the check is performed at most once
+and never for points resulting from arithmetic on checked points.
+
+The usual tuple based functions (e.g. btclib.ecc.curve.mult)
+are still available and unaffected.
+"""
+
+from typing import Iterator, Optional, Union
+
+from btclib.alias import INF, INFJ, Integer, JacPoint, Octets, Point
+from btclib.ecc.curve import Curve, secp256k1
+from btclib.ecc.curve_group import _double_mult, _mult, jac_from_aff
+from btclib.ecc.number_theory import mod_inv
+from btclib.ecc.sec_point import point_from_octets
+from btclib.exceptions import BTClibTypeError, BTClibValueError
+from btclib.utils import int_from_integer
+
+
+class CurvePoint:
+    """Elliptic curve point in lazily normalized Jacobian coordinates."""
+
+    __slots__ = ("ec", "_jac", "_aff", "_checked")
+
+    def __init__(
+        self, Q: Point = INF, ec: Curve = secp256k1, check_validity: bool = True
+    ) -> None:
+        if len(Q) != 2:
+            raise BTClibValueError("point must be a tuple[int, int]")
+        self.ec = ec
+        self._aff: Optional[Point] = (Q[0], Q[1])
+        self._jac: JacPoint = jac_from_aff(self._aff)
+        self._checked = False
+        if check_validity:
+            self.assert_valid()
+
+    @classmethod
+    def _from_jac(cls, QJ: JacPoint, ec: Curve) -> "CurvePoint":
+        # trusted constructor: QJ is assumed to be on curve
+        point = cls.__new__(cls)
+        point.ec = ec
+        point._jac = QJ
+        point._aff = None
+        point._checked = True
+        return point
+
+    @classmethod
+    def generator(cls, ec: Curve = secp256k1) -> "CurvePoint":
+        "Return the curve generator G."
+        return cls._from_jac(ec.GJ, ec)
+
+    @classmethod
+    def infinity(cls, ec: Curve = secp256k1) -> "CurvePoint":
+        "Return the infinity point."
+        return cls._from_jac(INFJ, ec)
+
+    @classmethod
+    def from_x(cls, x: int, ec: Curve = secp256k1) -> "CurvePoint":
+        "Return the point with the given x-coordinate and even y-coordinate."
+        # y_even already checks x validity
+        point = cls._from_jac((x, ec.y_even(x), 1), ec)
+        point._aff = x, point._jac[1]
+        return point
+
+    @classmethod
+    def from_octets(cls, pub_key: Octets, ec: Curve = secp256k1) -> "CurvePoint":
+        "Return the point from its SEC compressed/uncompressed representation."
+        point = cls(point_from_octets(pub_key, ec), ec, check_validity=False)
+        # point_from_octets has already checked it
+        point._checked = True
+        return point
+
+    def assert_valid(self) -> None:
+        "Raise if the point is not on the curve (checked at most once)."
+        if not self._checked:
+            # _aff is always available for points not yet checked
+            self.ec.require_on_curve(self._aff)  # type: ignore
+            self._checked = True
+
+    @property
+    def jac(self) -> JacPoint:
+        "Return the (not normalized) Jacobian coordinates."
+        return self._jac
+
+    @property
+    def aff(self) -> Point:
+        "Return the affine coordinates, normalizing only once."
+        if self._aff is None:
+            X, Y, Z = self._jac
+            if Z == 0:  # Infinity point in Jacobian coordinates
+                self._aff = INF
+            else:
+                # a single modular inversion
+                p = self.ec.p
+                Z_inv = mod_inv(Z, p)
+                Z_inv2 = Z_inv * Z_inv
+                self._aff = X * Z_inv2 % p, Y * Z_inv2 * Z_inv % p
+        return self._aff
+
+    @property
+    def x(self) -> int:
+        if self._jac[2] == 0:
+            raise BTClibValueError("INF has no x-coordinate")
+        return self.aff[0]
+
+    @property
+    def y(self) -> int:
+        if self._jac[2] == 0:
+            raise BTClibValueError("INF has no y-coordinate")
+        return self.aff[1]
+
+    @property
+    def is_infinity(self) -> bool:
+        return self._jac[2] == 0
+
+    def to_bytes(self, compressed: bool = True) -> bytes:
+        """Return the point as compressed/uncompressed octet sequence.
+
+        See SEC 1 v.2, section 2.3.3.
+        """
+        self.assert_valid()
+        if self._jac[2] == 0:
+            raise BTClibValueError("no bytes representation for infinity point")
+        x, y = self.aff
+        x_bytes = x.to_bytes(self.ec.p_size, byteorder="big", signed=False)
+        if compressed:
+            return (b"\x03" if y & 1 else b"\x02") + x_bytes
+        return b"\x04" + x_bytes + y.to_bytes(self.ec.p_size, "big", signed=False)
+
+    def _jac_from_other(self, other: Union["CurvePoint", Point]) -> JacPoint:
+        if isinstance(other, CurvePoint):
+            if other.ec != self.ec:
+                raise BTClibValueError("points on different curves")
+            other.assert_valid()
+            return other._jac
+        if isinstance(other, tuple):
+            self.ec.require_on_curve(other)
+            return jac_from_aff(other)
+        raise BTClibTypeError(f"not a point: {other!r}")
+
+    def __add__(self, other: Union["CurvePoint", Point]) -> "CurvePoint":
+        self.assert_valid()
+        RJ = self.ec.add_jac(self._jac, self._jac_from_other(other))
+        return CurvePoint._from_jac(RJ, self.ec)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "CurvePoint":
+        self.assert_valid()
+        neg = CurvePoint._from_jac(self.ec.negate_jac(self._jac), self.ec)
+        if self._aff is not None:
+            neg._aff = self.ec.negate(self._aff)
+        return neg
+
+    def __sub__(self, other: Union["CurvePoint", Point]) -> "CurvePoint":
+        self.assert_valid()
+        OJ = self.ec.negate_jac(self._jac_from_other(other))
+        return CurvePoint._from_jac(self.ec.add_jac(self._jac, OJ), self.ec)
+
+    def __rsub__(self, other: Point) -> "CurvePoint":
+        return -self + other
+
+    def __mul__(self, m: Integer) -> "CurvePoint":
+        if not isinstance(m, (int, bytes, str)) or isinstance(m, bool):
+            return NotImplemented
+        self.assert_valid()
+        m = int_from_integer(m) % self.ec.n
+        return CurvePoint._from_jac(_mult(m, self._jac, self.ec), self.ec)
+
+    __rmul__ = __mul__
+
+    def double_mult(
+        self, u: Integer, v: Integer, Q: Union["CurvePoint", Point]
+    ) -> "CurvePoint":
+        "Return u*self + v*Q using a single Shamir-Strauss loop."
+        self.assert_valid()
+        QJ = self._jac_from_other(Q)
+        u = int_from_integer(u) % self.ec.n
+        v = int_from_integer(v) % self.ec.n
+        RJ = _double_mult(u, self._jac, v, QJ, self.ec)
+        return CurvePoint._from_jac(RJ, self.ec)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CurvePoint):
+            return self.ec == other.ec and self.ec.jac_equality(self._jac, other._jac)
+        if isinstance(other, tuple) and len(other) == 2:
+            if self._jac[2] == 0:
+                return other[1] == 0
+            return self.aff == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.aff)
+
+    # sequence protocol: a CurvePoint can be used as an affine Point tuple
+
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, i: int) -> int:
+        return self.aff[i]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.aff)
+
+    def __repr__(self) -> str:
+        if self._jac[2] == 0:
+            return "CurvePoint(INF)"
+        return f"CurvePoint({hex(self.aff[0])}, {hex(self.aff[1])})"
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bounded, salted cache of successful signature verifications.
+
+Re-validating the same transactions (mempool then block, reorgs, re-scans)
+repeats identical signature verifications:
+a SigCache remembers the successful ones,
+so that they are not repeated.
+
+Only a salted 32 bytes hash of each (algorithm, message hash,
+public key, signature) successful check is stored:
+the salt, randomly generated for each cache,
+prevents an attacker from crafting colliding entries.
+Failed verifications are never cached.
+
+When full, the least recently used entry ("lru" eviction)
+or a random entry ("random" eviction, cheaper bookkeeping) is evicted.
+
+dsa.verify_ and ssa.verify_ (and the block validation pipeline)
+consult the process-wide cache installed with set_sig_cache, if any.
+"""
+
+import random
+import secrets
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from btclib.exceptions import BTClibValueError
+
+_EVICTIONS = ("lru", "random")
+
+
+class SigCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _as_bytes(obj: Any) -> bytes:
+    "Return an unambiguous byte encoding of a verification input."
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return b"b" + bytes(obj)
+    if isinstance(obj, str):
+        return b"s" + obj.encode()
+    return b"r" + repr(obj).encode()
+
+
+class SigCache:
+    """Bounded, salted, thread safe cache of successful verifications.
+
+    Each entry costs a 32 bytes digest (plus the container overhead):
+    maxsize bounds the number of entries, i.e. the memory footprint.
+    """
+
+    def __init__(self, maxsize: int = 100_000, eviction: str = "lru") -> None:
+        if maxsize < 1:
+            raise BTClibValueError(f"invalid cache size: {maxsize}")
+        if eviction not in _EVICTIONS:
+            raise BTClibValueError(f"invalid eviction policy: {eviction}")
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self._salt = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._random = random.Random(secrets.randbits(64))
+        self._lru: "OrderedDict[bytes, None]"
+        # random eviction: entries and their position in the entry list
+        self._positions: Dict[bytes, int]
+        self._entries: List[bytes]
+        self.clear()
+
+    def clear(self) -> None:
+        "Empty the cache and reset the statistics."
+        with self._lock:
+            self._lru = OrderedDict()
+            self._positions = {}
+            self._entries = []
+            self.hits = 0
+            self.misses = 0
+
+    def cache_info(self) -> SigCacheInfo:
+        currsize = len(self._lru) + len(self._entries)
+        return SigCacheInfo(self.hits, self.misses, self.maxsize, currsize)
+
+    def entry(self, algorithm: str, msg_hash: Any, key: Any, sig: Any) -> bytes:
+        "Return the salted digest identifying a signature check."
+
+        h = sha256(self._salt)
+        for part in (algorithm, msg_hash, key, sig):
+            data = _as_bytes(part)
+            h.update(len(data).to_bytes(4, byteorder="big", signed=False))
+            h.update(data)
+        return h.digest()
+
+    def __contains__(self, entry: object) -> bool:
+        with self._lock:
+            if self.eviction == "lru":
+                found = entry in self._lru
+                if found:
+                    self._lru.move_to_end(entry)  # type: ignore
+            else:
+                found = entry in self._positions
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return found
+
+    def add(self, entry: bytes) -> None:
+        "Add the entry of a successful signature check."
+
+        with self._lock:
+            if self.eviction == "lru":
+                self._lru[entry] = None
+                self._lru.move_to_end(entry)
+                if len(self._lru) > self.maxsize:
+                    self._lru.popitem(last=False)
+                return
+            if entry in self._positions:
+                return
+            if len(self._entries) >= self.maxsize:
+                # swap a random entry with the last one, then pop it
+                i = self._random.randrange(len(self._entries))
+                evicted = self._entries[i]
+                last = self._entries.pop()
+                if evicted != last:
+                    self._entries[i] = last
+                    self._positions[last] = i
+                del self._positions[evicted]
+            self._positions[entry] = len(self._entries)
+            self._entries.append(entry)
+
+
+_SIG_CACHE: Optional[SigCache] = None
+
+
+def get_sig_cache() -> Optional[SigCache]:
+    "Return the process-wide signature cache, if any."
+    return _SIG_CACHE
+
+
+def set_sig_cache(cache: Optional[SigCache]) -> None:
+    "Install (or remove, if None) the process-wide signature cache."
+    global _SIG_CACHE  # pylint: disable=global-statement
+    _SIG_CACHE = cache
@@ -59,6 +59,7 @@ from btclib.bip32.bip32 import BIP32Key
 from btclib.ecc.curve import Curve, secp256k1
 from btclib.ecc.curve_group import _double_mult, _mult, _multi_mult
 from btclib.ecc.number_theory import mod_inv
+from btclib.ecc.sig_cache import get_sig_cache
 from btclib.exceptions import BTClibRuntimeError, BTClibTypeError, BTClibValueError
 from btclib.hashes import reduce_to_hlen, tagged_hash
 from btclib.to_prv_key import PrvKey, int_from_prv_key
@@ -307,8 +308,24 @@ def sign_(
     # private and public keys
     q, x_Q = gen_keys(prv_key, ec)
 
+    return _sign_with_keys_(msg_hash, q, x_Q, nonce, ec, hf)
+
+
+def _sign_with_keys_(
+    msg_hash: bytes,
+    q: int,
+    x_Q: int,
+    nonce: Optional[PrvKey] = None,
+    ec: Curve = secp256k1,
+    hf: HashF = sha256,
+) -> Sig:
+    # Private function for callers with an already known key-pair:
+    # (q, x_Q) must be as returned by gen_keys (i.e. q of the even y point),
+    # while msg_hash must be a hf_len bytes array; neither is checked
+
     # nonce: an integer in the range 1..n-1.
     if nonce is None:
+        hf_len = hf().digest_size
         nonce = _det_nonce_(msg_hash, q, x_Q, secrets.token_bytes(hf_len), ec, hf)
 
     nonce, x_K = gen_keys(nonce, ec)
@@ -395,7 +412,17 @@ def assert_as_valid(
 def verify_(
     msg_hash: Octets, Q: BIP340PubKey, sig: Union[Sig, Octets], hf: HashF = sha256
 ) -> bool:
-    "Verify the BIP340 signature of the provided message."
+    """Verify the BIP340 signature of the provided message.
+
+    Successful verifications are remembered
+    by the process-wide signature cache, if any (see set_sig_cache).
+    """
+
+    sig_cache = get_sig_cache()
+    if sig_cache is not None:
+        entry = sig_cache.entry(f"bip340_{hf().name}", msg_hash, Q, sig)
+        if entry in sig_cache:
+            return True
 
     # all kind of Exceptions are catched because
     # verify must always return a bool
@@ -403,8 +430,10 @@ def verify_(
         assert_as_valid_(msg_hash, Q, sig, hf)
     except Exception:  # pylint: disable=broad-except
         return False
-    else:
-        return True
+
+    if sig_cache is not None:
+        sig_cache.add(entry)
+    return True
 
 
 def verify(
@@ -13,20 +13,35 @@
 """
 
 import hashlib
-from typing import Callable, List, Tuple, Union
+from typing import Callable, Iterable, List, Tuple
 
 from btclib.alias import HashF, Octets
 from btclib.ecc.curve import Curve, secp256k1
+from btclib.merkle import merkle_root_and_mutation
+from btclib.ripemd import ripemd160 as _ripemd160_fallback
 from btclib.utils import bytes_from_octets, int_from_bits
 
 H160_Net = Tuple[bytes, str]
 
 
+def _ripemd160_hashlib(octets: bytes) -> bytes:
+    return hashlib.new("ripemd160", octets).digest()
+
+
+_ripemd160: Callable[[bytes], bytes]
+try:
+    _ripemd160_hashlib(b"")
+    _ripemd160 = _ripemd160_hashlib
+except ValueError:  # pragma: no cover
+    # OpenSSL 3 without the legacy provider does not support RIPEMD-160
+    _ripemd160 = _ripemd160_fallback
+
+
 def ripemd160(octets: Octets) -> bytes:
     "Return the RIPEMD160(*) of the input octet sequence."
 
     octets = bytes_from_octets(octets)
-    return hashlib.new("ripemd160", octets).digest()
+    return _ripemd160(octets)
 
 
 def sha256(octets: Octets) -> bytes:
@@ -42,6 +57,17 @@ def hash160(octets: Octets) -> bytes:
     return ripemd160(sha256(octets))
 
 
+def hash160_many(octets_list: Iterable[Octets]) -> List[bytes]:
+    "Return the HASH160 of each octet sequence in the input iterable."
+
+    sha256_ = hashlib.sha256
+    ripemd160_ = _ripemd160
+    return [
+        ripemd160_(sha256_(bytes_from_octets(octets)).digest())
+        for octets in octets_list
+    ]
+
+
 def hash256(octets: Octets) -> bytes:
     "Return the SHA256(SHA256(*)) of the input octet sequence."
 
@@ -81,26 +107,20 @@ def challenge_(
     return int_from_bits(msg_hash, ec.nlen) % ec.n
 
 
-def merkle_root(data: List[bytes], hf: Callable[[Union[bytes, str]], bytes]) -> bytes:
-    """Return the Merkel tree root of a list of binary hashes.
+def merkle_root(data: Iterable[bytes], hf: Callable[[bytes], bytes]) -> bytes:
+    """Return the Merkel tree root of binary data.
 
     The Merkel tree is a binary tree constructed
-    with the provided list of binary data as bottom level,
+    with the hashes of the provided binary data as bottom level,
     then recursively going up one level
     by hashing every hash value pair in the current level,
     until a single value (root) is obtained.
+
+    The input data is consumed as a stream
+    (see btclib.merkle.MerkleRootBuilder).
     """
 
-    data = [hf(item) for item in data]
-    while len(data) != 1:
-        parent_level = []
-        if len(data) % 2:
-            data.append(data[-1])
-        for i in range(0, len(data), 2):
-            parent = hf(data[i] + data[i + 1])
-            parent_level.append(parent)
-        data = parent_level[:]
-    return data[0]
+    return merkle_root_and_mutation((hf(item) for item in data), hf)[0]
 
 
 def tagged_hash(tag: bytes, m: bytes, hf: HashF = hashlib.sha256) -> bytes:
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Merkle tree functions and classes.
+
+Bitcoin Merkle trees duplicate the last hash of any level
+having an odd number of elements.
+This makes different lists of leaves (e.g. [a, b, c] and [a, b, c, c])
+share the same root: see CVE-2012-2459.
+The mutation flag reports if two identical hashes
+have been paired at any level, so that such malleated lists
+can be detected and rejected.
+
+Inclusion proofs are lists of sibling hashes from the leaf level up,
+while multiple leaves can be proved at once
+with BIP37 (merkleblock) partial Merkle trees.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Iterable, List, Sequence, Set, Tuple
+
+from btclib.exceptions import BTClibValueError
+
+HashFunc = Callable[[bytes], bytes]
+
+
+class MerkleRootBuilder:
+    """Streaming Merkle root computation.
+
+    Leaf hashes are added one at a time (e.g. txids coming off
+    a block parser): only the O(log n) pending left-siblings
+    are retained, one for each tree level.
+
+    It follows the same logic of Bitcoin Core's consensus/merkle.cpp
+    """
+
+    def __init__(self, hf: HashFunc) -> None:
+        self.hf = hf
+        self.count = 0
+        self.mutated = False
+        # the pending left-sibling hash, for each level
+        # only levels whose bit is set in count are meaningful
+        self._inner: List[bytes] = []
+
+    def add(self, leaf_hash: bytes) -> None:
+        "Add a leaf hash to the tree."
+
+        self.count += 1
+        count = self.count
+        inner = self._inner
+        hf = self.hf
+        h = leaf_hash
+        level = 0
+        # combine with the left-siblings as long as they are complete
+        while not count & (1 << level):
+            left = inner[level]
+            if left == h:
+                self.mutated = True
+            h = hf(left + h)
+            level += 1
+        if level == len(inner):
+            inner.append(h)
+        else:
+            inner[level] = h
+
+    def extend(self, leaf_hashes: Iterable[bytes]) -> None:
+        "Add all the leaf hashes of an iterable to the tree."
+        for leaf_hash in leaf_hashes:
+            self.add(leaf_hash)
+
+    def root(self) -> bytes:
+        """Return the Merkle root of the leaves added so far.
+
+        The builder is not consumed: more leaves can be added afterwards.
+        """
+
+        count = self.count
+        if count == 0:
+            raise BTClibValueError("empty Merkle tree")
+        inner = self._inner
+        hf = self.hf
+
+        # the lowest complete subtree
+        level = 0
+        while not count & (1 << level):
+            level += 1
+        h = inner[level]
+        # final sweep over the rightmost branch:
+        # pair with itself at odd levels, with the left-sibling otherwise
+        while count != 1 << level:
+            h = hf(h + h)
+            count += 1 << level
+            level += 1
+            while not count & (1 << level):
+                h = hf(inner[level] + h)
+                level += 1
+        return h
+
+
+def merkle_root_and_mutation(
+    leaf_hashes: Iterable[bytes], hf: HashFunc
+) -> Tuple[bytes, bool]:
+    """Return the Merkle root of the leaf hashes and the mutation flag.
+
+    The leaf hashes are consumed as a stream,
+    so that they do not need to be materialized as a list.
+    """
+
+    builder = MerkleRootBuilder(hf)
+    builder.extend(leaf_hashes)
+    return builder.root(), builder.mutated
+
+
+def _merkle_height(n_leaves: int) -> int:
+    "Return the height of the tree (i.e. the root level) for n leaves."
+    return (n_leaves - 1).bit_length()
+
+
+def _level_width(n_leaves: int, height: int) -> int:
+    "Return the number of nodes at a given tree height."
+    return (n_leaves + (1 << height) - 1) >> height
+
+
+class MerkleTree:
+    """Merkle tree retaining all levels, for inclusion proofs.
+
+    Each level is stored compactly as a single bytearray
+    of concatenated hashes (the duplicated hash of odd levels
+    is not stored), so that a tree over n leaves
+    takes about 2*n*hash_size bytes.
+
+    Leaves can be replaced (e.g. the coinbase transaction
+    of a block template) updating only the O(log n) ancestors.
+    """
+
+    def __init__(self, leaf_hashes: Iterable[bytes], hf: HashFunc) -> None:
+        self.hf = hf
+        self.hash_size = len(hf(b""))
+        level = bytearray()
+        for leaf_hash in leaf_hashes:
+            if len(leaf_hash) != self.hash_size:
+                err_msg = f"invalid leaf hash size: {len(leaf_hash)}"
+                err_msg += f" instead of {self.hash_size}"
+                raise BTClibValueError(err_msg)
+            level += leaf_hash
+        if not level:
+            raise BTClibValueError("empty Merkle tree")
+        self.n_leaves = len(level) // self.hash_size
+        # (height, left position) of the pairs of identical hashes
+        self._mutated_pairs: Set[Tuple[int, int]] = set()
+        self.levels: List[bytearray] = [level]
+        hs = self.hash_size
+        while len(level) != hs:
+            parent_level = bytearray()
+            last = len(level) - hs
+            for i in range(0, last, 2 * hs):
+                if level[i : i + hs] == level[i + hs : i + 2 * hs]:
+                    self._mutated_pairs.add((len(self.levels) - 1, i // hs))
+                parent_level += hf(level[i : i + 2 * hs])
+            if (len(level) // hs) % 2:
+                # odd level: pair the last hash with itself
+                parent_level += hf(level[last:] + level[last:])
+            self.levels.append(parent_level)
+            level = parent_level
+
+    @property
+    def root(self) -> bytes:
+        return bytes(self.levels[-1])
+
+    @property
+    def mutated(self) -> bool:
+        "Return True if identical hashes are paired (CVE-2012-2459)."
+        return bool(self._mutated_pairs)
+
+    def _node(self, height: int, pos: int) -> bytes:
+        hs = self.hash_size
+        return bytes(self.levels[height][pos * hs : (pos + 1) * hs])
+
+    def leaf(self, index: int) -> bytes:
+        if not 0 <= index < self.n_leaves:
+            raise BTClibValueError(f"invalid leaf index: {index}")
+        return self._node(0, index)
+
+    def proof(self, index: int) -> List[bytes]:
+        """Return the inclusion proof of the leaf at the given index.
+
+        The proof is the list of sibling hashes,
+        from the leaf level up to (excluding) the root.
+        """
+
+        if not 0 <= index < self.n_leaves:
+            raise BTClibValueError(f"invalid leaf index: {index}")
+        hs = self.hash_size
+        branch: List[bytes] = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling * hs >= len(level):  # odd level: the hash is duplicated
+                sibling = index
+            branch.append(bytes(level[sibling * hs : (sibling + 1) * hs]))
+            index >>= 1
+        return branch
+
+    def replace(self, index: int, leaf_hash: bytes) -> None:
+        "Replace a leaf hash, updating its ancestors only."
+
+        if not 0 <= index < self.n_leaves:
+            raise BTClibValueError(f"invalid leaf index: {index}")
+        hs = self.hash_size
+        if len(leaf_hash) != hs:
+            raise BTClibValueError(f"invalid leaf hash size: {len(leaf_hash)}")
+        hf = self.hf
+        self.levels[0][index * hs : (index + 1) * hs] = leaf_hash
+        for height, level in enumerate(self.levels[:-1]):
+            left = (index & ~1) * hs
+            if left + hs < len(level):
+                if level[left : left + hs] == level[left + hs : left + 2 * hs]:
+                    self._mutated_pairs.add((height, index & ~1))
+                else:
+                    self._mutated_pairs.discard((height, index & ~1))
+                h = hf(level[left : left + 2 * hs])
+            else:
+                h = hf(level[left:] + level[left:])
+            index >>= 1
+            self.levels[height + 1][index * hs : (index + 1) * hs] = h
+
+    def partial_tree(self, indexes: Iterable[int]) -> Tuple[List[bytes], bytes]:
+        """Return the partial Merkle tree proving the given leaves.
+
+        The result is the (hashes, flag bytes) pair
+        of a BIP37 merkleblock partial Merkle tree:
+        it includes the minimum number of hashes needed
+        to prove all the selected leaves at once.
+        """
+
+        selected = set(indexes)
+        for index in selected:
+            if not 0 <= index < self.n_leaves:
+                raise BTClibValueError(f"invalid leaf index: {index}")
+        matches = sorted(selected)
+        hashes: List[bytes] = []
+        bits: List[bool] = []
+
+        def traverse(height: int, pos: int) -> None:
+            # is any selected leaf below this node?
+            start = pos << height
+            end = (pos + 1) << height
+            parent_of_match = bisect_left(matches, end) > bisect_left(matches, start)
+            bits.append(parent_of_match)
+            if height == 0 or not parent_of_match:
+                hashes.append(self._node(height, pos))
+            else:
+                traverse(height - 1, pos * 2)
+                if pos * 2 + 1 < _level_width(self.n_leaves, height - 1):
+                    traverse(height - 1, pos * 2 + 1)
+
+        traverse(_merkle_height(self.n_leaves), 0)
+        return hashes, _bytes_from_bits(bits)
+
+
+def verify_proof(
+    leaf_hash: bytes, index: int, branch: Sequence[bytes], root: bytes, hf: HashFunc
+) -> bool:
+    "Return True if the inclusion proof of the leaf hash is valid."
+
+    h = leaf_hash
+    for sibling in branch:
+        h = hf(sibling + h) if index & 1 else hf(h + sibling)
+        index >>= 1
+    # the leaf index is not consistent with the branch length
+    if index:
+        return False
+    return h == root
+
+
+def _bytes_from_bits(bits: Sequence[bool]) -> bytes:
+    out = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            out[i >> 3] |= 1 << (i & 7)
+    return bytes(out)
+
+
+def extract_partial_tree(
+    n_leaves: int, hashes: Sequence[bytes], flags: bytes, hf: HashFunc
+) -> Tuple[bytes, List[Tuple[int, bytes]]]:
+    """Return the root and the (index, leaf hash) matches of a partial tree.
+
+    The partial tree is in the BIP37 merkleblock format;
+    the returned root must then be checked against the block header.
+    """
+
+    if n_leaves < 1:
+        raise BTClibValueError("empty Merkle tree")
+    if len(hashes) > n_leaves:
+        raise BTClibValueError(f"too many hashes: {len(hashes)}")
+    if len(flags) * 8 < len(hashes):
+        raise BTClibValueError("not enough flag bits")
+
+    bit_index = 0
+    hash_index = 0
+    matches: List[Tuple[int, bytes]] = []
+
+    def traverse(height: int, pos: int) -> bytes:
+        nonlocal bit_index, hash_index
+        if bit_index >= len(flags) * 8:
+            raise BTClibValueError("overflowed the flag bits")
+        parent_of_match = bool(flags[bit_index >> 3] >> (bit_index & 7) & 1)
+        bit_index += 1
+        if height == 0 or not parent_of_match:
+            if hash_index >= len(hashes):
+                raise BTClibValueError("overflowed the hash list")
+            h = hashes[hash_index]
+            hash_index += 1
+            if height == 0 and parent_of_match:
+                matches.append((pos, h))
+            return h
+        left = traverse(height - 1, pos * 2)
+        if pos * 2 + 1 < _level_width(n_leaves, height - 1):
+            right = traverse(height - 1, pos * 2 + 1)
+            # CVE-2012-2459
+            if right == left:
+                raise BTClibValueError("mutated partial Merkle tree")
+        else:
+            right = left
+        return hf(left + right)
+
+    root = traverse(_merkle_height(n_leaves), 0)
+    if hash_index != len(hashes):
+        raise BTClibValueError("not all hashes have been consumed")
+    if (bit_index + 7) // 8 != len(flags):
+        raise BTClibValueError("not all flag bits have been consumed")
+    return root, matches
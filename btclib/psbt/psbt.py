@@ -301,6 +301,8 @@ class Psbt:
     @classmethod
     def from_tx(cls: Type["Psbt"], tx: Tx, check_validity: bool = True) -> "Psbt":
 
+        # the inputs are changed in place: drop the cached identifiers
+        tx.unfreeze()
         for tx_in in tx.vin:
             tx_in.script_sig = b""
             tx_in.script_witness = Witness()
@@ -444,6 +446,8 @@ def extract_tx(psbt: Psbt, check_validity: bool = True) -> Tx:
         psbt.assert_valid()
 
     tx = psbt.tx
+    # the inputs are changed in place: drop the cached identifiers
+    tx.unfreeze()
     for tx_in, psbt_input in zip(tx.vin, psbt.inputs):
         tx_in.script_sig = psbt_input.final_script_sig
         if psbt_input.final_script_witness:
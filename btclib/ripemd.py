@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Pure Python RIPEMD-160.
+
+Fall-back implementation used by btclib.hashes.ripemd160
+when hashlib does not provide RIPEMD-160,
+as it happens with OpenSSL 3 builds that have not enabled
+the legacy provider.
+
+https://homes.esat.kuleuven.be/~bosselae/ripemd160.html
+
+The five rounds of each line are unrolled in separate loops,
+so that the boolean function is inlined,
+iterating over precomputed (message word index, rotation) pairs.
+Complete input blocks are read directly from a memoryview
+of the input: only the last (padded) block is copied.
+"""
+
+from struct import Struct
+from typing import Sequence, Tuple, Union
+
+_M = 0xFFFFFFFF
+
+_WORDS = Struct("<16I")
+_DIGEST = Struct("<5I")
+
+_H0 = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+# message word selection, left line
+_RL = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15),
+    (7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8),
+    (3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12),
+    (1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2),
+    (4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13),
+)
+# message word selection, right line
+_RR = (
+    (5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12),
+    (6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2),
+    (15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13),
+    (8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14),
+    (12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11),
+)
+# rotation amounts, left line
+_SL = (
+    (11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8),
+    (7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12),
+    (11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5),
+    (11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12),
+    (9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6),
+)
+# rotation amounts, right line
+_SR = (
+    (8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6),
+    (9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11),
+    (9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5),
+    (15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8),
+    (8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11),
+)
+
+# precomputed (word index, rotation, 32 - rotation) triplets for each round
+_L1, _L2, _L3, _L4, _L5 = (
+    tuple((r, s, 32 - s) for r, s in zip(rr, ss)) for rr, ss in zip(_RL, _SL)
+)
+_R1, _R2, _R3, _R4, _R5 = (
+    tuple((r, s, 32 - s) for r, s in zip(rr, ss)) for rr, ss in zip(_RR, _SR)
+)
+
+_KL2, _KL3, _KL4, _KL5 = 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E
+_KR1, _KR2, _KR3, _KR4 = 0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9
+
+
+def _compress(h: Sequence[int], X: Tuple[int, ...]) -> Tuple[int, ...]:
+    "Return the updated state after processing the 16 message words X."
+
+    # pylint: disable=too-many-locals
+    a, b, c, d, e = h
+    # left line
+    for r, s, t in _L1:  # f1 = x ^ y ^ z
+        a = (a + (b ^ c ^ d) + X[r]) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _L2:  # f2 = (x & y) | (~x & z)
+        a = (a + ((b & c) | ((b ^ _M) & d)) + X[r] + _KL2) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _L3:  # f3 = (x | ~y) ^ z
+        a = (a + ((b | (c ^ _M)) ^ d) + X[r] + _KL3) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _L4:  # f4 = (x & z) | (y & ~z)
+        a = (a + ((b & d) | (c & (d ^ _M))) + X[r] + _KL4) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _L5:  # f5 = x ^ (y | ~z)
+        a = (a + (b ^ (c | (d ^ _M))) + X[r] + _KL5) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    al, bl, cl, dl, el = a, b, c, d, e
+
+    # right line: same boolean functions, in reverse order
+    a, b, c, d, e = h
+    for r, s, t in _R1:
+        a = (a + (b ^ (c | (d ^ _M))) + X[r] + _KR1) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _R2:
+        a = (a + ((b & d) | (c & (d ^ _M))) + X[r] + _KR2) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _R3:
+        a = (a + ((b | (c ^ _M)) ^ d) + X[r] + _KR3) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _R4:
+        a = (a + ((b & c) | ((b ^ _M) & d)) + X[r] + _KR4) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+    for r, s, t in _R5:
+        a = (a + (b ^ c ^ d) + X[r]) & _M
+        a = (((a << s) | (a >> t)) + e) & _M
+        a, b, c, d, e = e, a, b, ((c << 10) | (c >> 22)) & _M, d
+
+    return (
+        (h[1] + cl + d) & _M,
+        (h[2] + dl + e) & _M,
+        (h[3] + el + a) & _M,
+        (h[4] + al + b) & _M,
+        (h[0] + bl + c) & _M,
+    )
+
+
+def ripemd160(data: Union[bytes, bytearray, memoryview]) -> bytes:
+    "Return the RIPEMD160 digest of the input bytes."
+
+    view = memoryview(data).cast("B")
+    n = len(view)
+    h: Sequence[int] = _H0
+    full = n - n % 64
+    for offset in range(0, full, 64):
+        h = _compress(h, _WORDS.unpack_from(view, offset))
+
+    # MD-strengthening padding: 0x80, zeros, then the bit-length (little endian)
+    tail = bytes(view[full:]) + b"\x80"
+    tail += b"\x00" * ((56 - len(tail)) % 64)
+    tail += (8 * n & 0xFFFFFFFFFFFFFFFF).to_bytes(8, byteorder="little")
+    for offset in range(0, len(tail), 64):
+        h = _compress(h, _WORDS.unpack_from(tail, offset))
+
+    return _DIGEST.pack(*h)
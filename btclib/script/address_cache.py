@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bounded bidirectional address/script_pub_key conversion cache.
+
+Wallet scanning converts the same scripts and addresses over and over:
+AddressCache memoizes
+
+- address → (script_pub_key bytes, network)
+- (script_pub_key bytes, network) → address
+- script_pub_key bytes → (script type, payload)
+
+each direction being a least recently used (LRU) mapping
+bounded to maxsize entries.
+A conversion in one direction also primes the opposite one,
+so that re-scanning the same wallet set is near-free after warm-up.
+
+Invalid addresses/scripts are never cached:
+the conversion error is raised every time.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, NamedTuple, Tuple
+
+from btclib.alias import Octets, String
+from btclib.exceptions import BTClibValueError
+from btclib.script.script_pub_key import (
+    ScriptPubKey,
+    address,
+    addresses,
+    script_pub_key_from_address,
+    type_and_payload,
+)
+from btclib.utils import bytes_from_octets
+
+
+class AddressCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class AddressCache:
+    "Bounded, network-aware, bidirectional address/script_pub_key cache."
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        if maxsize < 1:
+            raise BTClibValueError(f"invalid cache size: {maxsize}")
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._script_from_address: "OrderedDict[str, Tuple[bytes, str]]"
+        self._address_from_script: "OrderedDict[Tuple[bytes, str], str]"
+        self._type_and_payload: "OrderedDict[bytes, Tuple[str, bytes]]"
+        self.clear()
+
+    def clear(self) -> None:
+        "Empty the cache and reset the statistics."
+        with self._lock:
+            self._script_from_address = OrderedDict()
+            self._address_from_script = OrderedDict()
+            self._type_and_payload = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+    def cache_info(self) -> AddressCacheInfo:
+        currsize = len(self._script_from_address) + len(self._address_from_script)
+        currsize += len(self._type_and_payload)
+        return AddressCacheInfo(self.hits, self.misses, self.maxsize, currsize)
+
+    def _get(self, mapping: "OrderedDict[Any, Any]", key: Any) -> Any:
+        with self._lock:
+            value = mapping.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                mapping.move_to_end(key)
+            return value
+
+    def _put(self, mapping: "OrderedDict[Any, Any]", key: Any, value: Any) -> None:
+        with self._lock:
+            mapping[key] = value
+            mapping.move_to_end(key)
+            if len(mapping) > self.maxsize:
+                mapping.popitem(last=False)
+
+    def script_pub_key_from_address(self, addr: String) -> Tuple[bytes, str]:
+        "Return (script_pub_key, network) from a bech32/base58 address."
+
+        if isinstance(addr, bytes):
+            addr = addr.decode("ascii")
+        addr = addr.strip()
+        result = self._get(self._script_from_address, addr)
+        if result is None:
+            result = script_pub_key_from_address(addr)
+            self._put(self._script_from_address, addr, result)
+            # prime the opposite direction too, with the canonical address
+            # (e.g. lowercase bech32) instead of the input string
+            canonical = address(*result)
+            self._put(self._address_from_script, result, canonical)
+            if canonical != addr:
+                self._put(self._script_from_address, canonical, result)
+        return result
+
+    def address(self, script_pub_key: Octets, network: str = "mainnet") -> str:
+        "Return the bech32/base58 address from a script_pub_key."
+
+        script_pub_key = bytes_from_octets(script_pub_key)
+        key = (script_pub_key, network)
+        result = self._get(self._address_from_script, key)
+        if result is None:
+            result = address(script_pub_key, network)
+            self._put(self._address_from_script, key, result)
+            if result:
+                self._put(self._script_from_address, result, key)
+        return result
+
+    def type_and_payload(self, script_pub_key: Octets) -> Tuple[str, bytes]:
+        "Return (script_pub_key type, payload) from the input script_pub_key."
+
+        script_pub_key = bytes_from_octets(script_pub_key)
+        result = self._get(self._type_and_payload, script_pub_key)
+        if result is None:
+            result = type_and_payload(script_pub_key)
+            self._put(self._type_and_payload, script_pub_key, result)
+        return result
+
+    def script_pub_key(
+        self, addr: String, check_validity: bool = True
+    ) -> ScriptPubKey:
+        "Return the ScriptPubKey of the input bech32/base58 address."
+
+        script, network = self.script_pub_key_from_address(addr)
+        return ScriptPubKey(script, network, check_validity)
+
+    def addresses(self, script_pub_key: ScriptPubKey) -> List[str]:
+        """Return the address, if any, or the p2pkh addresses for p2ms.
+
+        Cached equivalent of the ScriptPubKey.addresses property.
+        """
+
+        script = script_pub_key.script
+        network = script_pub_key.network
+        if self.type_and_payload(script)[0] == "p2ms":
+            return addresses(script, network)
+        return [self.address(script, network)]
+
+    def script_pub_keys_from_addresses(
+        self, addrs: Iterable[String]
+    ) -> List[Tuple[bytes, str]]:
+        "Return (script_pub_key, network) for many addresses."
+        return [self.script_pub_key_from_address(addr) for addr in addrs]
+
+    def addresses_from_script_pub_keys(
+        self, script_pub_keys: Iterable[Octets], network: str = "mainnet"
+    ) -> List[str]:
+        "Return the addresses of many script_pub_keys."
+        return [self.address(script, network) for script in script_pub_keys]
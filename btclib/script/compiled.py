@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Compiled (i.e. parsed and analyzed once) immutable scripts.
+
+A CompiledScript caches the script bytes, its tokens,
+the push-only flag, the sigop counts and the template type.
+
+Standard templates dominate real data, with the same scripts
+(e.g. a wallet script_pub_key, a multisig redeem script)
+recurring over and over: compile_script interns compiled scripts
+in a bounded per-process table, so that
+each distinct script is tokenized and analyzed only once.
+"""
+
+import functools
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from btclib.alias import Octets
+from btclib.script.script import Command, Token, command_from_token, tokenize
+from btclib.script.script_pub_key import type_and_payload
+from btclib.utils import bytes_from_octets
+
+_OP_1 = 0x51
+_OP_16 = 0x60
+_OP_CODESEPARATOR = 0xAB
+_OP_CHECKSIG = 0xAC
+_OP_CHECKSIGVERIFY = 0xAD
+_OP_CHECKMULTISIG = 0xAE
+_OP_CHECKMULTISIGVERIFY = 0xAF
+# the sigops of a multisig without a preceding OP_n
+_MAX_PUBKEYS_PER_MULTISIG = 20
+
+
+def sig_op_count(tokens: Tuple[Token, ...], accurate: bool = False) -> int:
+    """Return the (legacy) sigop count of a tokenized script.
+
+    When not accurate (as for script_pub_keys and script_sigs)
+    each multisig counts as 20 sigops;
+    when accurate (as for p2sh redeem scripts)
+    the OP_n preceding the multisig opcode is used, if any.
+    """
+
+    count = 0
+    last_op = 0xFF  # OP_INVALIDOPCODE
+    for op, _, _ in tokens:
+        if op in (_OP_CHECKSIG, _OP_CHECKSIGVERIFY):
+            count += 1
+        elif op in (_OP_CHECKMULTISIG, _OP_CHECKMULTISIGVERIFY):
+            if accurate and _OP_1 <= last_op <= _OP_16:
+                count += last_op - _OP_1 + 1
+            else:
+                count += _MAX_PUBKEYS_PER_MULTISIG
+        last_op = op
+    return count
+
+
+@dataclass(frozen=True)
+class CompiledScript:
+    """Immutable script, tokenized and analyzed at construction.
+
+    An invalid (i.e. not parsable) script
+    raises BTClibValueError at construction.
+    """
+
+    script: bytes
+    tokens: Tuple[Token, ...] = field(init=False, repr=False, compare=False)
+    # only push opcodes (including OP_0, OP_1NEGATE, OP_1-OP_16)
+    is_push_only: bool = field(init=False, repr=False, compare=False)
+    sig_op_count: int = field(init=False, repr=False, compare=False)
+    accurate_sig_op_count: int = field(init=False, repr=False, compare=False)
+    # template type and payload, as from type_and_payload
+    type: str = field(init=False, repr=False, compare=False)
+    payload: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        script = bytes_from_octets(self.script)
+        tokens = tuple(tokenize(script))
+        script_type, payload = type_and_payload(script)
+        # frozen dataclass: fields must be set bypassing __setattr__
+        set_field = functools.partial(object.__setattr__, self)
+        set_field("script", script)
+        set_field("tokens", tokens)
+        set_field("is_push_only", all(op <= _OP_16 for op, _, _ in tokens))
+        set_field("sig_op_count", sig_op_count(tokens))
+        set_field("accurate_sig_op_count", sig_op_count(tokens, True))
+        set_field("type", script_type)
+        set_field("payload", payload)
+
+    @property
+    def asm(self) -> List[Command]:
+        script = self.script
+        return [command_from_token(script, token) for token in self.tokens]
+
+    @property
+    def code_separator_offsets(self) -> List[int]:
+        "Return the byte offsets of the OP_CODESEPARATORs."
+        # for non-push opcodes the token offset follows the opcode
+        return [offset - 1 for op, offset, _ in self.tokens if op == _OP_CODESEPARATOR]
+
+    def serialize(self) -> bytes:
+        return self.script
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _compile_script(script: bytes) -> CompiledScript:
+    return CompiledScript(script)
+
+
+def compile_script(script: Octets) -> CompiledScript:
+    """Return the interned CompiledScript of the input script.
+
+    Recurring scripts are compiled only once per process,
+    retaining the most recently used ones.
+    """
+
+    return _compile_script(bytes_from_octets(script))
+
+
+def intern_table_info() -> "functools._CacheInfo":
+    "Return the (hits, misses, maxsize, currsize) intern table statistics."
+    return _compile_script.cache_info()
+
+
+def clear_intern_table() -> None:
+    _compile_script.cache_clear()
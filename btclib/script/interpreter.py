@@ -0,0 +1,902 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Script interpreter.
+
+Scripts are executed as (opcode, data offset, data length) token arrays
+(see btclib.script.script.tokenize), never as string commands;
+script_pub_keys, redeem and witness scripts are interned compiled scripts
+(see btclib.script.compiled), so recurring scripts are tokenized once.
+
+The consensus rules (as of taproot activation) are enforced:
+P2SH (BIP16), strict DER signatures (BIP66),
+CHECKLOCKTIMEVERIFY (BIP65), CHECKSEQUENCEVERIFY (BIP112),
+segwit v0 (BIP141/143/147) and taproot/tapscript (BIP341/342).
+Standardness (i.e. policy) rules are not.
+
+Signature and timelock checks are delegated to a SigChecker:
+TxSigChecker checks them against a transaction input,
+computing signature hashes with a shared SigHashCache and verifying
+with dsa.verify_/ssa.verify_ (hence with the signature cache, if any);
+callers can plug in their own checker,
+e.g. to collect signatures for batch verification.
+"""
+
+import hashlib
+from typing import List, Optional, Sequence, Tuple
+
+from btclib import var_bytes, var_int
+from btclib.ecc import dsa, ssa
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash160, hash256, ripemd160, sha256, tagged_hash
+from btclib.script import sig_hash
+from btclib.script.compiled import compile_script
+from btclib.script.script import Token, _serialize_bytes_command, tokenize
+from btclib.script.taproot import check_output_pubkey
+from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+from btclib.utils import encode_num
+
+# signature versions
+BASE = 0
+WITNESS_V0 = 1
+TAPROOT = 2
+TAPSCRIPT = 3
+
+MAX_SCRIPT_ELEMENT_SIZE = 520
+MAX_OPS_PER_SCRIPT = 201
+MAX_PUBKEYS_PER_MULTISIG = 20
+MAX_SCRIPT_SIZE = 10_000
+MAX_STACK_SIZE = 1_000
+VALIDATION_WEIGHT_PER_SIGOP_PASSED = 50
+VALIDATION_WEIGHT_OFFSET = 50
+TAPSCRIPT_LEAF_VERSION = 0xC0
+# sequence and lock_time thresholds (BIP65, BIP68, BIP112)
+LOCKTIME_THRESHOLD = 500_000_000
+SEQUENCE_FINAL = 0xFFFFFFFF
+SEQUENCE_LOCKTIME_DISABLE_FLAG = 1 << 31
+SEQUENCE_LOCKTIME_TYPE_FLAG = 1 << 22
+SEQUENCE_LOCKTIME_MASK = 0x0000FFFF
+
+_OP_0 = 0x00
+_OP_PUSHDATA4 = 0x4E
+_OP_1NEGATE = 0x4F
+_OP_1 = 0x51
+_OP_16 = 0x60
+_OP_VERIF = 0x65
+_OP_VERNOTIF = 0x66
+_OP_IF = 0x63
+_OP_NOTIF = 0x64
+_OP_ELSE = 0x67
+_OP_ENDIF = 0x68
+_OP_CODESEPARATOR = 0xAB
+_OP_CHECKMULTISIG = 0xAE
+_OP_CHECKMULTISIGVERIFY = 0xAF
+
+# OP_CAT, OP_SUBSTR, OP_LEFT, OP_RIGHT, OP_INVERT, OP_AND, OP_OR, OP_XOR,
+# OP_2MUL, OP_2DIV, OP_MUL, OP_DIV, OP_MOD, OP_LSHIFT, OP_RSHIFT
+_DISABLED_OPS = frozenset(
+    [0x7E, 0x7F, 0x80, 0x81, 0x83, 0x84, 0x85, 0x86, 0x8D, 0x8E]
+    + [0x95, 0x96, 0x97, 0x98, 0x99]
+)
+# BIP342
+_OP_SUCCESSES = frozenset(
+    [0x50, 0x62, 0x7E, 0x7F, 0x80, 0x81, 0x83, 0x84, 0x85, 0x86, 0x89, 0x8A]
+    + [0x8D, 0x8E, 0x95, 0x96, 0x97, 0x98, 0x99]
+    + list(range(0xBB, 0xFF))
+)
+
+_TRUE = b"\x01"
+_FALSE = b""
+
+
+def _header_size(op: int) -> int:
+    "Return the size of the opcode and push length of a token."
+    if op == 0x4C:
+        return 2
+    if op == 0x4D:
+        return 3
+    if op == 0x4E:
+        return 5
+    return 1
+
+
+def cast_to_bool(element: bytes) -> bool:
+    "Return the boolean value of a stack element (negative zero is False)."
+    for i, byte in enumerate(element):
+        if byte:
+            # negative zero
+            return not (i == len(element) - 1 and byte == 0x80)
+    return False
+
+
+def decode_script_num(element: bytes, max_size: int = 4) -> int:
+    "Return the integer value of a stack element used as a number."
+
+    if len(element) > max_size:
+        raise BTClibValueError(f"script number overflow: {len(element)} bytes")
+    if not element:
+        return 0
+    i = int.from_bytes(element, byteorder="little", signed=False)
+    if element[-1] & 0x80:
+        return -(i & ~(0x80 << (8 * (len(element) - 1))))
+    return i
+
+
+def encode_script_num(i: int) -> bytes:
+    "Return the stack element of an integer, zero being the empty one."
+    return encode_num(i) if i else b""
+
+
+def is_valid_der_encoding(sig: bytes) -> bool:
+    "Return True if sig is a strict DER signature plus hash_type (BIP66)."
+
+    size = len(sig)
+    if size < 9 or size > 73:
+        return False
+    if sig[0] != 0x30 or sig[1] != size - 3:
+        return False
+    len_r = sig[3]
+    if 5 + len_r >= size:
+        return False
+    len_s = sig[5 + len_r]
+    if len_r + len_s + 7 != size:
+        return False
+    if sig[2] != 0x02 or len_r == 0 or sig[4] & 0x80:
+        return False
+    if len_r > 1 and sig[4] == 0 and not sig[5] & 0x80:
+        return False
+    if sig[len_r + 4] != 0x02 or len_s == 0 or sig[len_r + 6] & 0x80:
+        return False
+    return not (len_s > 1 and sig[len_r + 6] == 0 and not sig[len_r + 7] & 0x80)
+
+
+def witness_program(script: bytes) -> Optional[Tuple[int, bytes]]:
+    "Return the (version, program) of a witness program script, if it is one."
+
+    size = len(script)
+    if not 4 <= size <= 42 or script[1] != size - 2:
+        return None
+    if script[0] == _OP_0:
+        return 0, script[2:]
+    if _OP_1 <= script[0] <= _OP_16:
+        return script[0] - _OP_1 + 1, script[2:]
+    return None
+
+
+class SigChecker:
+    """Signature and timelock checks of a script execution.
+
+    This base checker fails all checks:
+    subclass it to check signatures and timelocks
+    against a transaction input (as TxSigChecker does),
+    or, for example, to collect signatures for batch verification.
+    """
+
+    def check_ecdsa(
+        self, sig: bytes, pub_key: bytes, script_code: bytes, sig_version: int
+    ) -> bool:
+        "Check an ECDSA signature (including its hash_type byte)."
+        return False
+
+    def check_schnorr(
+        self, sig: bytes, pub_key: bytes, sig_version: int, ext: bytes
+    ) -> bool:
+        "Check a BIP340 signature, ext being the BIP342 message extension."
+        return False
+
+    def check_lock_time(self, lock_time: int) -> bool:
+        return False
+
+    def check_sequence(self, sequence: int) -> bool:
+        return False
+
+
+class TxSigChecker(SigChecker):
+    "Signature and timelock checks against a transaction input."
+
+    def __init__(
+        self,
+        tx: Tx,
+        vin_i: int,
+        prevouts: Sequence[TxOut],
+        cache: Optional[sig_hash.SigHashCache] = None,
+    ) -> None:
+        self.tx = tx
+        self.vin_i = vin_i
+        self.prevouts = prevouts
+        self.cache = sig_hash.SigHashCache(tx, prevouts) if cache is None else cache
+
+    def check_ecdsa(
+        self, sig: bytes, pub_key: bytes, script_code: bytes, sig_version: int
+    ) -> bool:
+        if not sig:
+            return False
+        # uncompressed, compressed and hybrid SEC keys
+        if len(pub_key) == 65 and pub_key[0] in (0x06, 0x07):
+            if pub_key[0] & 1 != pub_key[-1] & 1:
+                return False
+            pub_key = b"\x04" + pub_key[1:]
+        elif not (
+            (len(pub_key) == 33 and pub_key[0] in (0x02, 0x03))
+            or (len(pub_key) == 65 and pub_key[0] == 0x04)
+        ):
+            return False
+        hash_type = sig[-1]
+        if sig_version == BASE:
+            msg_hash = sig_hash.legacy(script_code, self.tx, self.vin_i, hash_type)
+        else:
+            amount = self.prevouts[self.vin_i].value
+            msg_hash = sig_hash.segwit_v0(
+                script_code, self.tx, self.vin_i, hash_type, amount, self.cache
+            )
+        # low s is standardness policy, not a consensus rule
+        return dsa.verify_(msg_hash, pub_key, sig[:-1], lower_s=False)
+
+    def check_schnorr(
+        self, sig: bytes, pub_key: bytes, sig_version: int, ext: bytes
+    ) -> bool:
+        hash_type = sig_hash.DEFAULT
+        if len(sig) == 65:
+            hash_type = sig[64]
+            # DEFAULT must be implicit
+            if hash_type == sig_hash.DEFAULT:
+                return False
+        elif len(sig) != 64:
+            return False
+        ext_flag = int(sig_version == TAPSCRIPT)
+        annex_hash = self.cache.taproot_witness_hashes(self.vin_i)[0]
+        try:
+            msg_hash = sig_hash._taproot(  # pylint: disable=protected-access
+                self.cache, self.vin_i, hash_type, ext_flag, annex_hash, ext
+            )
+        except BTClibValueError:
+            return False
+        return ssa.verify_(msg_hash, pub_key, sig[:64])
+
+    def check_lock_time(self, lock_time: int) -> bool:
+        tx_lock_time = self.tx.lock_time
+        # both block heights or both timestamps
+        if (tx_lock_time < LOCKTIME_THRESHOLD) != (lock_time < LOCKTIME_THRESHOLD):
+            return False
+        if lock_time > tx_lock_time:
+            return False
+        # the lock_time is not enforced if the input is final
+        return self.tx.vin[self.vin_i].sequence != SEQUENCE_FINAL
+
+    def check_sequence(self, sequence: int) -> bool:
+        tx_sequence = self.tx.vin[self.vin_i].sequence
+        # relative lock-times are enabled since version 2 (BIP68)
+        if self.tx.version < 2 or tx_sequence & SEQUENCE_LOCKTIME_DISABLE_FLAG:
+            return False
+        mask = SEQUENCE_LOCKTIME_TYPE_FLAG | SEQUENCE_LOCKTIME_MASK
+        tx_sequence &= mask
+        sequence &= mask
+        # both block heights or both time intervals
+        if (tx_sequence < SEQUENCE_LOCKTIME_TYPE_FLAG) != (
+            sequence < SEQUENCE_LOCKTIME_TYPE_FLAG
+        ):
+            return False
+        return sequence <= tx_sequence
+
+
+class _TapscriptData:
+    "Execution data of a tapscript."
+
+    def __init__(self, tapleaf_hash: bytes, budget: int) -> None:
+        self.tapleaf_hash = tapleaf_hash
+        self.budget = budget
+        self.code_separator_pos = 0xFFFFFFFF
+
+    @property
+    def ext(self) -> bytes:
+        "Return the BIP342 signature message extension."
+        pos = self.code_separator_pos.to_bytes(4, byteorder="little", signed=False)
+        return self.tapleaf_hash + b"\x00" + pos
+
+
+def _legacy_script_code(
+    script: bytes, tokens: Sequence[Token], start: int, sigs: Sequence[bytes]
+) -> bytes:
+    """Return the legacy script code.
+
+    It is the script after the last executed OP_CODESEPARATOR,
+    without OP_CODESEPARATORs and pushes of the signatures (FindAndDelete).
+    """
+
+    patterns = {_serialize_bytes_command(sig) for sig in sigs}
+    chunks = []
+    for op, offset, length in tokens:
+        if offset < start or op == _OP_CODESEPARATOR:
+            continue
+        chunk = script[offset - _header_size(op) : offset + length]
+        if chunk not in patterns:
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _pop(stack: List[bytes], n: int = 1) -> List[bytes]:
+    if len(stack) < n:
+        raise BTClibValueError("invalid stack operation")
+    popped = stack[-n:]
+    del stack[-n:]
+    return popped
+
+
+def _check_tapscript_sig(
+    sig: bytes, pub_key: bytes, checker: SigChecker, exec_data: _TapscriptData
+) -> bool:
+    "Return True for a non-empty valid signature, False for an empty one."
+
+    if sig:
+        exec_data.budget -= VALIDATION_WEIGHT_PER_SIGOP_PASSED
+        if exec_data.budget < 0:
+            raise BTClibValueError("tapscript validation weight exceeded")
+    if not pub_key:
+        raise BTClibValueError("empty public key")
+    # unknown public key types are upgradable: their signatures succeed
+    if len(pub_key) == 32 and sig:
+        if not checker.check_schnorr(sig, pub_key, TAPSCRIPT, exec_data.ext):
+            raise BTClibValueError("invalid schnorr signature")
+    return bool(sig)
+
+
+def eval_script(
+    script: bytes,
+    tokens: Sequence[Token],
+    stack: List[bytes],
+    sig_version: int,
+    checker: SigChecker,
+    exec_data: Optional[_TapscriptData] = None,
+) -> None:
+    """Execute a tokenized script, updating the stack in place.
+
+    A BTClibValueError is raised if the execution fails.
+    """
+
+    if sig_version != TAPSCRIPT and len(script) > MAX_SCRIPT_SIZE:
+        raise BTClibValueError(f"script too long: {len(script)} bytes")
+
+    legacy_rules = sig_version != TAPSCRIPT
+    alt_stack: List[bytes] = []
+    # the conditional execution stack, with its number of False values
+    exec_stack: List[bool] = []
+    false_count = 0
+    op_count = 0
+    code_separator_offset = 0
+
+    for pos, token in enumerate(tokens):
+        op, offset, length = token
+        executing = not false_count
+
+        if op <= _OP_PUSHDATA4:
+            if length > MAX_SCRIPT_ELEMENT_SIZE:
+                raise BTClibValueError(f"push too big: {length} bytes")
+            if executing:
+                stack.append(script[offset : offset + length])
+                if len(stack) + len(alt_stack) > MAX_STACK_SIZE:
+                    raise BTClibValueError("stack size limit exceeded")
+            continue
+
+        if legacy_rules and op > _OP_16:
+            op_count += 1
+            if op_count > MAX_OPS_PER_SCRIPT:
+                raise BTClibValueError("too many operations")
+        # disabled opcodes fail even if not executed
+        if op in _DISABLED_OPS or op in (_OP_VERIF, _OP_VERNOTIF):
+            raise BTClibValueError(f"disabled opcode: {op}")
+
+        if not executing and not _OP_IF <= op <= _OP_ENDIF:
+            continue
+
+        # constants
+        if op == _OP_1NEGATE or _OP_1 <= op <= _OP_16:
+            stack.append(encode_script_num(op - _OP_1 + 1))
+
+        # stack operations, most frequent first
+        elif op == 0x76:  # OP_DUP
+            stack.append(_pop(stack)[0])
+            stack.append(stack[-1])
+        elif op in (0x87, 0x88):  # OP_EQUAL, OP_EQUALVERIFY
+            a, b = _pop(stack, 2)
+            if op == 0x88:
+                if a != b:
+                    raise BTClibValueError("OP_EQUALVERIFY failed")
+            else:
+                stack.append(_TRUE if a == b else _FALSE)
+
+        # crypto
+        elif 0xA6 <= op <= 0xAA:
+            element = _pop(stack)[0]
+            if op == 0xA6:  # OP_RIPEMD160
+                stack.append(ripemd160(element))
+            elif op == 0xA7:  # OP_SHA1
+                stack.append(hashlib.sha1(element).digest())  # nosec
+            elif op == 0xA8:  # OP_SHA256
+                stack.append(sha256(element))
+            elif op == 0xA9:  # OP_HASH160
+                stack.append(hash160(element))
+            else:  # OP_HASH256
+                stack.append(hash256(element))
+        elif op == _OP_CODESEPARATOR:
+            code_separator_offset = offset
+            if exec_data is not None:
+                exec_data.code_separator_pos = pos
+        elif op in (0xAC, 0xAD):  # OP_CHECKSIG, OP_CHECKSIGVERIFY
+            sig, pub_key = _pop(stack, 2)
+            if exec_data is not None:
+                success = _check_tapscript_sig(sig, pub_key, checker, exec_data)
+            else:
+                if sig and not is_valid_der_encoding(sig):
+                    raise BTClibValueError("non-DER signature")
+                script_code = script[code_separator_offset:]
+                if sig_version == BASE:
+                    args = (script, tokens, code_separator_offset, [sig])
+                    script_code = _legacy_script_code(*args)
+                success = checker.check_ecdsa(sig, pub_key, script_code, sig_version)
+            if op == 0xAD:
+                if not success:
+                    raise BTClibValueError("OP_CHECKSIGVERIFY failed")
+            else:
+                stack.append(_TRUE if success else _FALSE)
+        elif op == 0xBA and exec_data is not None:  # OP_CHECKSIGADD
+            sig, n, pub_key = _pop(stack, 3)
+            i = decode_script_num(n)
+            success = _check_tapscript_sig(sig, pub_key, checker, exec_data)
+            stack.append(encode_script_num(i + success))
+        elif op in (_OP_CHECKMULTISIG, _OP_CHECKMULTISIGVERIFY):
+            if exec_data is not None:
+                raise BTClibValueError("OP_CHECKMULTISIG disabled in tapscript")
+            op_count = _check_multisig(
+                script,
+                tokens,
+                stack,
+                sig_version,
+                checker,
+                code_separator_offset,
+                op_count,
+                op == _OP_CHECKMULTISIGVERIFY,
+            )
+
+        # flow control
+        elif op in (_OP_IF, _OP_NOTIF):
+            value = False
+            if executing:
+                if not stack:
+                    raise BTClibValueError("unbalanced conditional")
+                condition = stack.pop()
+                # MINIMALIF is a consensus rule for tapscript
+                if exec_data is not None and condition not in (_FALSE, _TRUE):
+                    raise BTClibValueError("minimal if")
+                value = cast_to_bool(condition) != (op == _OP_NOTIF)
+            exec_stack.append(value)
+            false_count += not value
+        elif op == _OP_ELSE:
+            if not exec_stack:
+                raise BTClibValueError("unbalanced conditional")
+            false_count += 1 if exec_stack[-1] else -1
+            exec_stack[-1] = not exec_stack[-1]
+        elif op == _OP_ENDIF:
+            if not exec_stack:
+                raise BTClibValueError("unbalanced conditional")
+            false_count -= not exec_stack.pop()
+        elif op == 0x69:  # OP_VERIFY
+            if not cast_to_bool(_pop(stack)[0]):
+                raise BTClibValueError("OP_VERIFY failed")
+        elif op == 0x6A:  # OP_RETURN
+            raise BTClibValueError("OP_RETURN")
+        elif op == 0x61 or 0xB0 <= op <= 0xB9 and op not in (0xB1, 0xB2):
+            pass  # OP_NOP, OP_NOP1, OP_NOP4-OP_NOP10
+        elif op == 0xB1:  # OP_CHECKLOCKTIMEVERIFY
+            if not stack:
+                raise BTClibValueError("invalid stack operation")
+            lock_time = decode_script_num(stack[-1], 5)
+            if lock_time < 0:
+                raise BTClibValueError("negative lock_time")
+            if not checker.check_lock_time(lock_time):
+                raise BTClibValueError("unsatisfied lock_time")
+        elif op == 0xB2:  # OP_CHECKSEQUENCEVERIFY
+            if not stack:
+                raise BTClibValueError("invalid stack operation")
+            sequence = decode_script_num(stack[-1], 5)
+            if sequence < 0:
+                raise BTClibValueError("negative sequence")
+            if not sequence & SEQUENCE_LOCKTIME_DISABLE_FLAG:
+                if not checker.check_sequence(sequence):
+                    raise BTClibValueError("unsatisfied sequence")
+
+        # other stack operations
+        elif 0x6B <= op <= 0x7D or op == 0x82:
+            _stack_op(op, stack, alt_stack)
+        # arithmetic
+        elif 0x8B <= op <= 0xA5:
+            _arithmetic_op(op, stack)
+        else:
+            raise BTClibValueError(f"bad opcode: {op}")
+
+        if len(stack) + len(alt_stack) > MAX_STACK_SIZE:
+            raise BTClibValueError("stack size limit exceeded")
+
+    if exec_stack:
+        raise BTClibValueError("unbalanced conditional")
+
+
+def _check_multisig(
+    script: bytes,
+    tokens: Sequence[Token],
+    stack: List[bytes],
+    sig_version: int,
+    checker: SigChecker,
+    code_separator_offset: int,
+    op_count: int,
+    verify: bool,
+) -> int:
+    "Execute OP_CHECKMULTISIG(VERIFY), returning the updated op count."
+
+    i = 1
+    if len(stack) < i:
+        raise BTClibValueError("invalid stack operation")
+    n_keys = decode_script_num(stack[-i])
+    if not 0 <= n_keys <= MAX_PUBKEYS_PER_MULTISIG:
+        raise BTClibValueError(f"invalid public key count: {n_keys}")
+    op_count += n_keys
+    if op_count > MAX_OPS_PER_SCRIPT:
+        raise BTClibValueError("too many operations")
+    i += 1
+    i_key = i
+    i += n_keys
+    if len(stack) < i:
+        raise BTClibValueError("invalid stack operation")
+    n_sigs = decode_script_num(stack[-i])
+    if not 0 <= n_sigs <= n_keys:
+        raise BTClibValueError(f"invalid signature count: {n_sigs}")
+    i += 1
+    i_sig = i
+    i += n_sigs
+    # the extra (dummy) element consumed because of an off-by-one bug
+    if len(stack) < i:
+        raise BTClibValueError("invalid stack operation")
+
+    sigs = [stack[-i_sig - j] for j in range(n_sigs)]
+    script_code = script[code_separator_offset:]
+    if sig_version == BASE:
+        script_code = _legacy_script_code(script, tokens, code_separator_offset, sigs)
+
+    success = True
+    while success and n_sigs > 0:
+        sig = stack[-i_sig]
+        pub_key = stack[-i_key]
+        if sig and not is_valid_der_encoding(sig):
+            raise BTClibValueError("non-DER signature")
+        if checker.check_ecdsa(sig, pub_key, script_code, sig_version):
+            i_sig += 1
+            n_sigs -= 1
+        i_key += 1
+        n_keys -= 1
+        # more signatures left than public keys
+        if n_sigs > n_keys:
+            success = False
+
+    dummy = stack[-i]
+    del stack[-i:]
+    # BIP147
+    if dummy:
+        raise BTClibValueError("non-null multisig dummy element")
+    if verify:
+        if not success:
+            raise BTClibValueError("OP_CHECKMULTISIGVERIFY failed")
+    else:
+        stack.append(_TRUE if success else _FALSE)
+    return op_count
+
+
+def _stack_op(op: int, stack: List[bytes], alt_stack: List[bytes]) -> None:
+    # pylint: disable=too-many-branches
+
+    if op == 0x6B:  # OP_TOALTSTACK
+        alt_stack.append(_pop(stack)[0])
+    elif op == 0x6C:  # OP_FROMALTSTACK
+        stack.append(_pop(alt_stack)[0])
+    elif op == 0x6D:  # OP_2DROP
+        _pop(stack, 2)
+    elif op == 0x6E:  # OP_2DUP
+        stack.extend(_pop(stack, 2) * 2)
+    elif op == 0x6F:  # OP_3DUP
+        stack.extend(_pop(stack, 3) * 2)
+    elif op == 0x70:  # OP_2OVER
+        x1, x2, x3, x4 = _pop(stack, 4)
+        stack.extend([x1, x2, x3, x4, x1, x2])
+    elif op == 0x71:  # OP_2ROT
+        x1, x2, x3, x4, x5, x6 = _pop(stack, 6)
+        stack.extend([x3, x4, x5, x6, x1, x2])
+    elif op == 0x72:  # OP_2SWAP
+        x1, x2, x3, x4 = _pop(stack, 4)
+        stack.extend([x3, x4, x1, x2])
+    elif op == 0x73:  # OP_IFDUP
+        if not stack:
+            raise BTClibValueError("invalid stack operation")
+        if cast_to_bool(stack[-1]):
+            stack.append(stack[-1])
+    elif op == 0x74:  # OP_DEPTH
+        stack.append(encode_script_num(len(stack)))
+    elif op == 0x75:  # OP_DROP
+        _pop(stack)
+    elif op == 0x77:  # OP_NIP
+        _, x2 = _pop(stack, 2)
+        stack.append(x2)
+    elif op == 0x78:  # OP_OVER
+        x1, x2 = _pop(stack, 2)
+        stack.extend([x1, x2, x1])
+    elif op in (0x79, 0x7A):  # OP_PICK, OP_ROLL
+        n = decode_script_num(_pop(stack)[0])
+        if n < 0 or n >= len(stack):
+            raise BTClibValueError("invalid stack operation")
+        element = stack[-n - 1]
+        if op == 0x7A:
+            del stack[-n - 1]
+        stack.append(element)
+    elif op == 0x7B:  # OP_ROT
+        x1, x2, x3 = _pop(stack, 3)
+        stack.extend([x2, x3, x1])
+    elif op == 0x7C:  # OP_SWAP
+        x1, x2 = _pop(stack, 2)
+        stack.extend([x2, x1])
+    elif op == 0x7D:  # OP_TUCK
+        x1, x2 = _pop(stack, 2)
+        stack.extend([x2, x1, x2])
+    elif op == 0x82:  # OP_SIZE
+        if not stack:
+            raise BTClibValueError("invalid stack operation")
+        stack.append(encode_script_num(len(stack[-1])))
+    else:
+        raise BTClibValueError(f"bad opcode: {op}")  # pragma: no cover
+
+
+def _arithmetic_op(op: int, stack: List[bytes]) -> None:
+    # pylint: disable=too-many-branches
+
+    # unary operations
+    if 0x8B <= op <= 0x92:
+        a = decode_script_num(_pop(stack)[0])
+        if op == 0x8B:  # OP_1ADD
+            result = a + 1
+        elif op == 0x8C:  # OP_1SUB
+            result = a - 1
+        elif op == 0x8F:  # OP_NEGATE
+            result = -a
+        elif op == 0x90:  # OP_ABS
+            result = abs(a)
+        elif op == 0x91:  # OP_NOT
+            result = int(a == 0)
+        else:  # OP_0NOTEQUAL
+            result = int(a != 0)
+        stack.append(encode_script_num(result))
+        return
+
+    if op == 0xA5:  # OP_WITHIN
+        x, lower, upper = [decode_script_num(e) for e in _pop(stack, 3)]
+        stack.append(_TRUE if lower <= x < upper else _FALSE)
+        return
+
+    # binary operations
+    a, b = [decode_script_num(e) for e in _pop(stack, 2)]
+    if op == 0x93:  # OP_ADD
+        result = a + b
+    elif op == 0x94:  # OP_SUB
+        result = a - b
+    elif op == 0x9A:  # OP_BOOLAND
+        result = int(a != 0 and b != 0)
+    elif op == 0x9B:  # OP_BOOLOR
+        result = int(a != 0 or b != 0)
+    elif op in (0x9C, 0x9D):  # OP_NUMEQUAL, OP_NUMEQUALVERIFY
+        result = int(a == b)
+        if op == 0x9D:
+            if not result:
+                raise BTClibValueError("OP_NUMEQUALVERIFY failed")
+            return
+    elif op == 0x9E:  # OP_NUMNOTEQUAL
+        result = int(a != b)
+    elif op == 0x9F:  # OP_LESSTHAN
+        result = int(a < b)
+    elif op == 0xA0:  # OP_GREATERTHAN
+        result = int(a > b)
+    elif op == 0xA1:  # OP_LESSTHANOREQUAL
+        result = int(a <= b)
+    elif op == 0xA2:  # OP_GREATERTHANOREQUAL
+        result = int(a >= b)
+    elif op == 0xA3:  # OP_MIN
+        result = min(a, b)
+    elif op == 0xA4:  # OP_MAX
+        result = max(a, b)
+    else:
+        raise BTClibValueError(f"bad opcode: {op}")
+    stack.append(encode_script_num(result))
+
+
+def _eval_cleanstack(
+    script: bytes,
+    tokens: Sequence[Token],
+    stack: List[bytes],
+    sig_version: int,
+    checker: SigChecker,
+    exec_data: Optional[_TapscriptData] = None,
+) -> None:
+    "Execute a witness script, requiring a single true element left."
+
+    if any(len(element) > MAX_SCRIPT_ELEMENT_SIZE for element in stack):
+        raise BTClibValueError("witness element too big")
+    eval_script(script, tokens, stack, sig_version, checker, exec_data)
+    if len(stack) != 1:
+        raise BTClibValueError("witness script did not leave a clean stack")
+    if not cast_to_bool(stack[0]):
+        raise BTClibValueError("witness script evaluated to false")
+
+
+def _verify_taproot(
+    witness: Sequence[bytes], program: bytes, checker: SigChecker
+) -> None:
+
+    stack = list(witness)
+    if not stack:
+        raise BTClibValueError("empty taproot witness")
+    if len(stack) >= 2 and stack[-1][:1] == b"\x50":
+        stack.pop()  # the annex
+
+    if len(stack) == 1:  # key path spending
+        if not checker.check_schnorr(stack[0], program, TAPROOT, b""):
+            raise BTClibValueError("invalid taproot key path signature")
+        return
+
+    control = stack.pop()
+    script = stack.pop()
+    if not 33 <= len(control) <= 33 + 32 * 128 or (len(control) - 33) % 32:
+        raise BTClibValueError(f"invalid control block size: {len(control)}")
+    if not check_output_pubkey(program, script, control):
+        raise BTClibValueError("taproot commitment mismatch")
+    leaf_version = control[0] & 0xFE
+    if leaf_version != TAPSCRIPT_LEAF_VERSION:
+        return  # unknown leaf versions are upgradable
+
+    # OP_SUCCESSx make the script succeed: check them before parsing errors,
+    # only the script framing (oversized pushes fail at execution)
+    tokens: List[Token] = []
+    for token in tokenize(script, check_push_size=False):
+        if token[0] in _OP_SUCCESSES:
+            return
+        tokens.append(token)
+    if len(stack) > MAX_STACK_SIZE:
+        raise BTClibValueError("stack size limit exceeded")
+
+    preimage = leaf_version.to_bytes(1, "big") + var_bytes.serialize(script)
+    tapleaf_hash = tagged_hash(b"TapLeaf", preimage)
+    witness_size = len(var_int.serialize(len(witness)))
+    witness_size += sum(len(var_bytes.serialize(element)) for element in witness)
+    exec_data = _TapscriptData(tapleaf_hash, witness_size + VALIDATION_WEIGHT_OFFSET)
+    _eval_cleanstack(script, tokens, stack, TAPSCRIPT, checker, exec_data)
+
+
+def _verify_witness_program(
+    witness: Sequence[bytes],
+    version: int,
+    program: bytes,
+    checker: SigChecker,
+    is_p2sh: bool,
+) -> None:
+
+    if version == 0:
+        if len(program) == 32:  # p2wsh
+            if not witness:
+                raise BTClibValueError("empty p2wsh witness")
+            script = witness[-1]
+            if sha256(script) != program:
+                raise BTClibValueError("p2wsh witness script mismatch")
+            compiled = compile_script(script)
+            stack = list(witness[:-1])
+            _eval_cleanstack(script, compiled.tokens, stack, WITNESS_V0, checker)
+        elif len(program) == 20:  # p2wpkh
+            if len(witness) != 2:
+                raise BTClibValueError("invalid p2wpkh witness")
+            script = b"\x76\xa9\x14" + program + b"\x88\xac"
+            compiled = compile_script(script)
+            stack = list(witness)
+            _eval_cleanstack(script, compiled.tokens, stack, WITNESS_V0, checker)
+        else:
+            err_msg = f"invalid witness v0 program size: {len(program)}"
+            raise BTClibValueError(err_msg)
+    elif version == 1 and len(program) == 32 and not is_p2sh:
+        _verify_taproot(witness, program, checker)
+    # other witness versions/program sizes are upgradable: they succeed
+
+
+def assert_valid_script(
+    script_sig: bytes,
+    script_pub_key: bytes,
+    witness: Sequence[bytes],
+    checker: SigChecker,
+) -> None:
+    """Execute the scripts spending a prevout.
+
+    A BTClibValueError is raised if the spending is not valid.
+    """
+
+    script_sig_tokens = tuple(tokenize(script_sig))
+    compiled = compile_script(script_pub_key)
+    is_p2sh = compiled.type == "p2sh"
+    if is_p2sh and not all(op <= _OP_16 for op, _, _ in script_sig_tokens):
+        raise BTClibValueError("p2sh script_sig is not push only")
+
+    stack: List[bytes] = []
+    eval_script(script_sig, script_sig_tokens, stack, BASE, checker)
+    p2sh_stack = list(stack)
+    eval_script(script_pub_key, compiled.tokens, stack, BASE, checker)
+    if not stack or not cast_to_bool(stack[-1]):
+        raise BTClibValueError("script evaluated to false")
+
+    has_witness = False
+    program = witness_program(script_pub_key)
+    if program is not None:
+        has_witness = True
+        if script_sig:
+            raise BTClibValueError("non-empty script_sig for witness program")
+        _verify_witness_program(witness, *program, checker, False)
+
+    if is_p2sh:
+        # script_sig is push only, so its stack is not empty
+        redeem_script = p2sh_stack.pop()
+        redeem = compile_script(redeem_script)
+        eval_script(redeem_script, redeem.tokens, p2sh_stack, BASE, checker)
+        if not p2sh_stack or not cast_to_bool(p2sh_stack[-1]):
+            raise BTClibValueError("redeem script evaluated to false")
+        program = witness_program(redeem_script)
+        if program is not None:
+            has_witness = True
+            if script_sig != _serialize_bytes_command(redeem_script):
+                raise BTClibValueError("p2sh witness script_sig is not canonical")
+            _verify_witness_program(witness, *program, checker, True)
+
+    if witness and not has_witness:
+        raise BTClibValueError("unexpected witness")
+
+
+def assert_valid_input(
+    prevouts: Sequence[TxOut],
+    tx: Tx,
+    vin_i: int,
+    cache: Optional[sig_hash.SigHashCache] = None,
+    checker: Optional[SigChecker] = None,
+) -> None:
+    """Execute the scripts of a transaction input.
+
+    When validating many inputs of the same transaction,
+    pass a SigHashCache(tx, prevouts) shared among them.
+    A BTClibValueError is raised if the input is not valid.
+    """
+
+    tx_in = tx.vin[vin_i]
+    if checker is None:
+        checker = TxSigChecker(tx, vin_i, prevouts, cache)
+    script_pub_key = prevouts[vin_i].script_pub_key.script
+    stack = tx_in.script_witness.stack
+    assert_valid_script(tx_in.script_sig, script_pub_key, stack, checker)
+
+
+def verify_input(
+    prevouts: Sequence[TxOut],
+    tx: Tx,
+    vin_i: int,
+    cache: Optional[sig_hash.SigHashCache] = None,
+) -> bool:
+    "Return True if the scripts of the transaction input are valid."
+
+    try:
+        assert_valid_input(prevouts, tx, vin_i, cache)
+    except BTClibValueError:
+        return False
+    return True
@@ -19,7 +19,7 @@ Scripts are represented by List[Command], where Command = Union[int, str, bytes]
 """
 
 from dataclasses import dataclass
-from typing import List, Sequence, Union
+from typing import Iterator, List, Sequence, Tuple, Union
 from warnings import warn
 
 from btclib.alias import BinaryData, Octets
@@ -314,55 +314,81 @@ def serialize(script: Sequence[Command]) -> bytes:
     return b"".join(r)
 
 
-def parse(stream: BinaryData, exit_on_op_success: bool = False) -> List[Command]:
+# (opcode, data offset, data length)
+# for non-push opcodes the offset is the position right after the opcode
+# and the length is zero
+Token = Tuple[int, int, int]
 
-    s = bytesio_from_binarydata(stream)
-    r: List[Command] = []  # initialize the result list
+ScriptBuffer = Union[Octets, bytearray, memoryview]
+
+
+def tokenize(script: ScriptBuffer, check_push_size: bool = True) -> Iterator[Token]:
+    """Yield the (opcode, data offset, data length) tokens of a script.
+
+    The script is walked as a memoryview, without copying:
+    push data, hex-strings and opcode names are not materialized;
+    use command_from_token to get them on demand.
+    Tokens are yielded lazily, so that the walk can stop early.
+    Pushes larger than 520 bytes are rejected if check_push_size,
+    otherwise only the script framing is checked.
+    """
 
-    while True:
-
-        t = s.read(1)  # get one byte
-        if not t:
-            break
-        i = t[0]  # convert the first byte to an integer
-        if 0 < i <= 78:  # push
-            data_length = i  # 0 < i < 76 -> 1-byte-data-length | data
-            if 75 < i < 79:
-                # i == 76 -> OP_PUSHDATA1 | 1-byte-data-length | data
-                # i == 77 -> OP_PUSHDATA2 | 2-byte-data-length | data
-                x = i - 75
-                if i == 78:  # OP_PUSHDATA4 | 4-byte-data-length | data
-                    x = 4
-                y = s.read(x)
-                if len(y) != x:
-                    raise BTClibValueError("Not enough data for pushdata length")
-                data_length = int.from_bytes(y, byteorder="little")
-                if data_length > 520:
-                    raise BTClibValueError(f"Invalid pushdata length: {data_length}")
-            data = s.read(data_length)
-            if len(data) != data_length:
-                raise BTClibValueError("Not enough data for pushdata")
-            command = data.hex().upper()
-        elif i in OP_CODE_NAME_FROM_INT:  # OP_CODE
-            command = OP_CODE_NAME_FROM_INT[i]
-            # Opcodes which take integers and bools off the stack require
-            # that they be no more than 4 bytes long.
-            # If this is the case, parse that command as int
-            # t = r[-1]
-            # if isinstance(t, bytes) and len(t) <= 4:
-            #    r[-1] = decode_num(t)
-        else:  # OP_SUCCESSx
-            command = f"OP_SUCCESS{i}"
-            if exit_on_op_success:
-                return ["OP_SUCCESS"]
-
-        r.append(command)
+    view = memoryview(bytes_from_octets(script) if isinstance(script, str) else script)
+    size = len(view)
+    i = 0
+    while i < size:
+        op = view[i]
+        i += 1
+        if 0 < op < 76:  # 1-byte-data-length | data
+            length = op
+        elif 75 < op < 79:
+            # op == 76 -> OP_PUSHDATA1 | 1-byte-data-length | data
+            # op == 77 -> OP_PUSHDATA2 | 2-byte-data-length | data
+            # op == 78 -> OP_PUSHDATA4 | 4-byte-data-length | data
+            x = 4 if op == 78 else op - 75
+            if i + x > size:
+                raise BTClibValueError("Not enough data for pushdata length")
+            length = int.from_bytes(view[i : i + x], byteorder="little")
+            if check_push_size and length > 520:
+                raise BTClibValueError(f"Invalid pushdata length: {length}")
+            i += x
+        else:  # OP_CODE or OP_SUCCESSx
+            yield op, i, 0
+            continue
+        if i + length > size:
+            raise BTClibValueError("Not enough data for pushdata")
+        yield op, i, length
+        i += length
+
+
+def command_from_token(
+    script: Union[bytes, bytearray, memoryview], token: Token
+) -> Command:
+    "Return the Command (as returned by parse) of a script token."
+
+    op, offset, length = token
+    if 0 < op < 79:
+        return script[offset : offset + length].hex().upper()
+    if op in OP_CODE_NAME_FROM_INT:
+        return OP_CODE_NAME_FROM_INT[op]
+    return f"OP_SUCCESS{op}"
 
+
+def parse(stream: BinaryData, exit_on_op_success: bool = False) -> List[Command]:
+
+    script = bytesio_from_binarydata(stream).read()
+    r: List[Command] = []  # initialize the result list
+    for token in tokenize(script):
+        op = token[0]
+        if exit_on_op_success and op > 78 and op not in OP_CODE_NAME_FROM_INT:
+            return ["OP_SUCCESS"]
+        r.append(command_from_token(script, token))
     return r
 
 
 @dataclass
 class Script:
+    __slots__ = ("script",)
     # Bitcoin script expressed as List[Command]
     # e.g. [OP_HASH160, script_h160, OP_EQUAL]
     # or Octets of its byte-encoded representation
@@ -370,7 +396,12 @@ class Script:
 
     @property
     def asm(self) -> List[Command]:
-        return parse(self.script)
+        script = self.script
+        return [command_from_token(script, token) for token in tokenize(script)]
+
+    def tokens(self) -> Iterator[Token]:
+        "Yield the (opcode, data offset, data length) tokens of the script."
+        return tokenize(self.script)
 
     def __add__(self, other: object):
 
@@ -385,4 +416,7 @@ class Script:
             self.assert_valid()
 
     def assert_valid(self) -> None:
-        serialize(self.asm)
+        # parsed commands can always be serialized:
+        # a parsing walk is enough, without materializing them
+        for _ in tokenize(self.script):
+            pass
@@ -10,10 +10,12 @@
 
 "ScriptPubKey class and functions."
 
-from typing import Callable, List, Optional, Sequence, Tuple, Type
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, Type
 
 from btclib import b32, b58, var_bytes
 from btclib.alias import Octets, String
+from btclib.ecc.curve import Curve, secp256k1
+from btclib.ecc.number_theory import legendre_symbol
 from btclib.ecc.sec_point import point_from_octets
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import hash160, sha256
@@ -235,60 +237,161 @@ def is_p2tr(script_pub_key: Octets) -> bool:
     return _is_funct(assert_p2tr, script_pub_key)
 
 
-def type_and_payload(script_pub_key: Octets) -> Tuple[str, bytes]:
-    "Return (script_pub_key type, payload) from the input script_pub_key."
+def _is_sec_pub_key(pub_key: bytes, ec: Curve = secp256k1) -> bool:
+    "Return True if the SEC pub_key would be accepted by point_from_octets."
 
-    script_pub_key = bytes_from_octets(script_pub_key)
+    # pylint: disable=protected-access
+    length = len(pub_key)
+    if length == ec.p_size + 1 and pub_key[0] in (0x02, 0x03):
+        x_Q = int.from_bytes(pub_key[1:], byteorder="big")
+        return x_Q < ec.p and legendre_symbol(ec._y2(x_Q), ec.p) != -1
+    if length == 2 * ec.p_size + 1 and pub_key[0] == 0x04:
+        x_Q = int.from_bytes(pub_key[1 : ec.p_size + 1], byteorder="big")
+        y_Q = int.from_bytes(pub_key[ec.p_size + 1 :], byteorder="big")
+        return 0 < y_Q < ec.p and ec._y2(x_Q) == y_Q * y_Q % ec.p
+    return False
 
-    if is_p2pk(script_pub_key):
-        # p2pk [pub_key, OP_CHECKSIG]
-        # 0x41{65-byte pub_key}AC or 0x21{33-byte pub_key}AC
-        return "p2pk", script_pub_key[1:-1]
 
-    if is_p2ms(script_pub_key):
-        # p2ms [m, pub_keys, n, OP_CHECKMULTISIG]
-        return "p2ms", script_pub_key[:-1]
+def _is_p2ms(script_pub_key: bytes) -> bool:
+    "Exception-free equivalent of is_p2ms for bytes input."
+
+    # p2ms [m, pub_keys, n, OP_CHECKMULTISIG]
+    length = len(script_pub_key)
+    if length < 37 or script_pub_key[-1] != 0xAE:
+        return False
+    m = script_pub_key[0] - 80
+    n = script_pub_key[-2] - 80
+    if not 0 < m <= n < 17:
+        return False
+
+    end = length - 2
+    i = 1
+    pub_keys: List[bytes] = []
+    for _ in range(n):
+        if i == end:
+            return False
+        size = script_pub_key[i]
+        if size >= 0xFD:
+            # multi-byte var_int: unusual enough to use the reference check
+            return is_p2ms(script_pub_key)
+        i += 1 + size
+        if i > end:
+            return False
+        pub_keys.append(script_pub_key[i - size : i])
+    if i != end:
+        return False
+
+    for pub_key in pub_keys:
+        if not _is_sec_pub_key(pub_key):
+            # not a SEC pub_key, but it could still be a valid key
+            # (e.g. a private key): leave it to the reference check
+            return is_p2ms(script_pub_key)
+    return True
+
+
+def _type_and_payload(script_pub_key: bytes) -> Tuple[str, bytes]:
+
+    # single pass: templates are disjoint once dispatched
+    # on the leading opcode and the script length
+    length = len(script_pub_key)
+    if length == 0:
+        return "unknown", script_pub_key
+    opcode = script_pub_key[0]
 
-    if is_p2pkh(script_pub_key):
+    if opcode == 0x76:
         # p2pkh [OP_DUP, OP_HASH160, pub_key_hash, OP_EQUALVERIFY, OP_CHECKSIG]
         # 0x76A914{20-byte pub_key_hash}88AC
-        return "p2pkh", script_pub_key[3:-2]
-
-    if is_p2sh(script_pub_key):
+        if (
+            length == 25
+            and script_pub_key[1] == 0xA9
+            and script_pub_key[2] == 0x14
+            and script_pub_key[23] == 0x88
+            and script_pub_key[24] == 0xAC
+        ):
+            return "p2pkh", script_pub_key[3:-2]
+    elif opcode == 0xA9:
         # p2sh [OP_HASH160, script_hash, OP_EQUAL]
         # 0xA914{20-byte script_hash}87
-        return "p2sh", script_pub_key[2:-1]
-
-    if is_p2wpkh(script_pub_key):
+        if length == 23 and script_pub_key[1] == 0x14 and script_pub_key[22] == 0x87:
+            return "p2sh", script_pub_key[2:-1]
+    elif opcode == 0x00:
         # p2wpkh [OP_0, pub_key_hash]
         # 0x0014{20-byte pub_key_hash}
-        return "p2wpkh", script_pub_key[2:]
-
-    if is_p2wsh(script_pub_key):
+        if length == 22 and script_pub_key[1] == 0x14:
+            return "p2wpkh", script_pub_key[2:]
         # p2wsh [OP_0, script_hash]
         # 0x0020{32-byte script_hash}
-        return "p2wsh", script_pub_key[2:]
-
-    if is_p2tr(script_pub_key):
-        # p2wtr [OP_1, script_hash]
-        # 0x0120{32-byte script_hash}
-        return "p2tr", script_pub_key[2:]
-
-    if is_nulldata(script_pub_key):
+        if length == 34 and script_pub_key[1] == 0x20:
+            return "p2wsh", script_pub_key[2:]
+    elif 0x51 <= opcode <= 0x60:
+        # p2ms [m, pub_keys, n, OP_CHECKMULTISIG]
+        if _is_p2ms(script_pub_key):
+            return "p2ms", script_pub_key[:-1]
+        # p2tr [OP_1, output_pubkey]
+        # 0x5120{32-byte output_pubkey}
+        if opcode == 0x51 and length == 34 and script_pub_key[1] == 0x20:
+            return "p2tr", script_pub_key[2:]
+    elif opcode == 0x6A:
         # nulldata [OP_RETURN, data]
-        if len(script_pub_key) < 78:
+        if 1 < length < 78:
             # OP_RETURN, data length, data up to 75 bytes max
             # 0x6A{1 byte data-length}{data (0-75 bytes)}
-            return "nulldata", script_pub_key[2:]
-
-        # OP_RETURN, OP_PUSHDATA1, data length, data min 76 bytes up to 80
-        # 0x6A4C{1-byte data-length}{data (76-80 bytes)}
-        return "nulldata", script_pub_key[3:]
+            if script_pub_key[1] == length - 2:
+                return "nulldata", script_pub_key[2:]
+        elif 78 < length < 84:
+            # OP_RETURN, OP_PUSHDATA1, data length, data min 76 bytes up to 80
+            # 0x6A4C{1-byte data-length}{data (76-80 bytes)}
+            if script_pub_key[1] == 0x4C and script_pub_key[2] == length - 3:
+                return "nulldata", script_pub_key[3:]
+    elif (opcode == 0x21 and length == 35) or (opcode == 0x41 and length == 67):
+        # p2pk [pub_key, OP_CHECKSIG]
+        # 0x41{65-byte pub_key}AC or 0x21{33-byte pub_key}AC
+        if script_pub_key[-1] == 0xAC and _is_sec_pub_key(script_pub_key[1:-1]):
+            return "p2pk", script_pub_key[1:-1]
 
     return "unknown", script_pub_key
 
 
+def type_and_payload(script_pub_key: Octets) -> Tuple[str, bytes]:
+    """Return (script_pub_key type, payload) from the input script_pub_key.
+
+    The script_pub_key is classified in a single pass,
+    dispatching on its leading opcode and length,
+    without raising (and catching) exceptions.
+    """
+
+    return _type_and_payload(bytes_from_octets(script_pub_key))
+
+
+def classify_many(script_pub_keys: Iterable[Octets]) -> List[Tuple[str, bytes]]:
+    "Return the (script_pub_key type, payload) tuples of many script_pub_keys."
+
+    return [_type_and_payload(bytes_from_octets(s)) for s in script_pub_keys]
+
+
+def script_pub_key_from_address(addr: String) -> Tuple[bytes, str]:
+    "Return (script_pub_key, network) from the input bech32/base58 address."
+
+    if b32.has_segwit_prefix(addr):
+        wit_ver, wit_prg, network = b32.witness_from_address(addr)
+        return serialize([op_int(wit_ver), wit_prg]), network
+
+    script_type, h160, network = b58.h160_from_address(addr)
+    if script_type == "p2sh":
+        commands: List[Command] = ["OP_HASH160", h160, "OP_EQUAL"]
+    else:  # it must be "p2pkh"
+        commands = [
+            "OP_DUP",
+            "OP_HASH160",
+            h160,
+            "OP_EQUALVERIFY",
+            "OP_CHECKSIG",
+        ]
+    return serialize(commands), network
+
+
 class ScriptPubKey(Script):
+    __slots__ = ("network",)
     network: str
 
     @property
@@ -353,22 +456,8 @@ class ScriptPubKey(Script):
     ) -> "ScriptPubKey":
         "Return the ScriptPubKey of the input bech32/base58 address."
 
-        if b32.has_segwit_prefix(addr):
-            wit_ver, wit_prg, network = b32.witness_from_address(addr)
-            return cls(serialize([op_int(wit_ver), wit_prg]), network, check_validity)
-
-        script_type, h160, network = b58.h160_from_address(addr)
-        if script_type == "p2sh":
-            commands: List[Command] = ["OP_HASH160", h160, "OP_EQUAL"]
-        else:  # it must be "p2pkh"
-            commands = [
-                "OP_DUP",
-                "OP_HASH160",
-                h160,
-                "OP_EQUALVERIFY",
-                "OP_CHECKSIG",
-            ]
-        return cls(serialize(commands), network, check_validity)
+        script, network = script_pub_key_from_address(addr)
+        return cls(script, network, check_validity)
 
     @classmethod
     def p2pk(
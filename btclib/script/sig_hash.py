@@ -15,22 +15,16 @@ https://raghavsood.com/blog/2018/06/10/bitcoin-signature-types-sighash
 https://wiki.bitcoinsv.io/index.php/SIGHASH_flags
 """
 
-from copy import deepcopy
-from typing import List
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from btclib import var_bytes
+from btclib import var_bytes, var_int
 from btclib.alias import Octets
 from btclib.exceptions import BTClibValueError
-from btclib.hashes import hash256, sha256, tagged_hash
-from btclib.script.script import Command, parse, serialize
-from btclib.script.script_pub_key import (
-    ScriptPubKey,
-    is_p2sh,
-    is_p2tr,
-    is_p2wpkh,
-    is_p2wsh,
-    type_and_payload,
-)
+from btclib.hashes import hash256, sha256
+from btclib.script.compiled import compile_script
+from btclib.script.script import serialize
+from btclib.script.script_pub_key import ScriptPubKey, type_and_payload
 from btclib.tx.tx import Tx
 from btclib.tx.tx_out import TxOut
 from btclib.utils import bytes_from_octets
@@ -58,15 +52,13 @@ def assert_valid_hash_type(hash_type: int) -> None:
 
 
 def legacy_script(script_pub_key: Octets) -> List[bytes]:
-    script_s: List[bytes] = []
-    current_script: List[Command] = []
-    for token in parse(script_pub_key)[::-1]:
-        if token == "OP_CODESEPARATOR":  # nosec required for python < 3.8
-            script_s.append(serialize(current_script[::-1]))
-        else:
-            current_script.append(token)
-    script_s.append(serialize(current_script[::-1]))
-    return script_s[::-1]
+    script = bytes_from_octets(script_pub_key)
+    offsets = compile_script(script).code_separator_offsets
+    # the script chunks delimited by the OP_CODESEPARATORs
+    starts = [0] + [offset + 1 for offset in offsets]
+    ends = offsets + [len(script)]
+    chunks = [script[start:end] for start, end in zip(starts, ends)]
+    return [b"".join(chunks[i:]) for i in range(len(chunks))]
 
 
 # FIXME: remove OP_CODESEPARATOR only if executed
@@ -79,61 +71,209 @@ def witness_v0_script(script_pub_key: Octets) -> List[bytes]:
         )
         return [script]
 
-    script_s: List[bytes] = []
-    current_script: List[Command] = []
-    for token in parse(script_pub_key)[::-1]:
-        if token == "OP_CODESEPARATOR":  # nosec required for python < 3.8
-            script_s.append(serialize(current_script[::-1]))
-        current_script.append(token)
-    script_s.append(serialize(current_script[::-1]))
-    return script_s[::-1]
+    script = bytes_from_octets(script_pub_key)
+    offsets = compile_script(script).code_separator_offsets
+    return [script] + [script[offset + 1 :] for offset in offsets]
 
 
 def legacy(script_: Octets, tx: Tx, vin_i: int, hash_type: int) -> bytes:
+    """Return the legacy (i.e. pre-segwit) signature hash.
+
+    The modified transaction is serialized directly from the original one,
+    substituting script_sigs, sequences and outputs on the fly:
+    the transaction is not copied.
+    """
+
     script_ = bytes_from_octets(script_)
+    base_type = hash_type & 0x1F
 
-    new_tx = deepcopy(tx)
-    for txin in new_tx.vin:
-        txin.script_sig = b""
-    # TODO: delete sig from script_ (even if non standard)
-    new_tx.vin[vin_i].script_sig = script_
-    if hash_type & 0x1F == NONE:
-        new_tx.vout = []
-        for i, txin in enumerate(new_tx.vin):
-            if i != vin_i:
-                txin.sequence = 0
-
-    if hash_type & 0x1F == SINGLE:
+    if base_type == SINGLE and vin_i >= len(tx.vout):
         # sig_hash single bug
-        if vin_i >= len(new_tx.vout):
-            return (256**31).to_bytes(32, byteorder="big", signed=False)
-        new_tx.vout = new_tx.vout[: vin_i + 1]
-        for txout in new_tx.vout[:-1]:
-            txout.script_pub_key = ScriptPubKey(b"")
-            txout.value = 0xFFFFFFFFFFFFFFFF
-        for i, txin in enumerate(new_tx.vin):
-            if i != vin_i:
-                txin.sequence = 0
-
-    if hash_type & 0x80:
-        new_tx.vin = [new_tx.vin[vin_i]]
-
-    preimage = new_tx.serialize(include_witness=False, check_validity=False)
-    preimage += hash_type.to_bytes(4, byteorder="little", signed=False)
+        return (256**31).to_bytes(32, byteorder="big", signed=False)
+
+    # other inputs have their sequence zeroed with SIGHASH_NONE/SINGLE
+    zero_sequences = base_type in (NONE, SINGLE)
+
+    preimage = [tx.version.to_bytes(4, byteorder="little", signed=False)]
+
+    indexes = [vin_i] if hash_type & ANYONECANPAY else range(len(tx.vin))
+    preimage.append(var_int.serialize(len(indexes)))
+    for i in indexes:
+        tx_in = tx.vin[i]
+        preimage.append(tx_in.prev_out.serialize(check_validity=False))
+        if i == vin_i:
+            # TODO: delete sig from script_ (even if non standard)
+            preimage.append(var_bytes.serialize(script_))
+            preimage.append(tx_in.sequence.to_bytes(4, byteorder="little"))
+        elif zero_sequences:
+            # empty script_sig and zero sequence
+            preimage.append(b"\x00\x00\x00\x00\x00")
+        else:
+            # empty script_sig
+            preimage.append(b"\x00")
+            preimage.append(tx_in.sequence.to_bytes(4, byteorder="little"))
+
+    if base_type == NONE:
+        preimage.append(b"\x00")
+    elif base_type == SINGLE:
+        preimage.append(var_int.serialize(vin_i + 1))
+        # blanked outputs: -1 value (i.e. 0xFFFFFFFFFFFFFFFF) and empty script
+        preimage.append(b"\xff\xff\xff\xff\xff\xff\xff\xff\x00" * vin_i)
+        preimage.append(tx.vout[vin_i].serialize(check_validity=False))
+    else:
+        preimage.append(var_int.serialize(len(tx.vout)))
+        preimage.extend(tx_out.serialize(check_validity=False) for tx_out in tx.vout)
+
+    preimage.append(tx.lock_time.to_bytes(4, byteorder="little", signed=False))
+    preimage.append(hash_type.to_bytes(4, byteorder="little", signed=False))
+
+    return hash256(b"".join(preimage))
+
+
+class SigHashCache:
+    """Transaction-wide signature hash digests, each computed at most once.
+
+    The (single SHA256) aggregates of prevouts, sequences and outputs
+    do not depend on the input being signed: caching them for all
+    the inputs makes signing (or verifying) a whole transaction linear,
+    instead of quadratic, in its size.
+    They are shared by BIP143 (segwit v0), which double hashes them,
+    and BIP341 (taproot), which also needs the amounts
+    and script_pub_keys of all the prevouts.
+
+    The cache is bound to a Tx, that must not be modified
+    while the cache is in use.
+    """
+
+    def __init__(self, tx: Tx, prevouts: Optional[Sequence[TxOut]] = None) -> None:
+        self.tx = tx
+        # the amounts and script_pub_keys of the prevouts, needed for taproot
+        self.amounts: Optional[List[int]] = None
+        self.script_pub_keys: Optional[List[bytes]] = None
+        self._digests: Dict[str, bytes] = {}
+        if prevouts is not None:
+            self.set_prevouts(prevouts)
+        # per input (annex hash, tapleaf hash) from the witness
+        self._taproot_witness_hashes: Dict[int, Tuple[bytes, bytes]] = {}
+
+    def set_prevouts(self, prevouts: Sequence[TxOut]) -> None:
+        "Set the amounts and script_pub_keys of the prevouts."
+        self.amounts = [prevout.value for prevout in prevouts]
+        self.script_pub_keys = [prevout.script_pub_key.script for prevout in prevouts]
+        # drop the digests of the previous prevouts, if any
+        self._digests.pop("amounts", None)
+        self._digests.pop("script_pub_keys", None)
+
+    def _digest(self, name: str, serializer: Callable[[], Iterable[bytes]]) -> bytes:
+        digest = self._digests.get(name)
+        if digest is None:
+            digest = sha256(b"".join(serializer()))
+            self._digests[name] = digest
+        return digest
+
+    @property
+    def sha_prevouts(self) -> bytes:
+        return self._digest(
+            "prevouts", lambda: (vin.prev_out.serialize() for vin in self.tx.vin)
+        )
 
-    return hash256(preimage)
+    @property
+    def sha_sequences(self) -> bytes:
+        return self._digest(
+            "sequences",
+            lambda: (
+                vin.sequence.to_bytes(4, byteorder="little", signed=False)
+                for vin in self.tx.vin
+            ),
+        )
+
+    @property
+    def sha_outputs(self) -> bytes:
+        return self._digest(
+            "outputs", lambda: (vout.serialize() for vout in self.tx.vout)
+        )
+
+    def prevouts_info(self) -> Tuple[List[int], List[bytes]]:
+        "Return the amounts and script_pub_keys of the prevouts."
+
+        if self.amounts is None or self.script_pub_keys is None:
+            raise BTClibValueError("missing prevouts")
+        if len(self.amounts) != len(self.tx.vin):
+            err_msg = f"invalid number of prevouts: {len(self.amounts)}"
+            err_msg += f" instead of {len(self.tx.vin)}"
+            raise BTClibValueError(err_msg)
+        return self.amounts, self.script_pub_keys
+
+    @property
+    def sha_amounts(self) -> bytes:
+        amounts, _ = self.prevouts_info()
+        return self._digest(
+            "amounts",
+            lambda: (
+                amount.to_bytes(8, byteorder="little", signed=False)
+                for amount in amounts
+            ),
+        )
+
+    @property
+    def sha_script_pub_keys(self) -> bytes:
+        _, script_pub_keys = self.prevouts_info()
+        return self._digest(
+            "script_pub_keys",
+            lambda: (var_bytes.serialize(s) for s in script_pub_keys),
+        )
+
+    # BIP143 double SHA256 digests
+
+    @property
+    def hash_prev_outs(self) -> bytes:
+        return self._digest("hash_prev_outs", lambda: (self.sha_prevouts,))
+
+    @property
+    def hash_seqs(self) -> bytes:
+        return self._digest("hash_seqs", lambda: (self.sha_sequences,))
+
+    @property
+    def hash_outputs(self) -> bytes:
+        return self._digest("hash_outputs", lambda: (self.sha_outputs,))
+
+    def taproot_witness_hashes(self, vin_i: int) -> Tuple[bytes, bytes]:
+        """Return the (annex hash, tapleaf hash) of a taproot input.
+
+        Each of them is empty if there is no annex
+        or the input is a key path spending, respectively.
+        """
+
+        hashes = self._taproot_witness_hashes.get(vin_i)
+        if hashes is None:
+            hashes = _taproot_witness_hashes(self.tx.vin[vin_i].script_witness.stack)
+            self._taproot_witness_hashes[vin_i] = hashes
+        return hashes
+
+
+def _sig_hash_cache(tx: Tx, cache: Optional[SigHashCache]) -> SigHashCache:
+    if cache is None:
+        return SigHashCache(tx)
+    if cache.tx is not tx:
+        raise BTClibValueError("sig_hash cache bound to a different transaction")
+    return cache
 
 
 # https://github.com/bitcoin/bitcoin/blob/4b30c41b4ebf2eb70d8a3cd99cf4d05d405eec81/test/functional/test_framework/script.py#L673
 def segwit_v0(
-    script_: Octets, tx: Tx, vin_i: int, hash_type: int, amount: int
+    script_: Octets,
+    tx: Tx,
+    vin_i: int,
+    hash_type: int,
+    amount: int,
+    cache: Optional[SigHashCache] = None,
 ) -> bytes:
     script_ = bytes_from_octets(script_)
+    cache = _sig_hash_cache(tx, cache)
 
     hash_prev_outs = b"\x00" * 32
     if not hash_type & ANYONECANPAY:
-        hash_prev_outs = b"".join([vin.prev_out.serialize() for vin in tx.vin])
-        hash_prev_outs = hash256(hash_prev_outs)
+        hash_prev_outs = cache.hash_prev_outs
 
     hash_seqs = b"\x00" * 32
     if (
@@ -141,18 +281,11 @@ def segwit_v0(
         and (hash_type & 0x1F) != SINGLE
         and (hash_type & 0x1F) != NONE
     ):
-        hash_seqs = b"".join(
-            [
-                vin.sequence.to_bytes(4, byteorder="little", signed=False)
-                for vin in tx.vin
-            ]
-        )
-        hash_seqs = hash256(hash_seqs)
+        hash_seqs = cache.hash_seqs
 
     hash_outputs = b"\x00" * 32
     if hash_type & 0x1F not in (SINGLE, NONE):
-        hash_outputs = b"".join([vout.serialize() for vout in tx.vout])
-        hash_outputs = hash256(hash_outputs)
+        hash_outputs = cache.hash_outputs
     elif (hash_type & 0x1F) == SINGLE and vin_i < len(tx.vout):
         hash_outputs = hash256(tx.vout[vin_i].serialize())
 
@@ -173,6 +306,36 @@ def segwit_v0(
     return hash256(preimage)
 
 
+def _tagged_hash_midstate(tag: bytes) -> "hashlib._Hash":
+    tag_hash = hashlib.sha256(tag).digest()
+    return hashlib.sha256(tag_hash + tag_hash)
+
+
+_TAP_SIGHASH = _tagged_hash_midstate(b"TapSighash")
+_TAP_LEAF = _tagged_hash_midstate(b"TapLeaf")
+
+
+def _taproot_witness_hashes(stack: Sequence[bytes]) -> Tuple[bytes, bytes]:
+    "Return the (annex hash, tapleaf hash) from a taproot witness stack."
+
+    annex_hash = b""
+    if len(stack) >= 2 and stack[-1][0] == 0x50:
+        annex_hash = sha256(var_bytes.serialize(stack[-1]))
+        stack = stack[:-1]
+
+    if len(stack) == 0:
+        raise BTClibValueError("Empty stack")
+
+    tapleaf_hash = b""
+    if len(stack) > 1:  # script path spending
+        leaf_version = stack[-1][0] & 0xFE
+        h = _TAP_LEAF.copy()
+        h.update(leaf_version.to_bytes(1, "big"))
+        h.update(var_bytes.serialize(stack[-2]))
+        tapleaf_hash = h.digest()
+    return annex_hash, tapleaf_hash
+
+
 def taproot(
     transaction: Tx,
     input_index: int,
@@ -182,110 +345,120 @@ def taproot(
     ext_flag: int,
     annex: bytes,
     message_extension: bytes,
+    cache: Optional[SigHashCache] = None,
+) -> bytes:
+
+    if cache is None:
+        cache = SigHashCache(transaction)
+        cache.amounts = amounts
+        cache.script_pub_keys = [s.script for s in scriptpubkeys]
+    annex_hash = sha256(var_bytes.serialize(annex)) if annex else b""
+    return _taproot(
+        cache, input_index, hashtype, ext_flag, annex_hash, message_extension
+    )
+
+
+def _taproot(
+    cache: SigHashCache,
+    input_index: int,
+    hashtype: int,
+    ext_flag: int,
+    annex_hash: bytes,
+    message_extension: bytes,
 ) -> bytes:
+    "Return the BIP341 signature hash, the annex being already hashed."
 
+    transaction = cache.tx
     if hashtype not in SIG_HASH_TYPES:
         raise BTClibValueError(f"Unknown hash type: {hashtype}")
     if hashtype & 0x03 == SINGLE and input_index >= len(transaction.vout):
         raise BTClibValueError("Sighash single wihout a corresponding output")
 
-    preimage = b"\x00"
-    preimage += hashtype.to_bytes(1, "little")
-    preimage += transaction.nVersion.to_bytes(4, "little")
-    preimage += transaction.nLockTime.to_bytes(4, "little")
+    preimage = [
+        b"\x00",  # epoch
+        hashtype.to_bytes(1, "little"),
+        transaction.nVersion.to_bytes(4, "little"),
+        transaction.nLockTime.to_bytes(4, "little"),
+    ]
 
     if hashtype & 0x80 != ANYONECANPAY:
-        sha_prevouts = b""
-        sha_amounts = b""
-        sha_scriptpubkeys = b""
-        sha_sequences = b""
-        for i, vin in enumerate(transaction.vin):
-            sha_prevouts += vin.prev_out.serialize()
-            sha_amounts += amounts[i].to_bytes(8, "little")
-            sha_scriptpubkeys += var_bytes.serialize(scriptpubkeys[i].script)
-            sha_sequences += vin.nSequence.to_bytes(4, "little")
-        preimage += sha256(sha_prevouts)
-        preimage += sha256(sha_amounts)
-        preimage += sha256(sha_scriptpubkeys)
-        preimage += sha256(sha_sequences)
+        preimage.append(cache.sha_prevouts)
+        preimage.append(cache.sha_amounts)
+        preimage.append(cache.sha_script_pub_keys)
+        preimage.append(cache.sha_sequences)
 
     if hashtype & 0x03 not in [NONE, SINGLE]:
-        sha_outputs = b""
-        for vout in transaction.vout:
-            sha_outputs += vout.serialize()
-        preimage += sha256(sha_outputs)
+        preimage.append(cache.sha_outputs)
 
-    annex_present = int(bool(annex))
-    preimage += (2 * ext_flag + annex_present).to_bytes(1, "little")
+    annex_present = int(bool(annex_hash))
+    preimage.append((2 * ext_flag + annex_present).to_bytes(1, "little"))
 
     if hashtype & 0x80 == ANYONECANPAY:
-        preimage += transaction.vin[input_index].prev_out.serialize()
-        preimage += amounts[input_index].to_bytes(8, "little")
-        preimage += var_bytes.serialize(scriptpubkeys[input_index].script)
-        preimage += transaction.vin[input_index].nSequence.to_bytes(4, "little")
+        amounts, script_pub_keys = cache.prevouts_info()
+        tx_in = transaction.vin[input_index]
+        preimage.append(tx_in.prev_out.serialize())
+        preimage.append(amounts[input_index].to_bytes(8, "little"))
+        preimage.append(var_bytes.serialize(script_pub_keys[input_index]))
+        preimage.append(tx_in.nSequence.to_bytes(4, "little"))
     else:
-        preimage += input_index.to_bytes(4, "little")
+        preimage.append(input_index.to_bytes(4, "little"))
 
     if annex_present:
-        sha_annex = var_bytes.serialize(annex)
-        preimage += sha256(sha_annex)
+        preimage.append(annex_hash)
 
     if hashtype & 0x03 == SINGLE:
-        preimage += sha256(transaction.vout[input_index].serialize())
+        preimage.append(sha256(transaction.vout[input_index].serialize()))
+
+    preimage.append(message_extension)
 
-    preimage += message_extension
+    h = _TAP_SIGHASH.copy()
+    h.update(b"".join(preimage))
+    return h.digest()
 
-    sig_hash = tagged_hash(b"TapSighash", preimage)
-    return sig_hash
 
+def from_tx(
+    prevouts: List[TxOut],
+    tx: Tx,
+    vin_i: int,
+    hash_type: int,
+    cache: Optional[SigHashCache] = None,
+) -> bytes:
+    """Return the signature hash of the tx input.
 
-def from_tx(prevouts: List[TxOut], tx: Tx, vin_i: int, hash_type: int) -> bytes:
+    When signing (or verifying) many inputs of the same transaction,
+    pass a SigHashCache(tx) to avoid recomputing
+    the transaction-wide digests for each input.
+    """
 
     script = prevouts[vin_i].script_pub_key.script
+    # script_pub_keys recur: use the interned compiled script
+    script_type = compile_script(script).type
 
-    if is_p2tr(script):
-        annex = b""
-        witness = tx.vin[vin_i].script_witness
-        if len(witness.stack) >= 2 and witness.stack[-1][0] == 0x50:
-            annex = witness.stack[-1]
-            witness.stack = witness.stack[:-1]
-
-        if len(witness.stack) == 0:
-            raise BTClibValueError("Empty stack")
-
-        ext = b""
-        if len(witness.stack) > 1:
-            leaf_version = witness.stack[-1][0] & 0xFE
-            preimage = leaf_version.to_bytes(1, "big")
-            preimage += var_bytes.serialize(witness.stack[-2])
-            tapleaf_hash = tagged_hash(b"TapLeaf", preimage)
-            ext = tapleaf_hash + b"\x00\xff\xff\xff\xff"
-
-        return taproot(
-            tx,
-            vin_i,
-            [x.value for x in prevouts],
-            [x.script_pub_key for x in prevouts],
-            hash_type,
-            int(bool(ext)),
-            annex,
-            ext,
-        )
+    if script_type == "p2tr":
+        cache = _sig_hash_cache(tx, cache)
+        if cache.amounts is None or cache.script_pub_keys is None:
+            cache.set_prevouts(prevouts)
+        annex_hash, tapleaf_hash = cache.taproot_witness_hashes(vin_i)
+        ext = tapleaf_hash + b"\x00\xff\xff\xff\xff" if tapleaf_hash else b""
+        return _taproot(cache, vin_i, hash_type, int(bool(ext)), annex_hash, ext)
 
     # handle all p2sh-wrapped scripts
-    if is_p2sh(script):
+    if script_type == "p2sh":
         script = tx.vin[vin_i].script_sig
+        script_type, _ = type_and_payload(script)
 
-    if is_p2wpkh(script):
+    if script_type == "p2wpkh":
         script_ = witness_v0_script(script)[0]
-        return segwit_v0(script_, tx, vin_i, hash_type, prevouts[vin_i].value)
+        amount = prevouts[vin_i].value
+        return segwit_v0(script_, tx, vin_i, hash_type, amount, cache)
 
-    if is_p2wsh(script):
+    if script_type == "p2wsh":
         # the real script is contained in the witness
         script_ = witness_v0_script(tx.vin[vin_i].script_witness.stack[-1])[0]
-        return segwit_v0(script_, tx, vin_i, hash_type, prevouts[vin_i].value)
+        amount = prevouts[vin_i].value
+        return segwit_v0(script_, tx, vin_i, hash_type, amount, cache)
 
-    if is_p2tr(script):
+    if script_type == "p2tr":
         raise BTClibValueError("Taproot scripts cannot be wrapped in p2sh")
 
     script_ = legacy_script(script)[0]
@@ -16,6 +16,7 @@ from typing import Any, Optional, Tuple
 from btclib import var_bytes
 from btclib.alias import Octets
 from btclib.ecc.curve import Curve, mult, secp256k1
+from btclib.ecc.point import CurvePoint
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import tagged_hash
 from btclib.script.script import serialize
@@ -69,7 +70,7 @@ def output_pubkey(
     if t >= ec.n:
         raise BTClibValueError("Invalid script tree hash")  # pragma: no cover
     P_x = int.from_bytes(pubkey, "big")
-    Q = ec.add((P_x, ec.y_even(P_x)), mult(t))
+    Q = (CurvePoint.from_x(P_x, ec) + t * CurvePoint.generator(ec)).aff
     return Q[0].to_bytes(32, "big"), Q[1] % 2
 
 
@@ -136,6 +137,5 @@ def check_output_pubkey(
     # edge case that cannot be reproduced in the test suite
     if t >= ec.n:
         raise BTClibValueError("Invalid script tree hash")  # pragma: no cover
-    P = (p, secp256k1.y_even(p))
-    Q = secp256k1.add(P, mult(t))
+    Q = (CurvePoint.from_x(p, ec) + t * CurvePoint.generator(ec)).aff
     return Q[0] == int.from_bytes(q, "big") and control[0] & 1 == Q[1] % 2
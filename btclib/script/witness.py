@@ -20,6 +20,7 @@ from btclib.utils import bytes_from_octets, bytesio_from_binarydata
 
 @dataclass
 class Witness:
+    __slots__ = ("stack",)
     stack: List[bytes]
 
     def __init__(
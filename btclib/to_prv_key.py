@@ -16,7 +16,7 @@ from btclib.alias import String, Union
 from btclib.base58 import b58decode
 from btclib.bip32.bip32 import BIP32Key, BIP32KeyData
 from btclib.ecc.curve import Curve, secp256k1
-from btclib.exceptions import BTClibValueError
+from btclib.exceptions import BTClibTypeError, BTClibValueError
 from btclib.network import (
     NETWORKS,
     network_from_key_value,
@@ -61,7 +61,8 @@ def int_from_prv_key(prv_key: PrvKey, ec: Curve = secp256k1) -> int:
     else:
         try:
             q, network, _ = _prv_keyinfo_from_xprvwif(prv_key)
-        except ValueError:
+        # not base58 bytes-like objects or strings are tried as octets
+        except (ValueError, BTClibTypeError):
             pass
         else:
             # q has been validated on the xprv/wif network
@@ -200,7 +201,7 @@ def prv_keyinfo_from_prv_key(
         try:
             return _prv_keyinfo_from_xprvwif(prv_key, network, compressed)
         # FIXME: except the NotPrvKeyError only, let InvalidPrvKey go through
-        except ValueError:
+        except (ValueError, BTClibTypeError):
             pass
 
         # it must be octets
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Memory-mapped reader of Bitcoin Core blk*.dat block files.
+
+Each record of a block file is framed as
+network magic bytes | 4 bytes little-endian block size | block,
+the file tail being zero padding (Bitcoin Core preallocates the files).
+Blocks are addressed by the offset of their data in the file,
+the same offset stored in the Bitcoin Core block index.
+
+Files are memory-mapped, not read:
+raw blocks are zero-copy memoryview slices of the map
+and blocks are parsed one at a time, only when requested,
+so that files of any size can be streamed.
+XOR-obfuscated files (Bitcoin Core 28+ default) must be de-obfuscated first.
+"""
+
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx.block_header import BlockHeader
+from btclib.tx.blocks import Block
+
+_RECORD_HEADER_SIZE = 8
+_BLK_FILE_NAME = re.compile(r"^blk(\d+)\.dat$")
+
+
+class BlockFile:
+    """Memory-mapped blk*.dat block file.
+
+    Raw blocks are memoryview slices of the map, valid until the file is closed:
+    release them (or copy them with bytes) before closing it.
+    """
+
+    def __init__(self, filename: str, network: str = "mainnet") -> None:
+        self.filename = filename
+        self.magic = NETWORKS[network].magic_bytes
+        self._map: Optional[mmap.mmap] = None
+        with open(filename, "rb") as file_:
+            if os.fstat(file_.fileno()).st_size:
+                self._map = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map if self._map is not None else b"")
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "BlockFile":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _record(self, pos: int) -> Tuple[int, int]:
+        "Return the (offset, size) of the block record starting at pos."
+
+        magic = bytes(self._view[pos : pos + 4])
+        if magic != self.magic:
+            err_msg = f"invalid magic bytes at offset {pos}: {magic.hex()}"
+            raise BTClibValueError(err_msg)
+        offset = pos + _RECORD_HEADER_SIZE
+        size = int.from_bytes(self._view[pos + 4 : offset], byteorder="little")
+        if offset + size > len(self._view):
+            raise BTClibValueError(f"truncated block at offset {offset}")
+        return offset, size
+
+    def offsets(self) -> Iterator[Tuple[int, int]]:
+        "Yield the (offset, size) of the blocks of the file."
+
+        pos = 0
+        end = len(self._view) - _RECORD_HEADER_SIZE
+        while pos <= end:
+            # zero padding of preallocated files
+            if not any(self._view[pos : pos + 4]):
+                break
+            offset, size = self._record(pos)
+            yield offset, size
+            pos = offset + size
+
+    def raw_block(self, offset: int) -> memoryview:
+        "Return the serialized block at the given offset."
+        if offset < _RECORD_HEADER_SIZE:
+            raise BTClibValueError(f"invalid block offset: {offset}")
+        offset, size = self._record(offset - _RECORD_HEADER_SIZE)
+        return self._view[offset : offset + size]
+
+    def header(self, offset: int) -> BlockHeader:
+        "Return the header of the block at the given offset."
+        return BlockHeader.parse(bytes(self.raw_block(offset)[:80]))
+
+    def block(self, offset: int, check_validity: bool = False) -> Block:
+        "Return the block at the given offset."
+        return Block.parse(bytes(self.raw_block(offset)), check_validity)
+
+    def raw_blocks(self) -> Iterator[Tuple[int, memoryview]]:
+        "Yield the (offset, serialized block) of the blocks of the file."
+        for offset, size in self.offsets():
+            yield offset, self._view[offset : offset + size]
+
+    def headers(self) -> Iterator[Tuple[int, BlockHeader]]:
+        "Yield the (offset, header) of the blocks, without parsing the rest."
+        for offset, data in self.raw_blocks():
+            yield offset, BlockHeader.parse(bytes(data[:80]))
+
+    def blocks(self, check_validity: bool = False) -> Iterator[Block]:
+        "Yield the blocks of the file, parsing them one at a time."
+        for _, data in self.raw_blocks():
+            yield Block.parse(bytes(data), check_validity)
+
+
+def block_file_names(directory: str) -> List[str]:
+    "Return the blk*.dat files of a directory, sorted by number."
+
+    numbered = []
+    for name in os.listdir(directory):
+        match = _BLK_FILE_NAME.match(name)
+        if match:
+            numbered.append((int(match.group(1)), os.path.join(directory, name)))
+    return [filename for _, filename in sorted(numbered)]
+
+
+def _map_file(job: Tuple[Callable[[Block], Any], str, str]) -> List[Any]:
+    func, filename, network = job
+    with BlockFile(filename, network) as block_file:
+        return [func(block) for block in block_file.blocks()]
+
+
+def map_blocks(
+    func: Callable[[Block], Any],
+    directory: str,
+    network: str = "mainnet",
+    max_workers: Optional[int] = None,
+) -> Iterator[Any]:
+    """Yield func(block) for all the blocks of the directory block files.
+
+    Results are yielded in file order, files being processed
+    in a process pool if max_workers is greater than one or,
+    when max_workers is None, if there are many files.
+    In a process pool func must be picklable (e.g. a module-level function)
+    and it should return small results, as they are sent back file by file.
+    """
+
+    filenames = block_file_names(directory)
+    if max_workers is None:
+        parallel = len(filenames) > 1
+    else:
+        parallel = max_workers > 1
+    if not parallel:
+        for filename in filenames:
+            with BlockFile(filename, network) as block_file:
+                for block in block_file.blocks():
+                    yield func(block)
+        return
+
+    jobs = [(func, filename, network) for filename in filenames]
+    with ProcessPoolExecutor(max_workers) as executor:
+        for results in executor.map(_map_file, jobs):
+            yield from results
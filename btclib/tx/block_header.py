@@ -17,7 +17,7 @@ version, previous block hash, merkle root, time, bits, and nonce.
 import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Mapping, Tuple, Type, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Type, Union
 
 from btclib.alias import BinaryData, Octets
 from btclib.exceptions import BTClibValueError
@@ -41,6 +41,16 @@ _KEY_SIZE: List[Tuple[str, int]] = [
 
 @dataclass
 class BlockHeader:
+    __slots__ = (
+        "version",
+        "previous_block_hash",
+        "merkle_root",
+        "_timestamp",
+        "bits",
+        "nonce",
+        "_hash",
+    )
+
     # 4 bytes, _signed_ little endian
     version: int
     # _HF_LEN bytes, little endian
@@ -48,7 +58,8 @@ class BlockHeader:
     # _HF_LEN bytes, little endian
     merkle_root: bytes
     # 4 bytes, unsigned little endian
-    time: datetime
+    # the raw unix timestamp, see the time property
+    _timestamp: int
     # 4 bytes, little endian
     bits: bytes
     # 4 bytes, unsigned little endian
@@ -92,34 +103,110 @@ class BlockHeader:
         power_term = pow(256, genesis_exponent - self.bits[0])
         return significand * power_term
 
+    @property
+    def time(self) -> datetime:
+        "Return the BlockHeader time as UTC datetime."
+        return datetime.fromtimestamp(self._timestamp, timezone.utc)
+
+    @time.setter
+    def time(self, value: datetime) -> None:
+        self._timestamp = int(value.timestamp())
+
+    @property
+    def timestamp(self) -> int:
+        "Return the BlockHeader time as raw unix timestamp."
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: int) -> None:
+        self._timestamp = value
+
     @property
     def hash(self) -> bytes:
         "Return the reversed hash of the BlockHeader."
+        if self._hash is not None:
+            return self._hash
         s = self.serialize(check_validity=False)
         hash_ = _HF(s)
         return hash_[::-1]
 
+    @property
+    def is_frozen(self) -> bool:
+        return self._hash is not None
+
+    def freeze(self) -> "BlockHeader":
+        """Cache the hash, returning the BlockHeader itself.
+
+        Assigning a BlockHeader attribute unfreezes it,
+        dropping the cached hash.
+        """
+        hash_ = _HF(self.serialize(check_validity=False))[::-1]
+        object.__setattr__(self, "_hash", hash_)
+        return self
+
+    def unfreeze(self) -> None:
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # any assignment drops the cached hash
+        object.__setattr__(self, "_hash", None)
+        object.__setattr__(self, name, value)
+
     def __init__(
         self,
         version: int = 1,
         previous_block_hash: Octets = b"",
         merkle_root_: Octets = b"",
-        time: datetime = datetime.fromtimestamp(0),
+        time: Union[datetime, int] = 0,
         bits: Octets = b"",
         nonce: int = 0,
         check_validity: bool = True,
     ) -> None:
 
+        self._hash: Optional[bytes] = None
         self.version = version
         self.previous_block_hash = bytes_from_octets(previous_block_hash)
         self.merkle_root = bytes_from_octets(merkle_root_)
-        self.time = time
+        if isinstance(time, datetime):
+            self.time = time
+        else:
+            self._timestamp = time
         self.bits = bytes_from_octets(bits)
         self.nonce = nonce
 
         if check_validity:
             self.assert_valid()
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BlockHeader):
+            return NotImplemented  # pragma: no cover
+
+        # the raw _timestamp is compared, the cached _hash is not
+        return (
+            self.version,
+            self.previous_block_hash,
+            self.merkle_root,
+            self._timestamp,
+            self.bits,
+            self.nonce,
+        ) == (
+            other.version,
+            other.previous_block_hash,
+            other.merkle_root,
+            other._timestamp,
+            other.bits,
+            other.nonce,
+        )
+
+    def __repr__(self) -> str:
+        # time is shown as datetime, not as the raw _timestamp
+        return (
+            f"{type(self).__name__}(version={self.version!r}, "
+            f"previous_block_hash={self.previous_block_hash!r}, "
+            f"merkle_root={self.merkle_root!r}, time={self.time!r}, "
+            f"bits={self.bits!r}, nonce={self.nonce!r})"
+        )
+
     def to_dict(self, check_validity: bool = True) -> Dict[str, Union[int, float, str]]:
 
         if check_validity:
@@ -166,12 +253,12 @@ class BlockHeader:
         if not 0 < self.version <= 0x7FFFFFFF:
             raise BTClibValueError(f"invalid version: {hex(self.version)}")
 
-        if self.time.timestamp() < 1231006505:
+        if self._timestamp < 1231006505:
             err_msg = "invalid timestamp (before genesis)"
-            date = datetime.fromtimestamp(self.time.timestamp(), timezone.utc)
-            err_msg += f": {date}"
+            err_msg += f": {self.time}"
             raise BTClibValueError(err_msg)
-        # TODO: check for max 4-bytes timestamp
+        if self._timestamp > 0xFFFFFFFF:
+            raise BTClibValueError(f"invalid timestamp: {self.time}")
 
         for key, size in _KEY_SIZE:
             value = bytes(getattr(self, key))
@@ -181,7 +268,8 @@ class BlockHeader:
                 err_msg += f" instead of {size}"
                 raise BTClibValueError(err_msg)
 
-        self.nonce = int(self.nonce)
+        if not isinstance(self.nonce, int):
+            self.nonce = int(self.nonce)
         if not 0 < self.nonce <= 0xFFFFFFFF:
             raise BTClibValueError(f"invalid nonce: {hex(self.nonce)}")
 
@@ -198,7 +286,7 @@ class BlockHeader:
                 self.version.to_bytes(4, byteorder="little", signed=True),  # int32_t
                 self.previous_block_hash[::-1],
                 self.merkle_root[::-1],
-                int(self.time.timestamp()).to_bytes(4, "little", signed=False),
+                self._timestamp.to_bytes(4, byteorder="little", signed=False),
                 self.bits[::-1],
                 self.nonce.to_bytes(4, byteorder="little", signed=False),
             ]
@@ -206,22 +294,29 @@ class BlockHeader:
 
     @classmethod
     def parse(
-        cls: Type["BlockHeader"], data: BinaryData, check_validity: bool = True
+        cls: Type["BlockHeader"],
+        data: BinaryData,
+        check_validity: bool = True,
+        frozen: bool = False,
     ) -> "BlockHeader":
-        "Return a BlockHeader by parsing 80 bytes from binary data."
+        """Return a BlockHeader by parsing 80 bytes from binary data.
+
+        If frozen, the hash is computed from the parsed bytes and cached.
+        """
 
         stream = bytesio_from_binarydata(data)
+        header = stream.read(80)
 
         # version is a signed int (int32_t, not uint32_t)
-        version = int.from_bytes(stream.read(4), byteorder="little", signed=True)
-        previous_block_hash = stream.read(_HF_LEN)[::-1]
-        merkle_root_ = stream.read(_HF_LEN)[::-1]
-        t = int.from_bytes(stream.read(4), byteorder="little", signed=False)
-        time = datetime.fromtimestamp(t, timezone.utc)
-        bits = stream.read(4)[::-1]
-        nonce = int.from_bytes(stream.read(4), byteorder="little", signed=False)
-
-        return cls(
+        version = int.from_bytes(header[:4], byteorder="little", signed=True)
+        previous_block_hash = header[4:36][::-1]
+        merkle_root_ = header[36:68][::-1]
+        # the raw timestamp, no datetime until BlockHeader.time is accessed
+        time = int.from_bytes(header[68:72], byteorder="little", signed=False)
+        bits = header[72:76][::-1]
+        nonce = int.from_bytes(header[76:80], byteorder="little", signed=False)
+
+        block_header = cls(
             version,
             previous_block_hash,
             merkle_root_,
@@ -230,3 +325,7 @@ class BlockHeader:
             nonce,
             check_validity,
         )
+        if frozen:
+            object.__setattr__(block_header, "_hash", _HF(header)[::-1])
+        return block_header
+
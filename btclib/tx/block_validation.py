@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Block input signature validation.
+
+verify_block_signatures checks the signatures of all the inputs of a block
+spending p2pkh, p2wpkh, p2sh-p2wpkh and p2tr (key path) prevouts:
+
+- signature hashes are computed with a SigHashCache per transaction;
+- all BIP340 signatures are batch verified
+  in a single multi-scalar multiplication;
+  only if the batch fails they are verified one by one,
+  to locate the failures;
+- ECDSA signatures are verified in a process pool when they are many;
+- signatures already known to the process-wide signature cache
+  (see btclib.ecc.sig_cache) are not verified again.
+
+Inputs of other types (e.g. p2wsh or taproot script path)
+are not verified, but reported as unsupported.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.sig_cache import get_sig_cache
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash160
+from btclib.script import sig_hash
+from btclib.script.compiled import compile_script
+from btclib.script.script import serialize, tokenize
+from btclib.tx.blocks import Block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+
+# return the TxOut spent by the OutPoint
+PrevoutProvider = Callable[[OutPoint], TxOut]
+
+# below this number of signatures a process pool is not worth its startup
+_MIN_PARALLEL_SIGNATURES = 256
+
+# (message hash, public key, DER signature)
+_ECDSAJob = Tuple[bytes, bytes, bytes]
+
+# the sig_cache algorithm names used by dsa.verify_ and ssa.verify_,
+# so that signatures verified here are known there and vice versa
+_ECDSA = "ecdsa_sha256"
+_SSA = "bip340_sha256"
+
+
+class SigVerificationReport(NamedTuple):
+    """Outcome of the verification of the input signatures of a block.
+
+    failures and unsupported are (transaction index, input index) pairs;
+    verified is the number of successfully verified signatures.
+    """
+
+    failures: List[Tuple[int, int]]
+    unsupported: List[Tuple[int, int]]
+    verified: int
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.failures
+
+
+def _p2pkh_script_code(h160: bytes) -> bytes:
+    return serialize(["OP_DUP", "OP_HASH160", h160, "OP_EQUALVERIFY", "OP_CHECKSIG"])
+
+
+def _verify_ecdsa(job: _ECDSAJob) -> bool:
+    msg_hash, pub_key, der_sig = job
+    # low s is standardness policy, not a consensus rule
+    return dsa.verify_(msg_hash, pub_key, der_sig, lower_s=False)
+
+
+class _Collector:
+    "Signature checks of a block, collected input by input."
+
+    def __init__(self) -> None:
+        self.failures: List[Tuple[int, int]] = []
+        self.unsupported: List[Tuple[int, int]] = []
+        self.ecdsa_inputs: List[Tuple[int, int]] = []
+        self.ecdsa_jobs: List[_ECDSAJob] = []
+        self.ssa_inputs: List[Tuple[int, int]] = []
+        self.ssa_m_hashes: List[bytes] = []
+        self.ssa_pub_keys: List[bytes] = []
+        self.ssa_sigs: List[bytes] = []
+
+    def add_tx(self, tx_i: int, tx: Tx, prevouts: Sequence[TxOut]) -> None:
+        cache = sig_hash.SigHashCache(tx, prevouts)
+        for vin_i in range(len(prevouts)):
+            try:
+                self._add_input(tx_i, tx, vin_i, prevouts, cache)
+            except (BTClibValueError, IndexError):
+                self.failures.append((tx_i, vin_i))
+
+    def _add_ecdsa(
+        self, key: Tuple[int, int], msg_hash: bytes, pub_key: bytes, sig: bytes
+    ) -> None:
+        self.ecdsa_inputs.append(key)
+        self.ecdsa_jobs.append((msg_hash, pub_key, sig[:-1]))
+
+    def _add_input(
+        self,
+        tx_i: int,
+        tx: Tx,
+        vin_i: int,
+        prevouts: Sequence[TxOut],
+        cache: sig_hash.SigHashCache,
+    ) -> None:
+        key = (tx_i, vin_i)
+        tx_in = tx.vin[vin_i]
+        stack = tx_in.script_witness.stack
+        compiled = compile_script(prevouts[vin_i].script_pub_key.script)
+        script_type, payload = compiled.type, compiled.payload
+
+        if script_type == "p2pkh":
+            script_sig = tx_in.script_sig
+            tokens = list(tokenize(script_sig))
+            # two data pushes: the signature and the public key
+            if len(tokens) != 2 or not all(0 < op < 79 for op, _, _ in tokens):
+                raise BTClibValueError("invalid p2pkh script_sig")
+            sig, pub_key = [script_sig[i : i + n] for _, i, n in tokens]
+            if hash160(pub_key) != payload:
+                raise BTClibValueError("public key mismatch")
+            msg_hash = sig_hash.legacy(compiled.script, tx, vin_i, sig[-1])
+            self._add_ecdsa(key, msg_hash, pub_key, sig)
+        elif script_type == "p2tr":
+            # an annex (if any) is hashed, as part of the signature hash
+            has_annex = len(stack) > 1 and stack[-1][:1] == b"\x50"
+            if len(stack) - has_annex != 1:
+                self.unsupported.append(key)
+                return
+            sig = stack[0]
+            if len(sig) not in (64, 65) or sig[64:] == b"\x00":
+                raise BTClibValueError("invalid BIP340 signature")
+            hash_type = sig[64] if len(sig) == 65 else sig_hash.DEFAULT
+            # fail early if r is not a valid x-coordinate,
+            # before appending to the parallel lists
+            ssa.Sig.parse(sig[:64])
+            msg_hash = sig_hash.from_tx(list(prevouts), tx, vin_i, hash_type, cache)
+            self.ssa_inputs.append(key)
+            self.ssa_m_hashes.append(msg_hash)
+            self.ssa_pub_keys.append(payload)
+            self.ssa_sigs.append(sig[:64])
+        elif script_type in ("p2wpkh", "p2sh"):
+            if script_type == "p2sh":
+                if len(stack) != 2:
+                    self.unsupported.append(key)
+                    return
+                redeem_script = serialize(["OP_0", hash160(stack[1])])
+                if tx_in.script_sig != serialize([redeem_script]):
+                    self.unsupported.append(key)
+                    return
+                if hash160(redeem_script) != payload:
+                    raise BTClibValueError("redeem script mismatch")
+            elif tx_in.script_sig or len(stack) != 2:
+                raise BTClibValueError("invalid p2wpkh script_sig/witness")
+            sig, pub_key = stack
+            h160 = hash160(pub_key)
+            if script_type == "p2wpkh" and h160 != payload:
+                raise BTClibValueError("public key mismatch")
+            amount = prevouts[vin_i].value
+            script_code = _p2pkh_script_code(h160)
+            msg_hash = sig_hash.segwit_v0(
+                script_code, tx, vin_i, sig[-1], amount, cache
+            )
+            self._add_ecdsa(key, msg_hash, pub_key, sig)
+        else:
+            self.unsupported.append(key)
+
+    def verify_ssa(self) -> List[Tuple[int, int]]:
+        "Return the BIP340 failures, batch verifying first."
+
+        sig_cache = get_sig_cache()
+        checks = list(zip(self.ssa_m_hashes, self.ssa_pub_keys, self.ssa_sigs))
+        entries = [b""] * len(checks)
+        pending = list(range(len(checks)))
+        if sig_cache is not None:
+            entries = [sig_cache.entry(_SSA, *check) for check in checks]
+            pending = [i for i in pending if entries[i] not in sig_cache]
+        if not pending:
+            return []
+
+        m_hashes = [checks[i][0] for i in pending]
+        pub_keys = [checks[i][1] for i in pending]
+        sigs = [ssa.Sig.parse(checks[i][2], check_validity=False) for i in pending]
+        if ssa.batch_verify_(m_hashes, pub_keys, sigs):
+            if sig_cache is not None:
+                for i in pending:
+                    sig_cache.add(entries[i])
+            return []
+        # ssa.verify_ caches the successful verifications
+        return [self.ssa_inputs[i] for i in pending if not ssa.verify_(*checks[i])]
+
+    def verify_ecdsa(self, max_workers: Optional[int]) -> List[Tuple[int, int]]:
+        "Return the ECDSA failures, verifying in a process pool if worth it."
+
+        sig_cache = get_sig_cache()
+        jobs = self.ecdsa_jobs
+        entries = [b""] * len(jobs)
+        pending = list(range(len(jobs)))
+        if sig_cache is not None:
+            entries = [sig_cache.entry(_ECDSA, *job) for job in jobs]
+            pending = [i for i in pending if entries[i] not in sig_cache]
+        pending_jobs = [jobs[i] for i in pending]
+
+        if max_workers is None:
+            parallel = len(pending_jobs) >= _MIN_PARALLEL_SIGNATURES
+        else:
+            parallel = max_workers > 1
+        if parallel:
+            with ProcessPoolExecutor(max_workers) as executor:
+                results = list(executor.map(_verify_ecdsa, pending_jobs, chunksize=64))
+        else:
+            results = [_verify_ecdsa(job) for job in pending_jobs]
+
+        failures: List[Tuple[int, int]] = []
+        for i, result in zip(pending, results):
+            if not result:
+                failures.append(self.ecdsa_inputs[i])
+            elif sig_cache is not None:
+                # the workers cannot update the cache of this process
+                sig_cache.add(entries[i])
+        return failures
+
+
+def verify_block_signatures(
+    block: Block,
+    prevout_provider: PrevoutProvider,
+    max_workers: Optional[int] = None,
+) -> SigVerificationReport:
+    """Verify the input signatures of all the block transactions.
+
+    Outputs created by previous transactions of the same block
+    are looked up in the block itself;
+    all the other prevouts are requested to the prevout provider.
+
+    ECDSA signatures are verified in a process pool
+    if max_workers is greater than one or, when max_workers is None,
+    if they are many.
+    """
+
+    block_outputs: Dict[bytes, List[TxOut]] = {}
+    collector = _Collector()
+    for tx_i, tx in enumerate(block.transactions):
+        if not tx.is_coinbase():
+            prevouts = [
+                block_outputs[tx_in.prev_out.tx_id][tx_in.prev_out.vout]
+                if tx_in.prev_out.tx_id in block_outputs
+                else prevout_provider(tx_in.prev_out)
+                for tx_in in tx.vin
+            ]
+            collector.add_tx(tx_i, tx, prevouts)
+        block_outputs[tx.id] = tx.vout
+
+    sig_failures = collector.verify_ssa() + collector.verify_ecdsa(max_workers)
+    verified = len(collector.ssa_sigs) + len(collector.ecdsa_jobs)
+    verified -= len(sig_failures)
+    failures = sorted(collector.failures + sig_failures)
+    return SigVerificationReport(failures, collector.unsupported, verified)
@@ -13,17 +13,23 @@
 Dataclass encapsulating BlockHeader and List[Tx].
 """
 
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from math import ceil
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Type
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
 
 from btclib import var_bytes, var_int
 from btclib.alias import BinaryData
 from btclib.exceptions import BTClibValueError
-from btclib.hashes import hash256, merkle_root
+from btclib.hashes import hash256
+from btclib.merkle import MerkleRootBuilder
+from btclib.script.witness import Witness
 from btclib.tx.block_header import BlockHeader
 from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+from btclib.tx.tx_view import block_tx_views
 from btclib.utils import bytesio_from_binarydata, decode_num
 
 # python 3.6
@@ -33,21 +39,75 @@ if sys.version_info.minor == 6:  # pragma: no cover
     backports.datetime_fromisoformat.MonkeyPatch.patch_fromisoformat()  # pylint: disable=no-member
 
 _HF = hash256
+# BIP141 witness commitment: OP_RETURN, 36 bytes push, commitment header
+_WITNESS_COMMITMENT_HEADER = bytes.fromhex("6a24aa21a9ed")
+_WITNESS_COMMITMENT_SIZE = len(_WITNESS_COMMITMENT_HEADER) + 32
+# below this, process pool start-up and pickling exceed the parsing time
+_MIN_PARALLEL_TRANSACTIONS = 2048
+
+
+def _is_witness_commitment(script: bytes) -> bool:
+    return len(script) >= _WITNESS_COMMITMENT_SIZE and script.startswith(
+        _WITNESS_COMMITMENT_HEADER
+    )
+
+
+def _parse_txs(job: Tuple[bytes, int]) -> List[Tx]:
+    "Parse and validate consecutive frozen transactions."
+    data, n = job
+    stream = bytesio_from_binarydata(data)
+    # as in the sequential parse, transactions are always validated
+    return [Tx.parse(stream, frozen=True) for _ in range(n)]
 
 
 @dataclass
 class Block:
+    __slots__ = ("header", "transactions", "_size")
     header: BlockHeader
     transactions: List[Tx]
 
     @property
     def size(self) -> int:
+        if self._size is not None:
+            return self._size
         return len(self.serialize(check_validity=False))
 
     @property
     def weight(self) -> int:
         return sum(t.weight for t in self.transactions)
 
+    @property
+    def is_frozen(self) -> bool:
+        return self._size is not None
+
+    def freeze(self) -> "Block":
+        """Freeze header and transactions, returning the Block itself.
+
+        Their identifiers and sizes are computed once and cached,
+        as the block size is.
+        Assigning a Block attribute unfreezes the block (but not its
+        header and transactions); in place changes are not detected:
+        unfreeze the block, its header and transactions before making them.
+        """
+        self.header.freeze()
+        size = len(self.header.serialize(check_validity=False))
+        size += len(var_int.serialize(len(self.transactions)))
+        size += sum(tx.freeze().size for tx in self.transactions)
+        object.__setattr__(self, "_size", size)
+        return self
+
+    def unfreeze(self) -> None:
+        "Unfreeze the block, its header and transactions."
+        self.header.unfreeze()
+        for tx in self.transactions:
+            tx.unfreeze()
+        object.__setattr__(self, "_size", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # any assignment drops the cached size
+        object.__setattr__(self, "_size", None)
+        object.__setattr__(self, name, value)
+
     @property
     def vsize(self) -> int:
         return ceil(self.weight / 4)
@@ -82,6 +142,7 @@ class Block:
         check_validity: bool = True,
     ) -> None:
 
+        self._size: Optional[int] = None
         self.header = header
 
         # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
@@ -115,27 +176,128 @@ class Block:
         return any(tx.is_segwit() for tx in self.transactions)
 
     def assert_valid_merkle_root(self) -> None:
-        data = [
-            tx.serialize(include_witness=False, check_validity=False)
-            for tx in self.transactions
-        ]
-        merkle_root_ = merkle_root(data, _HF)[::-1]
+        # txids are streamed into the builder, without any intermediate list
+        builder = MerkleRootBuilder(_HF)
+        for tx in self.transactions:
+            # the transaction id, cached if the transaction is frozen
+            builder.add(tx.id[::-1])
+        merkle_root_ = builder.root()[::-1]
         if merkle_root_ != self.header.merkle_root:
             err_msg = f"invalid merkle root: {self.header.merkle_root.hex()}"
             err_msg += f" instead of: {merkle_root_.hex()}"
             raise BTClibValueError(err_msg)
+        # CVE-2012-2459
+        if builder.mutated:
+            raise BTClibValueError("mutated merkle tree: duplicated transactions")
+
+    def witness_merkle_root(self) -> bytes:
+        """Return the BIP141 witness Merkle root.
+
+        It is the Merkle root of the wtxids (the coinbase one being zero),
+        in internal byte order as committed in the coinbase.
+        """
+        builder = MerkleRootBuilder(_HF)
+        builder.add(b"\x00" * 32)
+        for tx in self.transactions[1:]:
+            # the transaction hash, cached if the transaction is frozen
+            builder.add(tx.hash[::-1])
+        return builder.root()
+
+    def witness_commitment(self) -> Optional[bytes]:
+        """Return the BIP141 witness commitment of the coinbase, if any.
+
+        If more coinbase outputs match the commitment pattern,
+        the one with the highest index is the commitment.
+        """
+        for tx_out in reversed(self.transactions[0].vout):
+            script = tx_out.script_pub_key.script
+            if _is_witness_commitment(script):
+                start = len(_WITNESS_COMMITMENT_HEADER)
+                return script[start:_WITNESS_COMMITMENT_SIZE]
+        return None
+
+    def compute_witness_commitment(
+        self, witness_reserved_value: Optional[bytes] = None
+    ) -> bytes:
+        """Return the BIP141 witness commitment of the block transactions.
+
+        If not provided, the witness reserved value
+        is taken from the coinbase witness.
+        """
+        if witness_reserved_value is None:
+            stack = self.transactions[0].vin[0].script_witness.stack
+            if len(stack) != 1 or len(stack[0]) != 32:
+                raise BTClibValueError("invalid coinbase witness reserved value")
+            witness_reserved_value = stack[0]
+        return _HF(self.witness_merkle_root() + witness_reserved_value)
+
+    def add_witness_commitment(
+        self, witness_reserved_value: bytes = b"\x00" * 32
+    ) -> bytes:
+        """Add the BIP141 witness commitment to the coinbase, returning it.
+
+        For block templates: the coinbase witness is set to
+        the witness reserved value and the commitment output is appended,
+        replacing any previous commitment output.
+        The coinbase wtxid being zero, the commitment does not depend
+        on the coinbase; the coinbase txid changes instead:
+        the header merkle root has to be updated afterwards.
+        """
+        if len(witness_reserved_value) != 32:
+            err_msg = "invalid witness reserved value length: "
+            err_msg += f"{len(witness_reserved_value)} bytes instead of 32"
+            raise BTClibValueError(err_msg)
+        commitment = self.compute_witness_commitment(witness_reserved_value)
+
+        coinbase = self.transactions[0]
+        coinbase.unfreeze()
+        coinbase.vin[0].script_witness = Witness([witness_reserved_value])
+        vout = [
+            tx_out
+            for tx_out in coinbase.vout
+            if not _is_witness_commitment(tx_out.script_pub_key.script)
+        ]
+        vout.append(TxOut(0, _WITNESS_COMMITMENT_HEADER + commitment))
+        coinbase.vout = vout
+        # the coinbase size has changed
+        object.__setattr__(self, "_size", None)
+        return commitment
+
+    def assert_valid_witness_commitment(self) -> None:
+        """Assert the BIP141 witness commitment validity.
+
+        Blocks without witness commitment must not have witness data.
+        """
+        commitment = self.witness_commitment()
+        if commitment is None:
+            if self.has_segwit_tx():
+                raise BTClibValueError("unexpected witness data: no commitment")
+            return
+        computed = self.compute_witness_commitment()
+        if commitment != computed:
+            err_msg = f"invalid witness commitment: {commitment.hex()}"
+            err_msg += f" instead of: {computed.hex()}"
+            raise BTClibValueError(err_msg)
 
     def assert_valid(self) -> None:
+        self._assert_valid()
+
+    def _assert_valid(self, check_transactions: bool = True) -> None:
+        "Assert the block validity, optionally skipping the per-tx checks."
 
         self.header.assert_valid()
 
         if not self.transactions[0].is_coinbase():
             raise BTClibValueError("first transaction is not a coinbase")
 
-        for transaction in self.transactions[1:]:
-            transaction.assert_valid()
+        if check_transactions:
+            for transaction in self.transactions[1:]:
+                transaction.assert_valid()
 
         self.assert_valid_merkle_root()
+        # stripped (witness-less) blocks keep the commitment, not the witnesses
+        if self.has_segwit_tx():
+            self.assert_valid_witness_commitment()
 
     def serialize(
         self, include_witness: bool = True, check_validity: bool = True
@@ -149,14 +311,91 @@ class Block:
 
     @classmethod
     def parse(
-        cls: Type["Block"], data: BinaryData, check_validity: bool = True
+        cls: Type["Block"],
+        data: BinaryData,
+        check_validity: bool = True,
+        frozen: bool = False,
+        max_workers: Optional[int] = 1,
     ) -> "Block":
-        "Return a Block by parsing binary data."
+        """Return a Block by parsing binary data.
+
+        If frozen, header and transactions are parsed frozen
+        and the block size is recorded while parsing (see Block.freeze).
+
+        Transactions are parsed, validated and hashed in a process pool
+        if max_workers is greater than one or, when max_workers is None,
+        if there are many transactions.
+        The default is a sequential parse, as the parsed transactions
+        have to be pickled back from the pool and
+        process pool workers (e.g. map_blocks ones) cannot start a pool.
+        """
 
         stream = bytesio_from_binarydata(data)
-        header = BlockHeader.parse(stream)
+        start = stream.tell()
+        if max_workers != 1:
+            block = cls._parse_parallel(stream, check_validity, frozen, max_workers)
+            if block is not None:
+                return block
+            stream.seek(start)
+
+        header = BlockHeader.parse(stream, frozen=frozen)
         n = var_int.parse(stream)
         # TODO: is a block required to have a coinbase tx?
-        transactions = [Tx.parse(stream) for _ in range(n)]
+        transactions = [Tx.parse(stream, frozen=frozen) for _ in range(n)]
 
-        return cls(header, transactions, check_validity)
+        block = cls(header, transactions, False)
+        if check_validity:
+            # transactions have already been validated while parsed
+            block._assert_valid(check_transactions=False)
+        if frozen:
+            object.__setattr__(block, "_size", stream.tell() - start)
+        return block
+
+    @classmethod
+    def _parse_parallel(
+        cls: Type["Block"],
+        stream: Any,
+        check_validity: bool,
+        frozen: bool,
+        max_workers: Optional[int],
+    ) -> Optional["Block"]:
+        """Return a Block parsing its transactions in a process pool.
+
+        The raw transactions are located in a single pass and
+        contiguous runs of them are sent to the workers,
+        which parse, validate and hash them (as frozen transactions).
+        Return None if not worth it.
+        """
+
+        start = stream.tell()
+        data = memoryview(stream.read())
+        tx_views = list(block_tx_views(data))
+        if max_workers is None and len(tx_views) < _MIN_PARALLEL_TRANSACTIONS:
+            return None
+        end = tx_views[-1].end if tx_views else len(data)
+        stream.seek(start + end)
+
+        workers = max_workers or os.cpu_count() or 1
+        chunk_size = max(1, ceil(len(tx_views) / (4 * workers)))
+        jobs = []
+        for i in range(0, len(tx_views), chunk_size):
+            chunk = tx_views[i : i + chunk_size]
+            raw_txs = bytes(data[chunk[0].offset : chunk[-1].end])
+            jobs.append((raw_txs, len(chunk)))
+        del tx_views
+        with ProcessPoolExecutor(workers) as executor:
+            transactions = [tx for txs in executor.map(_parse_txs, jobs) for tx in txs]
+
+        header = BlockHeader.parse(bytes(data[:80]), frozen=frozen)
+        data.release()
+        block = cls(header, transactions, False)
+        if check_validity:
+            # transactions have been validated by the workers and are
+            # still frozen: the merkle root uses the cached ids
+            block._assert_valid(check_transactions=False)
+        if frozen:
+            object.__setattr__(block, "_size", end)
+        else:
+            for tx in transactions:
+                tx.unfreeze()
+        return block
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Memory-mapped store of consecutive 80-byte block headers.
+
+The headers file is the plain concatenation of serialized headers
+(e.g. the Electrum blockchain_headers file),
+the first one being at a given height (zero for the genesis block).
+
+The whole chain is validated in a single pass over the raw records,
+without BlockHeader objects:
+proof-of-work, previous block hash linkage, median time past
+and difficulty retargeting.
+Targets and work are computed with integer arithmetic,
+once for each distinct bits value.
+Cumulative chainwork is an integer prefix sum,
+from which hash rate is estimated over windows of headers.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx.block_header import BlockHeader
+
+HEADER_SIZE = 80
+# difficulty retargeting: every two weeks of 10 minutes blocks
+RETARGET_INTERVAL = 2016
+TARGET_TIMESPAN = 14 * 24 * 60 * 60
+_MEDIAN_TIME_SPAN = 11
+# proof-of-work limit (as bits) and difficulty retargeting
+# (testnet min-difficulty blocks are not supported: no retargeting checks)
+_POW_PARAMS: Dict[str, Tuple[int, bool]] = {
+    "mainnet": (0x1D00FFFF, True),
+    "testnet": (0x1D00FFFF, False),
+    "regtest": (0x207FFFFF, False),
+}
+_HEADER_FORMAT = struct.Struct("<i32s32sIII")
+
+
+def target_from_bits(bits: int) -> int:
+    """Return the target encoded by the compact bits 0xaabbccdd.
+
+    As in Bitcoin Core, the target is negative (i.e. invalid)
+    if the sign bit 0x00800000 is set.
+    """
+    significand = bits & 0x007FFFFF
+    exponent = bits >> 24
+    if exponent <= 3:
+        target = significand >> (8 * (3 - exponent))
+    else:
+        target = significand << (8 * (exponent - 3))
+    return -target if bits & 0x00800000 else target
+
+
+def bits_from_target(target: int) -> int:
+    "Return the compact bits encoding of the target."
+    size = (target.bit_length() + 7) // 8
+    if size <= 3:
+        significand = target << (8 * (3 - size))
+    else:
+        significand = target >> (8 * (size - 3))
+    # the sign bit must not be set
+    if significand & 0x00800000:
+        significand >>= 8
+        size += 1
+    return significand | size << 24
+
+
+def work_from_bits(bits: int) -> int:
+    "Return the expected number of hashes for the compact bits target."
+    target = target_from_bits(bits)
+    # no work for invalid targets, as in Bitcoin Core
+    return (1 << 256) // (target + 1) if target > 0 else 0
+
+
+def retarget_bits(bits: int, timespan: int, pow_limit_bits: int = 0x1D00FFFF) -> int:
+    """Return the bits of the next retarget period.
+
+    The timespan of the last period is clamped to
+    a factor of four of the target timespan.
+    """
+    timespan = min(max(timespan, TARGET_TIMESPAN // 4), TARGET_TIMESPAN * 4)
+    target = target_from_bits(bits) * timespan // TARGET_TIMESPAN
+    target = min(target, target_from_bits(pow_limit_bits))
+    return bits_from_target(target)
+
+
+def _hash256(data: memoryview) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def _median_time(timestamps: List[int]) -> int:
+    "Return the median of the last timestamps, as Bitcoin Core does."
+    last = sorted(timestamps[-_MEDIAN_TIME_SPAN:])
+    return last[len(last) // 2]
+
+
+class HeaderStore:
+    """Memory-mapped file of consecutive 80-byte block headers.
+
+    Heights are absolute, the first record being at the given height.
+    """
+
+    def __init__(self, filename: str, network: str = "mainnet", height: int = 0):
+        self.filename = filename
+        self.network = network
+        self.height = height
+        self._map: Optional[mmap.mmap] = None
+        with open(filename, "rb") as file_:
+            size = os.fstat(file_.fileno()).st_size
+            if size % HEADER_SIZE:
+                raise BTClibValueError(f"invalid header file size: {size}")
+            if size:
+                self._map = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map if self._map is not None else b"")
+        self._chainwork: List[int] = []
+
+    def close(self) -> None:
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+
+    def __enter__(self) -> "HeaderStore":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._view) // HEADER_SIZE
+
+    @property
+    def tip_height(self) -> int:
+        return self.height + len(self) - 1
+
+    def _index(self, height: int) -> int:
+        i = height - self.height
+        if not 0 <= i < len(self):
+            raise BTClibValueError(f"invalid height: {height}")
+        return i
+
+    def raw_header(self, height: int) -> memoryview:
+        "Return the serialized header at the given height."
+        i = self._index(height) * HEADER_SIZE
+        return self._view[i : i + HEADER_SIZE]
+
+    def header(self, height: int, check_validity: bool = True) -> BlockHeader:
+        "Return the header at the given height."
+        return BlockHeader.parse(bytes(self.raw_header(height)), check_validity)
+
+    def headers(self) -> Iterator[BlockHeader]:
+        for i in range(len(self)):
+            yield self.header(self.height + i, False)
+
+    def hash(self, height: int) -> bytes:
+        "Return the (reversed) hash of the header at the given height."
+        return _hash256(self.raw_header(height))[::-1]
+
+    def assert_valid(self) -> None:
+        """Assert the validity of the whole chain of headers.
+
+        Checks needing headers before the first one of the store
+        (i.e. its previous block hash and the retargeting of its period)
+        are skipped, while the median time past
+        is computed from the available headers only.
+        """
+
+        pow_limit_bits, retargeting = _POW_PARAMS[self.network]
+        pow_limit = target_from_bits(pow_limit_bits)
+        targets: Dict[int, int] = {}
+        timestamps: List[int] = []
+        prev_hash = b""
+        prev_bits = 0
+        view = self._view
+        for i, fields in enumerate(_HEADER_FORMAT.iter_unpack(view)):
+            height = self.height + i
+            _, previous_block_hash, _, timestamp, bits, _ = fields
+            hash_ = _hash256(view[i * HEADER_SIZE : (i + 1) * HEADER_SIZE])
+
+            if height == 0:
+                if hash_[::-1] != NETWORKS[self.network].genesis_block:
+                    raise BTClibValueError("invalid genesis block")
+            elif i and previous_block_hash != prev_hash:
+                err_msg = f"invalid previous block hash at height {height}"
+                raise BTClibValueError(err_msg)
+
+            target = targets.get(bits)
+            if target is None:
+                target = targets[bits] = target_from_bits(bits)
+                if not 0 < target <= pow_limit:
+                    err_msg = f"invalid bits at height {height}: {bits:08x}"
+                    raise BTClibValueError(err_msg)
+            if int.from_bytes(hash_, byteorder="little") >= target:
+                raise BTClibValueError(f"invalid proof-of-work at height {height}")
+
+            if timestamps and timestamp <= _median_time(timestamps):
+                err_msg = f"invalid timestamp at height {height}: {timestamp}"
+                err_msg += " not after median time past"
+                raise BTClibValueError(err_msg)
+
+            if retargeting and i:
+                expected_bits = prev_bits
+                if height % RETARGET_INTERVAL == 0:
+                    first = i - RETARGET_INTERVAL
+                    if first < 0:
+                        # period start not available
+                        expected_bits = bits
+                    else:
+                        timespan = timestamps[-1] - timestamps[first]
+                        expected_bits = retarget_bits(
+                            prev_bits, timespan, pow_limit_bits
+                        )
+                if bits != expected_bits:
+                    err_msg = f"invalid bits at height {height}: {bits:08x}"
+                    err_msg += f" instead of {expected_bits:08x}"
+                    raise BTClibValueError(err_msg)
+
+            timestamps.append(timestamp)
+            prev_hash = hash_
+            prev_bits = bits
+
+    def chainwork(self) -> List[int]:
+        """Return the cumulative chainwork, for each header of the store.
+
+        The work before the first header of the store is not included.
+        """
+        if len(self._chainwork) != len(self):
+            works: Dict[int, int] = {}
+            chainwork = 0
+            self._chainwork = []
+            for (bits,) in struct.iter_unpack("<72xI4x", self._view):
+                work = works.get(bits)
+                if work is None:
+                    work = works[bits] = work_from_bits(bits)
+                chainwork += work
+                self._chainwork.append(chainwork)
+        return self._chainwork
+
+    def hash_rate(self, height: Optional[int] = None, window: int = 120) -> int:
+        """Return the estimated hash rate, in hashes per second.
+
+        As Bitcoin Core getnetworkhashps, it is the work of the window
+        of blocks ending at the given height (the tip by default)
+        divided by the span between the minimum and maximum timestamps
+        of the window and its previous block, zero if they are equal.
+        """
+
+        if height is None:
+            height = self.tip_height
+        end = self._index(height)
+        start = end - window
+        if window < 1 or start < 0:
+            raise BTClibValueError(f"invalid window: {window}")
+        chainwork = self.chainwork()
+        work = chainwork[end] - chainwork[start]
+        view = self._view[start * HEADER_SIZE : (end + 1) * HEADER_SIZE]
+        timestamps = [timestamp for (timestamp,) in struct.iter_unpack("<68xI8x", view)]
+        timespan = max(timestamps) - min(timestamps)
+        return work // timespan if timespan else 0
+
+
+def write_header_file(
+    filename: str, headers: Iterable[Union[BlockHeader, bytes]], append: bool = False
+) -> None:
+    "Write (or append) block headers to a headers file."
+    with open(filename, "ab" if append else "wb") as file_:
+        for header in headers:
+            if isinstance(header, BlockHeader):
+                header = header.serialize(check_validity=False)
+            if len(header) != HEADER_SIZE:
+                raise BTClibValueError(f"invalid header size: {len(header)}")
+            file_.write(header)
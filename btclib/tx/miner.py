@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Toy block mining (e.g. for regtest fixtures).
+
+The nonce is ground without serializing the header again:
+the SHA-256 state after the first 64 header bytes (the midstate)
+is computed once and copied for each nonce,
+so that only the last 16 bytes are hashed.
+
+When the nonce space is exhausted, the extranonce
+appended to the coinbase script_sig is incremented:
+the merkle root is then updated hashing the new coinbase txid
+with the precomputed coinbase Merkle branch,
+without rebuilding the whole tree.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash256
+from btclib.merkle import MerkleTree
+from btclib.tx.blocks import Block
+
+# expected hashes below which process pool start-up is not worth it
+_MIN_PARALLEL_WORK = 1 << 20
+
+
+class MiningStats(NamedTuple):
+    hashes: int
+    seconds: float
+
+    @property
+    def hash_rate(self) -> float:
+        "Return the hashes per second."
+        return self.hashes / self.seconds if self.seconds else 0.0
+
+
+def _grind(job: Tuple[bytes, int, int, int]) -> Tuple[Optional[int], int]:
+    """Grind the nonces in [start, stop) for the 76 bytes header prefix.
+
+    Return the first valid nonce (if any) and the number of hashes.
+    """
+    header_prefix, target, start, stop = job
+    midstate = hashlib.sha256(header_prefix[:64])
+    tail = header_prefix[64:]
+    sha256 = hashlib.sha256
+    for nonce in range(start, stop):
+        h = midstate.copy()
+        h.update(tail + nonce.to_bytes(4, byteorder="little"))
+        if int.from_bytes(sha256(h.digest()).digest(), byteorder="little") < target:
+            return nonce, nonce - start + 1
+    return None, stop - start
+
+
+def _rounds(
+    header_prefix: bytes, target: int, max_nonce: int, batch_size: int, workers: int
+) -> Iterator[List[Tuple[bytes, int, int, int]]]:
+    "Yield rounds of nonce range jobs, one for each worker."
+    # zero is not a valid nonce
+    for round_start in range(1, max_nonce + 1, batch_size * workers):
+        round_stop = min(round_start + batch_size * workers, max_nonce + 1)
+        yield [
+            (header_prefix, target, start, min(start + batch_size, round_stop))
+            for start in range(round_start, round_stop, batch_size)
+        ]
+
+
+def mine_block(
+    block: Block,
+    extranonce_size: int = 4,
+    max_nonce: int = 0xFFFFFFFF,
+    batch_size: int = 1 << 16,
+    max_workers: Optional[int] = None,
+) -> MiningStats:
+    """Mine the block in place, returning the hashing statistics.
+
+    Header nonce and merkle root are set, the extranonce being
+    appended to the coinbase script_sig as extranonce_size
+    little-endian bytes; the other header fields are left untouched.
+    Nonces from 1 to max_nonce are tried before rolling the extranonce,
+    the lowest valid one being selected: the result does not depend
+    on the number of workers.
+
+    Nonce ranges of batch_size are ground in a process pool
+    if max_workers is greater than one or, when max_workers is None,
+    if the target requires many hashes.
+    """
+
+    coinbase = block.transactions[0]
+    if not coinbase.is_coinbase():
+        raise BTClibValueError("first transaction is not a coinbase")
+    # in place changes follow
+    block.unfreeze()
+    header = block.header
+    target = int.from_bytes(header.target, byteorder="big")
+    tree = MerkleTree([tx.id[::-1] for tx in block.transactions], hash256)
+    branch = tree.proof(0)
+    script_sig = coinbase.vin[0].script_sig
+
+    if max_workers is None:
+        parallel = (1 << 256) // (target + 1) >= _MIN_PARALLEL_WORK
+    else:
+        parallel = max_workers > 1
+    workers = (max_workers or os.cpu_count() or 1) if parallel else 1
+    executor = ProcessPoolExecutor(workers) if parallel else None
+
+    hashes = 0
+    start_time = time.perf_counter()
+    try:
+        for extranonce in range(1 << (8 * extranonce_size)):
+            extranonce_bytes = extranonce.to_bytes(extranonce_size, byteorder="little")
+            coinbase.vin[0].script_sig = script_sig + extranonce_bytes
+            merkle_root = coinbase.id[::-1]
+            # the coinbase is always the left node
+            for sibling in branch:
+                merkle_root = hash256(merkle_root + sibling)
+            header.merkle_root = merkle_root[::-1]
+            header_prefix = header.serialize(check_validity=False)[:76]
+
+            for jobs in _rounds(header_prefix, target, max_nonce, batch_size, workers):
+                if executor is None:
+                    results = [_grind(job) for job in jobs]
+                else:
+                    results = list(executor.map(_grind, jobs))
+                hashes += sum(n for _, n in results)
+                nonces = [nonce for nonce, _ in results if nonce is not None]
+                if nonces:
+                    header.nonce = nonces[0]
+                    return MiningStats(hashes, time.perf_counter() - start_time)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    raise BTClibValueError("nonce and extranonce space exhausted")
@@ -25,6 +25,7 @@ from btclib.utils import bytes_from_octets, bytesio_from_binarydata
 # FIXME make it frozen
 @dataclass
 class OutPoint:
+    __slots__ = ("tx_id", "vout")
     tx_id: bytes
     vout: int
 
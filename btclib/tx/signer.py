@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Whole-transaction signing.
+
+sign_tx signs all the inputs of a transaction
+whose prevout can be spent with a key from the key provider,
+writing their script_sig/script_witness:
+p2pkh, p2wpkh, p2sh-p2wpkh and p2tr (key path) inputs are supported.
+
+All signature hashes are computed first, sharing a single SigHashCache;
+then the signatures (i.e. the expensive part)
+are computed in a process pool when inputs are many.
+Each distinct private key is parsed (and its public key derived) only once.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.curve import mult
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash160
+from btclib.script import sig_hash
+from btclib.script.compiled import compile_script
+from btclib.script.script import serialize
+from btclib.script.taproot import output_prvkey
+from btclib.script.witness import Witness
+from btclib.to_prv_key import PrvKey, prv_keyinfo_from_prv_key
+from btclib.tx.tx import Tx
+from btclib.tx.tx_out import TxOut
+
+# given the input index and its prevout,
+# return the private key to sign it or None to skip it
+KeyProvider = Callable[[int, TxOut], Optional[PrvKey]]
+
+# below this number of signatures a process pool is not worth its startup
+_MIN_PARALLEL_SIGNATURES = 64
+
+# (is ECDSA, private key, BIP340 x_Q, message hash, hash_type)
+_SigJob = Tuple[bool, int, int, bytes, int]
+
+
+class _KeyInfo:
+    "Public data derived, only once, from a private key."
+
+    def __init__(self, q: int, compressed: bool) -> None:
+        self.q = q
+        Q = mult(q)
+        self.pub_key = bytes_from_point(Q, compressed=compressed)
+        self.h160 = hash160(self.pub_key)
+        compressed_pub_key = bytes_from_point(Q, compressed=True)
+        self.compressed_pub_key = compressed_pub_key
+        self.compressed_h160 = hash160(compressed_pub_key)
+        self._taproot_keys: Optional[Tuple[int, int]] = None
+
+    @property
+    def taproot_keys(self) -> Tuple[int, int]:
+        "Return the BIP340 (q, x_Q) key-pair of the key path output key."
+        if self._taproot_keys is None:
+            self._taproot_keys = ssa.gen_keys(output_prvkey(self.q))
+        return self._taproot_keys
+
+    @property
+    def taproot_pub_key(self) -> bytes:
+        "Return the x-only key path output key."
+        return self.taproot_keys[1].to_bytes(32, byteorder="big", signed=False)
+
+
+def _sign(job: _SigJob) -> bytes:
+    is_ecdsa, q, x_Q, msg_hash, hash_type = job
+    if is_ecdsa:
+        sig = dsa.sign_(msg_hash, q).serialize(check_validity=False)
+        return sig + hash_type.to_bytes(1, byteorder="little", signed=False)
+    # the already known (gen_keys) key-pair is not derived again
+    ssa_sig = ssa._sign_with_keys_(msg_hash, q, x_Q)  # pylint: disable=protected-access
+    sig = ssa_sig.serialize(check_validity=False)
+    if hash_type == sig_hash.DEFAULT:
+        return sig
+    return sig + hash_type.to_bytes(1, byteorder="little", signed=False)
+
+
+def sign_tx(
+    tx: Tx,
+    prevouts: Sequence[TxOut],
+    key_provider: KeyProvider,
+    hash_type: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[int]:
+    """Sign the inputs of a transaction, returning their indexes.
+
+    The signed inputs have their script_sig/script_witness overwritten;
+    inputs for which the key provider returns None are left untouched.
+
+    If not provided, the hash_type is SIGHASH_ALL for ECDSA signatures
+    and SIGHASH_DEFAULT for taproot (BIP340) signatures;
+    SIGHASH_DEFAULT is invalid for ECDSA signatures.
+
+    Signatures are computed in a process pool
+    if max_workers is greater than one or, when max_workers is None,
+    if there are many inputs to be signed.
+    """
+
+    if len(prevouts) != len(tx.vin):
+        err_msg = f"invalid number of prevouts: {len(prevouts)}"
+        err_msg += f" instead of {len(tx.vin)}"
+        raise BTClibValueError(err_msg)
+    if hash_type is not None:
+        sig_hash.assert_valid_hash_type(hash_type)
+
+    cache = sig_hash.SigHashCache(tx, prevouts)
+    amounts = [prevout.value for prevout in prevouts]
+    script_pub_keys = [prevout.script_pub_key for prevout in prevouts]
+    key_infos: Dict[Tuple[int, bool], _KeyInfo] = {}
+
+    signed: List[int] = []
+    jobs: List[_SigJob] = []
+    # the input type and the public key to be written with the signature
+    details: List[Tuple[str, bytes]] = []
+    for i, prevout in enumerate(prevouts):
+        prv_key = key_provider(i, prevout)
+        if prv_key is None:
+            continue
+        q, _, compressed = prv_keyinfo_from_prv_key(prv_key)
+        key_info = key_infos.get((q, compressed))
+        if key_info is None:
+            key_info = _KeyInfo(q, compressed)
+            key_infos[(q, compressed)] = key_info
+
+        compiled = compile_script(prevout.script_pub_key.script)
+        script_type, payload = compiled.type, compiled.payload
+        ecdsa_hash_type = sig_hash.ALL if hash_type is None else hash_type
+        if script_type != "p2tr" and ecdsa_hash_type == sig_hash.DEFAULT:
+            err_msg = f"invalid hash type for ECDSA input {i}: SIGHASH_DEFAULT"
+            raise BTClibValueError(err_msg)
+        if script_type == "p2tr":
+            if key_info.taproot_pub_key != payload:
+                raise BTClibValueError(f"key mismatch for input {i}")
+            tr_hash_type = sig_hash.DEFAULT if hash_type is None else hash_type
+            msg_hash = sig_hash.taproot(
+                tx, i, amounts, script_pub_keys, tr_hash_type, 0, b"", b"", cache
+            )
+            tr_q, x_Q = key_info.taproot_keys
+            jobs.append((False, tr_q, x_Q, msg_hash, tr_hash_type))
+            details.append((script_type, b""))
+        elif script_type == "p2pkh":
+            if payload == key_info.h160:
+                pub_key = key_info.pub_key
+            elif payload == key_info.compressed_h160:
+                pub_key = key_info.compressed_pub_key
+            else:
+                raise BTClibValueError(f"key mismatch for input {i}")
+            msg_hash = sig_hash.legacy(compiled.script, tx, i, ecdsa_hash_type)
+            jobs.append((True, q, 0, msg_hash, ecdsa_hash_type))
+            details.append((script_type, pub_key))
+        elif script_type in ("p2wpkh", "p2sh"):
+            h160 = key_info.compressed_h160
+            if script_type == "p2sh":
+                redeem_script = serialize(["OP_0", h160])
+                if payload != hash160(redeem_script):
+                    raise BTClibValueError(f"key mismatch for input {i}")
+            elif payload != h160:
+                raise BTClibValueError(f"key mismatch for input {i}")
+            script_code = serialize(
+                ["OP_DUP", "OP_HASH160", h160, "OP_EQUALVERIFY", "OP_CHECKSIG"]
+            )
+            msg_hash = sig_hash.segwit_v0(
+                script_code, tx, i, ecdsa_hash_type, prevout.value, cache
+            )
+            jobs.append((True, q, 0, msg_hash, ecdsa_hash_type))
+            details.append((script_type, key_info.compressed_pub_key))
+        else:
+            err_msg = f"unsupported script type for input {i}: {script_type}"
+            raise BTClibValueError(err_msg)
+        signed.append(i)
+
+    if max_workers is None:
+        parallel = len(jobs) >= _MIN_PARALLEL_SIGNATURES
+    else:
+        parallel = max_workers > 1
+    if parallel:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (4 * workers))
+        with ProcessPoolExecutor(workers) as executor:
+            sigs = list(executor.map(_sign, jobs, chunksize=chunksize))
+    else:
+        sigs = [_sign(job) for job in jobs]
+
+    # the inputs are changed in place: drop the cached identifiers
+    tx.unfreeze()
+    for i, sig, (script_type, pub_key) in zip(signed, sigs, details):
+        tx_in = tx.vin[i]
+        if script_type == "p2pkh":
+            tx_in.script_sig = serialize([sig, pub_key])
+            tx_in.script_witness = Witness()
+        elif script_type == "p2tr":
+            tx_in.script_sig = b""
+            tx_in.script_witness = Witness([sig])
+        else:
+            tx_in.script_sig = b""
+            if script_type == "p2sh":
+                redeem_script = serialize(["OP_0", hash160(pub_key)])
+                tx_in.script_sig = serialize([redeem_script])
+            tx_in.script_witness = Witness([sig, pub_key])
+
+    return signed
@@ -29,7 +29,17 @@ https://en.bitcoin.it/wiki/Timelock
 from dataclasses import dataclass
 from io import SEEK_CUR
 from math import ceil
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Type, Union
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
 
 from btclib import var_int
 from btclib.alias import BinaryData
@@ -43,8 +53,17 @@ from btclib.utils import bytesio_from_binarydata
 _SEGWIT_MARKER = b"\x00\x01"
 
 
+class _TxCache(NamedTuple):
+    "Cached values of a frozen transaction."
+    id: bytes
+    hash: bytes
+    size: int
+    base_size: int
+
+
 @dataclass
 class Tx:
+    __slots__ = ("version", "lock_time", "vin", "vout", "_cache")
     # 4 bytes, _signed_ little endian
     version: int
     # 0	Not locked
@@ -72,6 +91,8 @@ class Tx:
     @property
     def id(self) -> bytes:
         "Return the transaction id."
+        if self._cache is not None:
+            return self._cache.id
         serialized_ = self.serialize(include_witness=False, check_validity=False)
         hash256_ = hash256(serialized_)
         return hash256_[::-1]
@@ -82,6 +103,8 @@ class Tx:
 
         It differs from tx_id for witness transactions.
         """
+        if self._cache is not None:
+            return self._cache.hash
         serialized_ = self.serialize(include_witness=True, check_validity=False)
         hash256_ = hash256(serialized_)
         return hash256_[::-1]
@@ -89,6 +112,8 @@ class Tx:
     @property
     def size(self) -> int:
         "Return the transaction size."
+        if self._cache is not None:
+            return self._cache.size
         return len(self.serialize(include_witness=True, check_validity=False))
 
     @property
@@ -101,6 +126,8 @@ class Tx:
 
     @property
     def weight(self) -> int:
+        if self._cache is not None:
+            return self._cache.base_size * 3 + self._cache.size
         no_wit = len(self.serialize(include_witness=False, check_validity=False)) * 3
         wit = len(self.serialize(include_witness=True, check_validity=False))
         return no_wit + wit
@@ -116,6 +143,31 @@ class Tx:
     def is_coinbase(self) -> bool:
         return len(self.vin) == 1 and self.vin[0].is_coinbase()
 
+    @property
+    def is_frozen(self) -> bool:
+        return self._cache is not None
+
+    def freeze(self) -> "Tx":
+        """Cache id, hash, size and weight, returning the transaction itself.
+
+        Assigning a Tx attribute unfreezes it, dropping the cached values;
+        in place changes (e.g. of its inputs and outputs) are not detected:
+        unfreeze the transaction before making them.
+        """
+        base = self.serialize(include_witness=False, check_validity=False)
+        full = self.serialize(include_witness=True, check_validity=False)
+        cache = _TxCache(hash256(base)[::-1], hash256(full)[::-1], len(full), len(base))
+        object.__setattr__(self, "_cache", cache)
+        return self
+
+    def unfreeze(self) -> None:
+        object.__setattr__(self, "_cache", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # any assignment drops the cached values
+        object.__setattr__(self, "_cache", None)
+        object.__setattr__(self, name, value)
+
     def __init__(
         self,
         version: int = 1,
@@ -125,6 +177,7 @@ class Tx:
         check_validity: bool = True,
     ) -> None:
 
+        self._cache: Optional[_TxCache] = None
         self.version = version
         self.lock_time = lock_time
         # https://docs.python.org/3/tutorial/controlflow.html#default-argument-values
@@ -234,10 +287,16 @@ class Tx:
         cls: Type["Tx"],
         data: BinaryData,
         check_validity: bool = True,
+        frozen: bool = False,
     ) -> "Tx":
-        "Return a Tx by parsing binary data."
+        """Return a Tx by parsing binary data.
+
+        If frozen, id, hash, size and weight are computed
+        from the parsed bytes and cached (see Tx.freeze).
+        """
 
         stream = bytesio_from_binarydata(data)
+        start = stream.tell()
 
         # version is a signed int (int32_t) in bitcoin_core
         # However there are at least two transactions:
@@ -253,11 +312,13 @@ class Tx:
             # Change stream position: seek to byte offset relative to position
             stream.seek(-2, SEEK_CUR)  # current position
 
+        body_start = stream.tell()
         n = var_int.parse(stream)
         vin = [TxIn.parse(stream) for _ in range(n)]
 
         n = var_int.parse(stream)
         vout = [TxOut.parse(stream) for _ in range(n)]
+        body_end = stream.tell()
 
         if segwit:
             for tx_in in vin:
@@ -265,4 +326,21 @@ class Tx:
 
         lock_time = int.from_bytes(stream.read(4), byteorder="little", signed=False)
 
-        return cls(version, lock_time, vin, vout, check_validity)
+        tx = cls(version, lock_time, vin, vout, check_validity)
+        if not frozen:
+            return tx
+        # a marker without witnesses is not serialized back
+        if segwit and not tx.is_segwit():
+            return tx.freeze()
+
+        # hash the parsed bytes, instead of serializing them again
+        end = stream.tell()
+        stream.seek(start)
+        full = stream.read(end - start)
+        base = full
+        if segwit:
+            body = full[body_start - start : body_end - start]
+            base = full[:4] + body + full[-4:]
+        cache = _TxCache(hash256(base)[::-1], hash256(full)[::-1], len(full), len(base))
+        object.__setattr__(tx, "_cache", cache)
+        return tx
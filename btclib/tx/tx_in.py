@@ -13,7 +13,7 @@
 Dataclass encapsulating prev_out, script_sig, sequence, and script_witness.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any, Dict, Mapping, Type
 
 from btclib import var_bytes
@@ -28,6 +28,7 @@ TX_IN_COMPARES_WITNESS = True
 
 @dataclass
 class TxIn:
+    __slots__ = ("prev_out", "script_sig", "sequence", "script_witness")
     prev_out: OutPoint
     script_sig: bytes
     # If all TxIns have final (0xffffffff) sequence numbers
@@ -42,7 +43,7 @@ class TxIn:
     # lower than 0xFFFFFFFD to be meaningful,
     # all sequence locked transactions are opting into RBF.
     sequence: int
-    script_witness: Witness = field(compare=TX_IN_COMPARES_WITNESS)
+    script_witness: Witness
 
     @property
     def outpoint(self) -> OutPoint:
@@ -76,6 +77,19 @@ class TxIn:
         if check_validity:
             self.assert_valid()
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TxIn):
+            return NotImplemented  # pragma: no cover
+
+        # a field(compare=...) default would conflict with __slots__
+        if TX_IN_COMPARES_WITNESS and self.script_witness != other.script_witness:
+            return False
+        return (self.prev_out, self.script_sig, self.sequence) == (
+            other.prev_out,
+            other.script_sig,
+            other.sequence,
+        )
+
     def is_segwit(self) -> bool:
         # self.prev_out has no segwit information
         return self.script_witness.stack != []
@@ -15,11 +15,12 @@ Dataclass encapsulating value and script_pub_key
 """
 
 from dataclasses import dataclass
-from typing import Any, Dict, Mapping, Type, Union
+from typing import Any, Dict, Mapping, Optional, Type, Union
 
 from btclib import var_bytes
 from btclib.alias import BinaryData, Octets, String
 from btclib.amount import btc_from_sats, sats_from_btc
+from btclib.script.address_cache import AddressCache
 from btclib.script.script_pub_key import ScriptPubKey
 from btclib.utils import bytes_from_octets, bytesio_from_binarydata
 
@@ -27,6 +28,7 @@ from btclib.utils import bytes_from_octets, bytesio_from_binarydata
 # FIXME make it frozen
 @dataclass
 class TxOut:
+    __slots__ = ("value", "script_pub_key")
     # 8 bytes, unsigned little endian
     value: int  # denominated in satoshi
     script_pub_key: ScriptPubKey
@@ -117,6 +119,14 @@ class TxOut:
         )
 
     @classmethod
-    def from_address(cls: Type["TxOut"], value: int, address: String) -> "TxOut":
-        script_pub_key = ScriptPubKey.from_address(address)
+    def from_address(
+        cls: Type["TxOut"],
+        value: int,
+        address: String,
+        cache: Optional[AddressCache] = None,
+    ) -> "TxOut":
+        if cache is None:
+            script_pub_key = ScriptPubKey.from_address(address)
+        else:
+            script_pub_key = cache.script_pub_key(address)
         return cls(value, script_pub_key)
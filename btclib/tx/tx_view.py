@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Lazy, zero-copy views of serialized transactions.
+
+A TxView scans a serialized transaction once, recording field offsets:
+fields are decoded only when accessed and scripts are memoryview slices
+of the original buffer (e.g. a memory-mapped block file).
+txid and wtxid are hashed straight from the original bytes,
+skipping the segwit marker and the witnesses for the txid,
+without re-serializing the transaction.
+
+A full Tx is built only on demand, with TxView.to_tx.
+"""
+
+import hashlib
+from math import ceil
+from typing import Iterator, List, Tuple, Union
+
+from btclib.exceptions import BTClibValueError
+from btclib.script.witness import Witness
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def _hash256(*chunks: memoryview) -> bytes:
+    h = hashlib.sha256()
+    for chunk in chunks:
+        h.update(chunk)
+    return hashlib.sha256(h.digest()).digest()
+
+
+class _Scanner:
+    "Bounds-checked reader of a memoryview."
+
+    def __init__(self, view: memoryview, pos: int) -> None:
+        self.view = view
+        self.pos = pos
+
+    def skip(self, n: int) -> int:
+        "Skip n bytes, returning their start position."
+        start = self.pos
+        if start + n > len(self.view):
+            raise BTClibValueError(f"not enough data at offset {start}")
+        self.pos += n
+        return start
+
+    def var_int(self) -> int:
+        i = self.view[self.skip(1)]
+        if i < 0xFD:
+            return i
+        n = 2 if i == 0xFD else 4 if i == 0xFE else 8
+        start = self.skip(n)
+        return int.from_bytes(self.view[start : start + n], byteorder="little")
+
+    def var_bytes(self) -> Tuple[int, int]:
+        "Skip a var_int prefixed byte string, returning its (offset, length)."
+        length = self.var_int()
+        return self.skip(length), length
+
+
+class TxInView:
+    "Lazy view of a transaction input."
+
+    def __init__(
+        self,
+        view: memoryview,
+        offset: int,
+        script_sig: Tuple[int, int],
+        witness: List[Tuple[int, int]],
+    ) -> None:
+        self._view = view
+        self._offset = offset
+        self._script_sig = script_sig
+        self._witness = witness
+
+    @property
+    def prev_tx_id(self) -> bytes:
+        return bytes(self._view[self._offset : self._offset + 32])[::-1]
+
+    @property
+    def prev_vout(self) -> int:
+        vout = self._view[self._offset + 32 : self._offset + 36]
+        return int.from_bytes(vout, byteorder="little", signed=False)
+
+    @property
+    def script_sig(self) -> memoryview:
+        start, length = self._script_sig
+        return self._view[start : start + length]
+
+    @property
+    def sequence(self) -> int:
+        start = sum(self._script_sig)
+        sequence = self._view[start : start + 4]
+        return int.from_bytes(sequence, byteorder="little", signed=False)
+
+    @property
+    def witness(self) -> List[memoryview]:
+        return [self._view[start : start + n] for start, n in self._witness]
+
+    def is_coinbase(self) -> bool:
+        return self.prev_vout == 0xFFFFFFFF and not any(
+            self._view[self._offset : self._offset + 32]
+        )
+
+    def to_tx_in(self, check_validity: bool = True) -> TxIn:
+        return TxIn(
+            OutPoint(self.prev_tx_id, self.prev_vout, check_validity),
+            bytes(self.script_sig),
+            self.sequence,
+            Witness([bytes(element) for element in self.witness], check_validity),
+            check_validity,
+        )
+
+
+class TxOutView:
+    "Lazy view of a transaction output."
+
+    def __init__(self, view: memoryview, offset: int, script: Tuple[int, int]):
+        self._view = view
+        self._offset = offset
+        self._script = script
+
+    @property
+    def value(self) -> int:
+        value = self._view[self._offset : self._offset + 8]
+        return int.from_bytes(value, byteorder="little", signed=False)
+
+    @property
+    def script_pub_key(self) -> memoryview:
+        start, length = self._script
+        return self._view[start : start + length]
+
+    def to_tx_out(self, check_validity: bool = True) -> TxOut:
+        end = sum(self._script)
+        return TxOut.parse(bytes(self._view[self._offset : end]), check_validity)
+
+
+class TxView:
+    """Lazy, zero-copy view of a serialized transaction.
+
+    The transaction starts at the given offset of the buffer,
+    which may contain more data (e.g. a whole block):
+    the transaction ends at the end offset.
+    The buffer must not be modified while in use.
+    """
+
+    def __init__(self, data: Buffer, offset: int = 0) -> None:
+        view = memoryview(data)
+        scanner = _Scanner(view, offset)
+        scanner.skip(4)  # version
+        self.segwit = bytes(view[offset + 4 : offset + 6]) == b"\x00\x01"
+        if self.segwit:
+            scanner.skip(2)
+        self._view = view
+        self.offset = offset
+        self._body_start = scanner.pos
+
+        self._vin: List[Tuple[int, Tuple[int, int]]] = []
+        for _ in range(scanner.var_int()):
+            tx_in_offset = scanner.skip(36)
+            self._vin.append((tx_in_offset, scanner.var_bytes()))
+            scanner.skip(4)  # sequence
+        self._vout: List[Tuple[int, Tuple[int, int]]] = []
+        for _ in range(scanner.var_int()):
+            tx_out_offset = scanner.skip(8)
+            self._vout.append((tx_out_offset, scanner.var_bytes()))
+        self._body_end = scanner.pos
+
+        self._witnesses: List[List[Tuple[int, int]]] = []
+        if self.segwit:
+            for _ in self._vin:
+                n = scanner.var_int()
+                self._witnesses.append([scanner.var_bytes() for _ in range(n)])
+        else:
+            self._witnesses = [[] for _ in self._vin]
+
+        self._lock_time_start = scanner.skip(4)
+        self.end = scanner.pos
+        self._id = b""
+        self._hash = b""
+
+    @property
+    def version(self) -> int:
+        version = self._view[self.offset : self.offset + 4]
+        return int.from_bytes(version, byteorder="little", signed=False)
+
+    @property
+    def lock_time(self) -> int:
+        lock_time = self._view[self._lock_time_start : self.end]
+        return int.from_bytes(lock_time, byteorder="little", signed=False)
+
+    @property
+    def vin(self) -> List[TxInView]:
+        return [
+            TxInView(self._view, offset, script_sig, witness)
+            for (offset, script_sig), witness in zip(self._vin, self._witnesses)
+        ]
+
+    @property
+    def vout(self) -> List[TxOutView]:
+        return [TxOutView(self._view, offset, script) for offset, script in self._vout]
+
+    @property
+    def id(self) -> bytes:
+        "Return the transaction id."
+        if not self._id:
+            if self.segwit:
+                version = self._view[self.offset : self.offset + 4]
+                body = self._view[self._body_start : self._body_end]
+                lock_time = self._view[self._lock_time_start : self.end]
+                self._id = _hash256(version, body, lock_time)[::-1]
+            else:
+                self._id = self.hash
+        return self._id
+
+    @property
+    def hash(self) -> bytes:
+        "Return the transaction hash, differing from the id for segwit ones."
+        if not self._hash:
+            self._hash = _hash256(self._view[self.offset : self.end])[::-1]
+        return self._hash
+
+    @property
+    def size(self) -> int:
+        return self.end - self.offset
+
+    @property
+    def weight(self) -> int:
+        base_size = self.size
+        if self.segwit:
+            base_size -= 2 + self._lock_time_start - self._body_end
+        return base_size * 3 + self.size
+
+    @property
+    def vsize(self) -> int:
+        return ceil(self.weight / 4)
+
+    def is_segwit(self) -> bool:
+        return any(self._witnesses)
+
+    def is_coinbase(self) -> bool:
+        return len(self._vin) == 1 and self.vin[0].is_coinbase()
+
+    def to_tx(self, check_validity: bool = True) -> Tx:
+        "Return the full Tx."
+        return Tx.parse(bytes(self._view[self.offset : self.end]), check_validity)
+
+
+def block_tx_views(data: Buffer) -> Iterator[TxView]:
+    "Yield the views of the transactions of a serialized block."
+
+    view = memoryview(data)
+    scanner = _Scanner(view, 80)  # the block header
+    for _ in range(scanner.var_int()):
+        tx_view = TxView(view, scanner.pos)
+        scanner.pos = tx_view.end
+        yield tx_view
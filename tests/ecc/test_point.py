@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.ecc.point` module."
+
+import secrets
+
+import pytest
+
+from btclib.alias import INF
+from btclib.ecc.curve import CURVES, double_mult, mult, secp256k1
+from btclib.ecc.point import CurvePoint
+from btclib.ecc.sec_point import bytes_from_point
+from btclib.exceptions import BTClibTypeError, BTClibValueError
+
+
+def test_arithmetic() -> None:
+    ec = secp256k1
+    G = CurvePoint.generator(ec)
+    for _ in range(8):
+        a = 1 + secrets.randbelow(ec.n - 1)
+        b = 1 + secrets.randbelow(ec.n - 1)
+        A = a * G
+        B = G * b
+        assert A == mult(a)
+        assert mult(a) == A
+        assert (A + B).aff == ec.add(mult(a), mult(b))
+        assert (A + mult(b)).aff == ec.add(mult(a), mult(b))
+        assert (mult(b) + A).aff == ec.add(mult(a), mult(b))
+        assert (A - B).aff == mult(a - b)
+        assert (mult(a) - B).aff == mult(a - b)
+        assert (-A).aff == ec.negate(mult(a))
+        assert G.double_mult(a, b, B).aff == double_mult(a, ec.G, b, mult(b))
+        assert A.to_bytes() == bytes_from_point(mult(a))
+        assert A.to_bytes(False) == bytes_from_point(mult(a), compressed=False)
+        assert CurvePoint.from_octets(A.to_bytes()) == A
+        assert hash(A) == hash(mult(a))
+        # sequence protocol
+        assert tuple(A) == mult(a)
+        assert (A[0], A[1]) == (A.x, A.y)
+        assert len(A) == 2
+
+    A = CurvePoint.from_x(ec.G[0], ec)
+    assert A == G
+    assert (A - A).is_infinity
+    assert A - A == CurvePoint.infinity(ec)
+    assert A - A == INF
+    assert (A - A).aff == INF
+    assert A + CurvePoint.infinity(ec) == A
+    assert ec.n * A == CurvePoint.infinity(ec)
+    assert repr(A - A) == "CurvePoint(INF)"
+    assert repr(A) == f"CurvePoint({hex(ec.G[0])}, {hex(ec.G[1])})"
+    assert A != "not a point"
+
+
+def test_all_curves() -> None:
+    for ec in CURVES.values():
+        G = CurvePoint.generator(ec)
+        m = 1 + secrets.randbelow(ec.n - 1)
+        assert (m * G + G).aff == mult(m + 1, ec.G, ec)
+        assert (m * G - G).aff == mult(m - 1, ec.G, ec)
+        assert (2 * G).aff == ec.double_aff(ec.G)
+
+
+def test_lazy_validity_check() -> None:
+    ec = secp256k1
+    invalid = ec.G[0], ec.G[1] + 1
+
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        CurvePoint(invalid)
+
+    P = CurvePoint(invalid, check_validity=False)
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        P + CurvePoint.generator()
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        CurvePoint.generator() + P
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        CurvePoint.generator() + invalid
+    with pytest.raises(BTClibValueError, match="point not on curve"):
+        P.to_bytes()
+
+    with pytest.raises(BTClibValueError, match="point must be a tuple"):
+        CurvePoint((1, 2, 3))  # type: ignore
+
+    with pytest.raises(BTClibTypeError, match="not a point"):
+        CurvePoint.generator() + [1, 2]  # type: ignore
+
+    with pytest.raises(TypeError):
+        CurvePoint.generator() * CurvePoint.generator()  # type: ignore
+
+    with pytest.raises(BTClibValueError, match="points on different curves"):
+        CurvePoint.generator() + CurvePoint.generator(CURVES["secp256r1"])
+
+    INF_point = CurvePoint.infinity()
+    with pytest.raises(BTClibValueError, match="INF has no x-coordinate"):
+        INF_point.x  # pylint: disable=pointless-statement
+    with pytest.raises(BTClibValueError, match="INF has no y-coordinate"):
+        INF_point.y  # pylint: disable=pointless-statement
+    with pytest.raises(BTClibValueError, match="no bytes representation for "):
+        INF_point.to_bytes()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.ecc.sig_cache` module."
+
+from hashlib import sha256
+
+import pytest
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.sig_cache import SigCache, get_sig_cache, set_sig_cache
+from btclib.exceptions import BTClibValueError
+
+MSG_HASH = sha256(b"Satoshi Nakamoto").digest()
+
+
+def test_sig_cache() -> None:
+    cache = SigCache(2)
+    entries = [cache.entry("ecdsa", MSG_HASH, f"{i:02x}" * 33, b"") for i in range(3)]
+    assert len(set(entries)) == 3
+    # salted: different caches, different entries
+    assert SigCache().entry("ecdsa", MSG_HASH, "00" * 33, b"") != entries[0]
+    # unambiguous encoding of the verification inputs
+    assert cache.entry("a", b"bc", b"", b"") != cache.entry("a", b"b", b"c", b"")
+    assert cache.entry("a", b"b", b"", b"") != cache.entry("a", "b", b"", b"")
+
+    assert entries[0] not in cache
+    cache.add(entries[0])
+    cache.add(entries[1])
+    assert entries[0] in cache
+    # least recently used entry is evicted
+    cache.add(entries[2])
+    assert entries[1] not in cache
+    assert entries[0] in cache
+    assert entries[2] in cache
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (3, 2, 2)
+    assert info.hit_rate == 3 / 5
+
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 2, 0)
+    assert cache.cache_info().hit_rate == 0
+
+    with pytest.raises(BTClibValueError, match="invalid cache size: "):
+        SigCache(0)
+    with pytest.raises(BTClibValueError, match="invalid eviction policy: "):
+        SigCache(eviction="fifo")
+
+
+def test_random_eviction() -> None:
+    cache = SigCache(10, "random")
+    keys = [i.to_bytes(2, "big") for i in range(50)]
+    entries = [cache.entry("ecdsa", MSG_HASH, key, b"") for key in keys]
+    for entry in entries:
+        cache.add(entry)
+        cache.add(entry)
+    assert cache.cache_info().currsize == 10
+    assert sum(entry in cache for entry in entries) == 10
+    assert entries[-1] in cache
+
+
+def test_verify_with_sig_cache() -> None:
+    q = 0x1
+    dsa_sig = dsa.sign_(MSG_HASH, q)
+    Q = dsa.gen_keys(q)[1]
+    ssa_sig = ssa.sign_(MSG_HASH, q)
+    x_Q = ssa.gen_keys(q)[1]
+
+    assert get_sig_cache() is None
+    cache = SigCache()
+    set_sig_cache(cache)
+    try:
+        for _ in range(3):
+            assert dsa.verify_(MSG_HASH, Q, dsa_sig)
+            assert ssa.verify_(MSG_HASH, x_Q, ssa_sig)
+        assert cache.cache_info().hits == 4
+        assert cache.cache_info().currsize == 2
+
+        # failures are never cached
+        for _ in range(2):
+            assert not dsa.verify_(MSG_HASH[::-1], Q, dsa_sig)
+            assert not ssa.verify_(MSG_HASH[::-1], x_Q, ssa_sig)
+        assert cache.cache_info().currsize == 2
+
+        # different verification parameters, different entries
+        assert dsa.verify_(MSG_HASH, Q, dsa_sig, lower_s=False)
+        assert cache.cache_info().currsize == 3
+    finally:
+        set_sig_cache(None)
+    assert get_sig_cache() is None
@@ -76,6 +76,11 @@ def test_signature() -> None:
         ssa.assert_as_valid(msg, x_Q, sig_invalid)
 
     m_bytes = reduce_to_hlen(msg, hf)
+    # the already known key-pair is not derived again
+    k = ssa.det_nonce_(m_bytes, q, aux=32 * b"\x01")
+    sig_with_keys = ssa._sign_with_keys_(m_bytes, q, x_Q, k)
+    assert sig_with_keys == ssa.sign_(m_bytes, q, k)
+
     err_msg = "invalid size: 31 bytes instead of 32"
     with pytest.raises(BTClibValueError, match=err_msg):
         ssa.assert_as_valid_(m_bytes[:31], x_Q, sig)
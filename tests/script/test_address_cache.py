@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.script.address_cache` module."
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.script.address_cache import AddressCache
+from btclib.script.script_pub_key import ScriptPubKey, address, type_and_payload
+from btclib.tx.tx_out import TxOut
+
+ADDRESSES = [
+    "1PMycacnJaSqwwJqjawXBErnLsZ7RkXUAs",
+    "3DymAvEWH38HuzHZ3VwLus673bNZnYwNXu",
+    "bc1qg9stkxrszkdqsuj92lm4c7akvk36zvhqw7p6ck",
+    "bc1qqqqsyqcyq5rqwzqfpg9scrgwpugpzysnzs23v9ccrydpk8qarc0szrtjt7",
+    "bc1pqqqsyqcyq5rqwzqfpg9scrgwpugpzysnzs23v9ccrydpk8qarc0sg5tmnz",
+    "tb1qqqqsyqcyq5rqwzqfpg9scrgwpugpzysnl25zw8",
+]
+
+
+def test_address_cache() -> None:
+    cache = AddressCache()
+    for addr in ADDRESSES:
+        script, network = cache.script_pub_key_from_address(addr)
+        script_pub_key = ScriptPubKey.from_address(addr)
+        assert script == script_pub_key.script
+        assert network == script_pub_key.network
+        # the opposite direction has been primed
+        assert cache.address(script, network) == addr
+        assert cache.type_and_payload(script) == type_and_payload(script)
+        assert cache.script_pub_key(addr) == script_pub_key
+        assert cache.addresses(script_pub_key) == script_pub_key.addresses
+    info = cache.cache_info()
+    assert info.misses == len(ADDRESSES) * 2
+    assert info.hits == len(ADDRESSES) * 4
+
+    # bulk conversions, warm cache
+    scripts = cache.script_pub_keys_from_addresses(a.encode() for a in ADDRESSES)
+    for script, network in scripts:
+        assert cache.addresses_from_script_pub_keys([script], network)[0] == address(
+            script, network
+        )
+    assert cache.cache_info().hit_rate > 0.5
+
+    # the canonical address is cached, not the input string
+    cache.clear()
+    script, network = cache.script_pub_key_from_address(ADDRESSES[2].upper())
+    assert cache.address(script, network) == ADDRESSES[2]
+
+    # scripts without address
+    script_pub_key = ScriptPubKey.nulldata("hello world")
+    assert cache.address(script_pub_key.script) == ""
+    assert cache.address(script_pub_key.script) == ""
+    p2ms = ScriptPubKey.p2ms(
+        1,
+        [
+            "02cc71eb30d653c0c3163990c47b976f3fb3f37cccdcbedb169a1dfef58bbfbfaf",
+            "03cc71eb30d653c0c3163990c47b976f3fb3f37cccdcbedb169a1dfef58bbfbfaf",
+        ],
+        check_validity=False,
+    )
+    assert cache.addresses(p2ms) == p2ms.addresses
+
+    cache.clear()
+    assert cache.cache_info() == (0, 0, cache.maxsize, 0)
+    assert cache.cache_info().hit_rate == 0
+
+
+def test_bounded_cache() -> None:
+    cache = AddressCache(2)
+    for addr in ADDRESSES:
+        cache.script_pub_key_from_address(addr)
+    assert cache.cache_info().currsize == 4
+    # least recently used entries have been evicted
+    cache.script_pub_key_from_address(ADDRESSES[0])
+    assert cache.cache_info().hits == 0
+    cache.script_pub_key_from_address(ADDRESSES[0])
+    assert cache.cache_info().hits == 1
+
+    with pytest.raises(BTClibValueError, match="invalid cache size: "):
+        AddressCache(0)
+
+    # invalid addresses are not cached
+    with pytest.raises(BTClibValueError):
+        cache.script_pub_key_from_address(ADDRESSES[2][:-1] + "q")
+
+
+def test_tx_out_from_address() -> None:
+    cache = AddressCache()
+    for addr in ADDRESSES:
+        tx_out = TxOut.from_address(1000, addr, cache)
+        assert tx_out == TxOut.from_address(1000, addr)
+        assert tx_out == TxOut.from_address(1000, addr, cache)
+    assert cache.cache_info().hits == len(ADDRESSES)
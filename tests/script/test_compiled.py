@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.script.compiled` module."
+
+import dataclasses
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.script.compiled import (
+    CompiledScript,
+    clear_intern_table,
+    compile_script,
+    intern_table_info,
+)
+from btclib.script.script import parse, serialize
+from btclib.script.script_pub_key import ScriptPubKey, type_and_payload
+
+PUB_KEY = "03a1af804ac108a8a51782198c2d034b28bf90c8803f5a53f76276fa69a4eae77f"
+
+
+def test_compiled_script() -> None:
+    script_pub_key = ScriptPubKey.p2pkh(PUB_KEY).script
+    compiled = CompiledScript(script_pub_key)
+    assert compiled.script == script_pub_key
+    assert compiled.serialize() == script_pub_key
+    assert compiled.asm == parse(script_pub_key)
+    assert (compiled.type, compiled.payload) == type_and_payload(script_pub_key)
+    assert not compiled.is_push_only
+    assert compiled.sig_op_count == compiled.accurate_sig_op_count == 1
+    assert compiled.code_separator_offsets == []
+    assert compiled == CompiledScript(script_pub_key)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        compiled.script = b""  # type: ignore
+
+    with pytest.raises(BTClibValueError, match="Not enough data for pushdata"):
+        CompiledScript(b"\x02\x01")
+
+
+def test_analysis() -> None:
+    script = serialize(["OP_0", "OP_1NEGATE", "OP_16", "ff" * 80])
+    assert CompiledScript(script).is_push_only
+    assert CompiledScript(b"").is_push_only
+
+    p2ms = ScriptPubKey.p2ms(2, [PUB_KEY, PUB_KEY, PUB_KEY]).script
+    compiled = CompiledScript(p2ms)
+    assert compiled.type == "p2ms"
+    assert compiled.sig_op_count == 20
+    assert compiled.accurate_sig_op_count == 3
+
+    script = serialize(
+        ["OP_CHECKSIG", "OP_CODESEPARATOR", "OP_CHECKSIGVERIFY", "OP_CHECKMULTISIG"]
+    )
+    compiled = CompiledScript(script)
+    assert compiled.type == "unknown"
+    assert compiled.sig_op_count == compiled.accurate_sig_op_count == 22
+    assert compiled.code_separator_offsets == [1]
+
+
+def test_intern_table() -> None:
+    clear_intern_table()
+    script_pub_key = ScriptPubKey.p2wpkh(PUB_KEY).script
+    compiled = compile_script(script_pub_key)
+    assert compile_script(script_pub_key) is compiled
+    assert compile_script(script_pub_key.hex()) is compiled
+    info = intern_table_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+    clear_intern_table()
+    assert intern_table_info().currsize == 0
+    assert compile_script(script_pub_key) is not compiled
+    assert compile_script(script_pub_key) == compiled
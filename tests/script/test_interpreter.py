@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.script.interpreter` module."
+
+import json
+from os import path
+from typing import List, Optional, Tuple
+
+import pytest
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.curve import mult, secp256k1
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash160, sha256, tagged_hash
+from btclib.script import sig_hash
+from btclib.script.interpreter import (
+    BASE,
+    SigChecker,
+    TxSigChecker,
+    assert_valid_input,
+    assert_valid_script,
+    cast_to_bool,
+    decode_script_num,
+    encode_script_num,
+    eval_script,
+    is_valid_der_encoding,
+    verify_input,
+    witness_program,
+)
+from btclib.script.script import Command, serialize, tokenize
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.script.taproot import input_script_sig
+from btclib.script.witness import Witness
+from btclib.to_prv_key import int_from_prv_key
+from btclib.to_pub_key import pub_keyinfo_from_key
+from btclib.tx.blocks import Block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.signer import sign_tx
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+from btclib.var_bytes import serialize as var_bytes_serialize
+
+PRV_KEYS = [
+    "KwDiBf89QgGbjEhKnhXJuH7LrciVrZi3qYjgd9M7rFU73sVHnoWn",
+    "5HpHagT65TZzG1PH3CSu63k8DbpvD8s5ip4nEB3kF1Aqsafvmsg",
+    "L1Knwj9W3qK3qMKdTvmg3VfzUs3ij2LETTFhxza9LfD5dngnoLG1",
+]
+PUB_KEYS = [
+    pub_keyinfo_from_key(int_from_prv_key(k), compressed=True)[0] for k in PRV_KEYS
+]
+
+
+def _run(script: List[Command], stack: Optional[List[bytes]] = None) -> List[bytes]:
+    "Execute the script with a checker failing all checks."
+    stack = [] if stack is None else stack
+    script_bytes = serialize(script)
+    tokens = list(tokenize(script_bytes))
+    eval_script(script_bytes, tokens, stack, BASE, SigChecker())
+    return stack
+
+
+def test_script_num() -> None:
+    for i in (0, 1, -1, 127, 128, -128, 255, 256, -32768, 2**31 - 1, -(2**31) + 1):
+        assert decode_script_num(encode_script_num(i)) == i
+    assert encode_script_num(0) == b""
+    assert decode_script_num(b"\x00") == 0
+    assert decode_script_num(b"\x80") == 0
+    assert decode_script_num(b"\xff\xff\xff\xff\x00", 5) == 2**32 - 1
+
+    err_msg = "script number overflow: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        decode_script_num(b"\xff\xff\xff\xff\x00")
+
+    assert not cast_to_bool(b"")
+    assert not cast_to_bool(b"\x00\x00")
+    assert not cast_to_bool(b"\x00\x80")
+    assert cast_to_bool(b"\x80\x00")
+    assert cast_to_bool(b"\x00\x01")
+
+
+def test_der_encoding() -> None:
+    msg_hash = sha256(b"Satoshi Nakamoto")
+    sig = dsa.sign_(msg_hash, 1).serialize() + b"\x01"
+    assert is_valid_der_encoding(sig)
+    assert not is_valid_der_encoding(sig[:8])
+    assert not is_valid_der_encoding(b"\x31" + sig[1:])
+    assert not is_valid_der_encoding(sig + b"\x00")
+    assert is_valid_der_encoding(bytes.fromhex("300602010102010101"))
+    # negative r
+    assert not is_valid_der_encoding(bytes.fromhex("300602018102010101"))
+    # negative s
+    assert not is_valid_der_encoding(bytes.fromhex("300602010102018101"))
+    # non minimal s padding
+    assert not is_valid_der_encoding(bytes.fromhex("30070201010202000101"))
+    # zero length r
+    assert not is_valid_der_encoding(bytes.fromhex("3006020002020101" + "01"))
+
+
+def test_witness_program() -> None:
+    assert witness_program(ScriptPubKey.p2wpkh(PRV_KEYS[0]).script) == (
+        0,
+        ScriptPubKey.p2wpkh(PRV_KEYS[0]).script[2:],
+    )
+    program = witness_program(ScriptPubKey.p2tr(PRV_KEYS[0]).script)
+    assert program is not None and program[0] == 1
+    assert witness_program(ScriptPubKey.p2pkh(PRV_KEYS[0]).script) is None
+    assert witness_program(b"\x01\x02\xab\xcd") is None
+
+
+@pytest.mark.parametrize(
+    "script, expected",
+    [
+        (["OP_2", "OP_3", "OP_ADD", "OP_5", "OP_EQUAL"], [b"\x01"]),
+        (["OP_1NEGATE", "OP_ABS", "OP_1SUB", "OP_NOT"], [b"\x01"]),
+        (["OP_7", "OP_3", "OP_SUB", "OP_NEGATE"], [b"\x84"]),
+        (["OP_0", "OP_IF", "OP_2", "OP_ELSE", "OP_3", "OP_ENDIF"], [b"\x03"]),
+        (["OP_1", "OP_NOTIF", "OP_0", "OP_IF", "OP_ENDIF", "OP_ENDIF"], []),
+        (
+            ["OP_1", "OP_IF", "OP_1", "OP_ELSE", "OP_2", "OP_ELSE", "OP_3", "OP_ENDIF"],
+            [b"\x01", b"\x03"],
+        ),
+        (
+            ["OP_1", "OP_2", "OP_3", "OP_2", "OP_PICK"],
+            [b"\x01", b"\x02", b"\x03", b"\x01"],
+        ),
+        (["OP_1", "OP_2", "OP_3", "OP_2", "OP_ROLL"], [b"\x02", b"\x03", b"\x01"]),
+        (["OP_1", "OP_2", "OP_3", "OP_ROT", "OP_SWAP"], [b"\x02", b"\x01", b"\x03"]),
+        (["OP_1", "OP_2", "OP_TUCK", "OP_DEPTH"], [b"\x02", b"\x01", b"\x02", b"\x03"]),
+        (["OP_1", "OP_2", "OP_3", "OP_4", "OP_2SWAP", "OP_2DROP"], [b"\x03", b"\x04"]),
+        (
+            ["OP_1", "OP_2", "OP_3", "OP_4", "OP_5", "OP_6", "OP_2ROT", "OP_2OVER"],
+            [b"\x03", b"\x04", b"\x05", b"\x06", b"\x01", b"\x02", b"\x05", b"\x06"],
+        ),
+        (
+            ["OP_1", "OP_2", "OP_3", "OP_3DUP", "OP_DEPTH", "OP_NIP"],
+            [b"\x01", b"\x02", b"\x03", b"\x01", b"\x02", b"\x06"],
+        ),
+        (
+            ["OP_1", "OP_TOALTSTACK", "OP_0", "OP_IFDUP", "OP_FROMALTSTACK", "OP_OVER"],
+            [b"", b"\x01", b""],
+        ),
+        (
+            ["OP_2", "OP_1", "OP_3", "OP_WITHIN", "OP_5", "OP_9", "OP_MIN"],
+            [b"\x01", b"\x05"],
+        ),
+        (
+            [
+                "OP_5",
+                "OP_9",
+                "OP_MAX",
+                "OP_9",
+                "OP_NUMEQUALVERIFY",
+                "OP_0",
+                "OP_0NOTEQUAL",
+            ],
+            [b""],
+        ),
+        (["OP_1", "OP_0", "OP_BOOLAND", "OP_1", "OP_0", "OP_BOOLOR"], [b"", b"\x01"]),
+        (
+            ["OP_1", "OP_2", "OP_LESSTHAN", "OP_1", "OP_2", "OP_GREATERTHANOREQUAL"],
+            [b"\x01", b""],
+        ),
+        (
+            ["ff", "OP_SIZE", "OP_SWAP", "OP_SHA256", "OP_SIZE", "OP_NIP"],
+            [b"\x01", b" "],
+        ),
+        (
+            [
+                "OP_0",
+                "OP_HASH160",
+                "b472a266d0bd89c13706a4132ccfb16f7c3b9fcb",
+                "OP_EQUAL",
+            ],
+            [b"\x01"],
+        ),
+        (["OP_NOP", "OP_NOP1", "OP_NOP10", "OP_1", "OP_VERIFY"], []),
+        (["OP_0", "OP_IF", "OP_RETURN", "OP_VER", "OP_ENDIF"], []),
+    ],
+)
+def test_eval_script(script: List[Command], expected: List[bytes]) -> None:
+    assert _run(script) == expected
+
+
+@pytest.mark.parametrize(
+    "script, err_msg",
+    [
+        (["OP_RETURN"], "OP_RETURN"),
+        (["OP_0", "OP_VERIFY"], "OP_VERIFY failed"),
+        (["OP_1", "OP_2", "OP_EQUALVERIFY"], "OP_EQUALVERIFY failed"),
+        (["OP_1", "OP_IF"], "unbalanced conditional"),
+        (["OP_ELSE"], "unbalanced conditional"),
+        (["OP_ENDIF"], "unbalanced conditional"),
+        (["OP_IF"], "unbalanced conditional"),
+        (["OP_0", "OP_IF", "OP_SUCCESS126", "OP_ENDIF"], "disabled opcode: "),
+        (["OP_0", "OP_IF", "OP_VERIF", "OP_ENDIF"], "disabled opcode: "),
+        (["OP_VER"], "bad opcode: "),
+        (["OP_CHECKSIGADD"], "bad opcode: "),
+        (["OP_DROP"], "invalid stack operation"),
+        (["OP_FROMALTSTACK"], "invalid stack operation"),
+        (["OP_1", "OP_1", "OP_PICK"], "invalid stack operation"),
+        (["ffffffff7f", "OP_1ADD"], "script number overflow: "),
+        (["OP_NOP"] * 202, "too many operations"),
+        (["OP_1"] * 1001, "stack size limit exceeded"),
+        (["OP_1", "OP_2", "OP_NUMEQUALVERIFY"], "OP_NUMEQUALVERIFY failed"),
+        (["OP_0", "OP_CHECKLOCKTIMEVERIFY"], "unsatisfied lock_time"),
+        (["OP_1NEGATE", "OP_CHECKLOCKTIMEVERIFY"], "negative lock_time"),
+        (["OP_0", "OP_CHECKSEQUENCEVERIFY"], "unsatisfied sequence"),
+        (["OP_1NEGATE", "OP_CHECKSEQUENCEVERIFY"], "negative sequence"),
+        (["OP_0", "OP_0", "OP_CHECKSIGVERIFY"], "OP_CHECKSIGVERIFY failed"),
+        (["OP_1", "OP_0", "OP_CHECKSIG"], "non-DER signature"),
+        (["OP_0", "OP_0", "15", "OP_CHECKMULTISIG"], "invalid public key count: "),
+        (["OP_0", "OP_1", "OP_0", "OP_CHECKMULTISIG"], "invalid signature count: "),
+        (["OP_1", "OP_0", "OP_0", "OP_CHECKMULTISIG"], "non-null multisig dummy"),
+        (
+            ["OP_0", "OP_0", "OP_1", "OP_0", "OP_1", "OP_CHECKMULTISIGVERIFY"],
+            "OP_CHECKMULTISIGVERIFY failed",
+        ),
+    ],
+)
+def test_invalid_eval_script(script: List[Command], err_msg: str) -> None:
+    with pytest.raises(BTClibValueError, match=err_msg):
+        _run(script)
+
+
+def test_script_limits() -> None:
+    # pushes bigger than 520 bytes fail even if not executed
+    script = b"\x00\x63\x4d\x09\x02" + b"\x00" * 521 + b"\x68"
+    tokens = [(0x00, 1, 0), (0x63, 2, 0), (0x4D, 5, 521), (0x68, 527, 0)]
+    with pytest.raises(BTClibValueError, match="push too big: "):
+        eval_script(script, tokens, [], BASE, SigChecker())
+
+    script = b"\x61" * 10_001
+    with pytest.raises(BTClibValueError, match="script too long: "):
+        eval_script(script, list(tokenize(script)), [], BASE, SigChecker())
+
+    # the stack size limit applies to pushes too
+    script_sig = b"\x01\x01" * 1000
+    assert_valid_script(script_sig, b"\x6d", [], SigChecker())  # OP_2DROP
+    with pytest.raises(BTClibValueError, match="stack size limit exceeded"):
+        assert_valid_script(script_sig + b"\x01\x01", b"\x6d", [], SigChecker())
+
+    # the 0-of-0 multisig succeeds, consuming the dummy element
+    assert _run(["OP_0", "OP_0", "OP_0", "OP_CHECKMULTISIG"]) == [b"\x01"]
+
+
+def test_bip341_key_path_vectors() -> None:
+    "Validate the fully signed transaction of the BIP341 test vectors."
+
+    fname = "taproot_test_vector.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r", encoding="ascii") as file_:
+        data = json.load(file_)["keyPathSpending"][0]
+
+    tx = Tx.parse(data["auxiliary"]["fullySignedTx"])
+    prevouts = [
+        TxOut(utxo["amountSats"], ScriptPubKey(utxo["scriptPubKey"]))
+        for utxo in data["given"]["utxosSpent"]
+    ]
+    cache = sig_hash.SigHashCache(tx, prevouts)
+    for vin_i in range(len(tx.vin)):
+        assert_valid_input(prevouts, tx, vin_i, cache)
+        assert verify_input(prevouts, tx, vin_i, cache)
+
+    # tampering with the outputs invalidates the signatures committing to it
+    tx.vout[0].value += 1
+    cache = sig_hash.SigHashCache(tx, prevouts)
+    assert not all(verify_input(prevouts, tx, i, cache) for i in range(len(tx.vin)))
+
+
+def test_p2pk() -> None:
+    "The first bitcoin transaction: a p2pk spend."
+
+    fname = "block_170.bin"
+    filename = path.join(path.dirname(__file__), "..", "tx", "_data", fname)
+    with open(filename, "rb") as binary_file_:
+        block = Block.parse(binary_file_.read())
+    tx = block.transactions[1]
+
+    pub_key = "0411db93e1dcdb8a016b49840f8c53bc1eb68a382e97b1482ecad7b148a6909a5c"
+    pub_key += "b2e0eaddfb84ccf9744464f82e160bfa9b8b64f9d4c03f999b8643f656b412a3"
+    script_pub_key = ScriptPubKey(serialize([pub_key, "OP_CHECKSIG"]))
+    prevouts = [TxOut(50 * 100_000_000, script_pub_key)]
+    assert verify_input(prevouts, tx, 0)
+
+    wrong_pub_key = pub_keyinfo_from_key(PRV_KEYS[1], compressed=False)[0]
+    script_pub_key = ScriptPubKey(serialize([wrong_pub_key, "OP_CHECKSIG"]))
+    prevouts = [TxOut(50 * 100_000_000, script_pub_key)]
+    assert not verify_input(prevouts, tx, 0)
+    with pytest.raises(BTClibValueError, match="script evaluated to false"):
+        assert_valid_input(prevouts, tx, 0)
+
+
+def _tx(n_inputs: int, version: int = 2, lock_time: int = 0) -> Tx:
+    vin = [TxIn(OutPoint(b"\x01" * 32, i), "", 0xFFFFFFFE) for i in range(n_inputs)]
+    vout = [TxOut(1000, ScriptPubKey.p2wpkh(PRV_KEYS[0]))]
+    return Tx(version, lock_time, vin, vout)
+
+
+def _ecdsa_sig(msg_hash: bytes, prv_key: str) -> bytes:
+    sig = dsa.sign_(msg_hash, int_from_prv_key(prv_key)).serialize()
+    return sig + bytes([sig_hash.ALL])
+
+
+def test_signer_scripts() -> None:
+    "Inputs signed by sign_tx are valid."
+
+    script_pub_keys = [
+        ScriptPubKey.p2pkh(PRV_KEYS[0]),
+        ScriptPubKey.p2pkh(PRV_KEYS[1]),
+        ScriptPubKey.p2wpkh(PRV_KEYS[2]),
+        ScriptPubKey.p2sh(serialize(["OP_0", hash160(PUB_KEYS[0])])),
+        ScriptPubKey.p2tr(PRV_KEYS[2]),
+    ]
+    keys = dict(zip((s.script for s in script_pub_keys), [0, 1, 2, 0, 2]))
+    prevouts = [TxOut(2000 + i, s) for i, s in enumerate(script_pub_keys)]
+    tx = _tx(len(prevouts))
+    sign_tx(tx, prevouts, lambda _, out: PRV_KEYS[keys[out.script_pub_key.script]])
+    cache = sig_hash.SigHashCache(tx, prevouts)
+    for vin_i in range(len(tx.vin)):
+        assert_valid_input(prevouts, tx, vin_i, cache)
+
+    tx.vin[0].script_witness = Witness([b"\x01"])
+    with pytest.raises(BTClibValueError, match="unexpected witness"):
+        assert_valid_input(prevouts, tx, 0, cache)
+    tx.vin[2].script_sig = serialize(["OP_1"])
+    with pytest.raises(BTClibValueError, match="non-empty script_sig for witness"):
+        assert_valid_input(prevouts, tx, 2, cache)
+    tx.vin[3].script_sig = serialize(["OP_1"]) + tx.vin[3].script_sig
+    with pytest.raises(BTClibValueError, match="script_sig is not canonical"):
+        assert_valid_input(prevouts, tx, 3, cache)
+    tx.vin[3].script_sig = serialize(["OP_DUP"])
+    with pytest.raises(BTClibValueError, match="script_sig is not push only"):
+        assert_valid_input(prevouts, tx, 3, cache)
+
+
+def test_multisig() -> None:
+    "2-of-3 multisig, as p2sh, p2wsh and bare script."
+
+    redeem_script = serialize(["OP_2", *PUB_KEYS, "OP_3", "OP_CHECKMULTISIG"])
+    prevouts = [
+        TxOut(10_000, ScriptPubKey.p2sh(redeem_script)),
+        TxOut(20_000, ScriptPubKey.p2wsh(redeem_script)),
+        TxOut(30_000, ScriptPubKey(redeem_script, check_validity=False)),
+    ]
+    tx = _tx(len(prevouts))
+
+    msg_hash = sig_hash.legacy(redeem_script, tx, 0, sig_hash.ALL)
+    sigs = [_ecdsa_sig(msg_hash, PRV_KEYS[i]) for i in (0, 2)]
+    tx.vin[0].script_sig = serialize(["OP_0", *sigs, redeem_script])
+
+    msg_hash = sig_hash.segwit_v0(redeem_script, tx, 1, sig_hash.ALL, 20_000)
+    sigs = [_ecdsa_sig(msg_hash, PRV_KEYS[i]) for i in (1, 2)]
+    tx.vin[1].script_witness = Witness([b"", *sigs, redeem_script])
+
+    msg_hash = sig_hash.legacy(redeem_script, tx, 2, sig_hash.ALL)
+    sigs = [_ecdsa_sig(msg_hash, PRV_KEYS[i]) for i in (0, 1)]
+    tx.vin[2].script_sig = serialize(["OP_0", *sigs])
+
+    cache = sig_hash.SigHashCache(tx, prevouts)
+    for vin_i in range(len(tx.vin)):
+        assert_valid_input(prevouts, tx, vin_i, cache)
+
+    # signatures must follow the order of the public keys
+    tx.vin[2].script_sig = serialize(["OP_0", *sigs[::-1]])
+    with pytest.raises(BTClibValueError, match="script evaluated to false"):
+        assert_valid_input(prevouts, tx, 2, cache)
+    # BIP147
+    tx.vin[2].script_sig = serialize(["OP_1", *sigs])
+    with pytest.raises(BTClibValueError, match="non-null multisig dummy element"):
+        assert_valid_input(prevouts, tx, 2, cache)
+
+    stack = tx.vin[1].script_witness.stack
+    tx.vin[1].script_witness = Witness([*stack[:-1], redeem_script + b"\x51"])
+    with pytest.raises(BTClibValueError, match="p2wsh witness script mismatch"):
+        assert_valid_input(prevouts, tx, 1, cache)
+    tx.vin[1].script_witness = Witness([b"\x01", *stack])
+    with pytest.raises(BTClibValueError, match="did not leave a clean stack"):
+        assert_valid_input(prevouts, tx, 1, cache)
+
+
+def test_code_separator() -> None:
+    "Legacy signatures commit to the script after the last OP_CODESEPARATOR."
+
+    script = serialize(
+        [
+            PUB_KEYS[0],
+            "OP_CHECKSIGVERIFY",
+            "OP_CODESEPARATOR",
+            PUB_KEYS[2],
+            "OP_CHECKSIG",
+        ]
+    )
+    prevouts = [TxOut(10_000, ScriptPubKey(script, check_validity=False))]
+    tx = _tx(1)
+
+    script_code = serialize(
+        [PUB_KEYS[0], "OP_CHECKSIGVERIFY", PUB_KEYS[2], "OP_CHECKSIG"]
+    )
+    sig0 = _ecdsa_sig(sig_hash.legacy(script_code, tx, 0, sig_hash.ALL), PRV_KEYS[0])
+    script_code = serialize([PUB_KEYS[2], "OP_CHECKSIG"])
+    sig2 = _ecdsa_sig(sig_hash.legacy(script_code, tx, 0, sig_hash.ALL), PRV_KEYS[2])
+    tx.vin[0].script_sig = serialize([sig2, sig0])
+    assert verify_input(prevouts, tx, 0)
+
+    tx.vin[0].script_sig = serialize([sig0, sig2])
+    assert not verify_input(prevouts, tx, 0)
+
+
+def _tapscript_sig(tx: Tx, prevouts: List[TxOut], script: bytes, prv_key: str) -> bytes:
+    "Return the BIP340 signature of a tapscript without OP_CODESEPARATOR."
+
+    preimage = b"\xc0" + var_bytes_serialize(script)
+    ext = tagged_hash(b"TapLeaf", preimage) + b"\x00" + b"\xff" * 4
+    amounts = [prevout.value for prevout in prevouts]
+    script_pub_keys = [prevout.script_pub_key for prevout in prevouts]
+    msg_hash = sig_hash.taproot(
+        tx, 0, amounts, script_pub_keys, sig_hash.DEFAULT, 1, b"", ext
+    )
+    return ssa.sign_(msg_hash, prv_key).serialize()
+
+
+def test_tapscript() -> None:
+    "Taproot script path spending."
+
+    x_only_keys = [pub_key[1:] for pub_key in PUB_KEYS]
+    leaves: List[List[Command]] = [
+        [x_only_keys[0], "OP_CHECKSIG"],
+        [
+            x_only_keys[1],
+            "OP_CHECKSIG",
+            x_only_keys[2],
+            "OP_CHECKSIGADD",
+            "OP_2",
+            "OP_EQUAL",
+        ],
+        ["OP_SUCCESS80"],
+        ["OP_IF", "OP_1", "OP_ENDIF"],
+    ]
+    script_tree = [
+        [[(0xC0, leaves[0])], [(0xC0, leaves[1])]],
+        [[(0xC0, leaves[2])], [(0xC0, leaves[3])]],
+    ]
+    prevouts = [TxOut(10_000, ScriptPubKey.p2tr(PRV_KEYS[0], script_tree))]
+    tx = _tx(1)
+
+    def witness(leaf: int, stack: List[bytes]) -> Witness:
+        script, control = input_script_sig(PRV_KEYS[0], script_tree, leaf)
+        return Witness([*stack, serialize(script), control])
+
+    script = serialize(leaves[0])
+    sig = _tapscript_sig(tx, prevouts, script, PRV_KEYS[0])
+    tx.vin[0].script_witness = witness(0, [sig])
+    assert_valid_input(prevouts, tx, 0)
+    tx.vin[0].script_witness = witness(0, [sig[::-1]])
+    with pytest.raises(BTClibValueError, match="invalid schnorr signature"):
+        assert_valid_input(prevouts, tx, 0)
+    tx.vin[0].script_witness = witness(0, [b""])
+    with pytest.raises(BTClibValueError, match="witness script evaluated to false"):
+        assert_valid_input(prevouts, tx, 0)
+
+    script = serialize(leaves[1])
+    sigs = [_tapscript_sig(tx, prevouts, script, PRV_KEYS[i]) for i in (2, 1)]
+    tx.vin[0].script_witness = witness(1, sigs)
+    assert_valid_input(prevouts, tx, 0)
+    tx.vin[0].script_witness = witness(1, [sigs[0], b""])
+    with pytest.raises(BTClibValueError, match="witness script evaluated to false"):
+        assert_valid_input(prevouts, tx, 0)
+
+    # OP_SUCCESSx
+    tx.vin[0].script_witness = witness(2, [])
+    assert_valid_input(prevouts, tx, 0)
+
+    # MINIMALIF
+    tx.vin[0].script_witness = witness(3, [b"\x01"])
+    assert_valid_input(prevouts, tx, 0)
+    tx.vin[0].script_witness = witness(3, [b"\x02"])
+    with pytest.raises(BTClibValueError, match="minimal if"):
+        assert_valid_input(prevouts, tx, 0)
+
+    # wrong control block
+    script, control = input_script_sig(PRV_KEYS[0], script_tree, 3)
+    tx.vin[0].script_witness = Witness([b"\x01", serialize(script), control[:-1]])
+    with pytest.raises(BTClibValueError, match="invalid control block size: "):
+        assert_valid_input(prevouts, tx, 0)
+    tx.vin[0].script_witness = Witness([b"\x01", serialize(leaves[0]), control])
+    with pytest.raises(BTClibValueError, match="taproot commitment mismatch"):
+        assert_valid_input(prevouts, tx, 0)
+
+
+def _single_leaf_p2tr(script: bytes) -> Tuple[TxOut, bytes]:
+    "Return the p2tr prevout of a single leaf script tree and its control block."
+
+    P = mult(int_from_prv_key(PRV_KEYS[0]))
+    if P[1] % 2:
+        P = P[0], secp256k1.p - P[1]
+    internal_key = P[0].to_bytes(32, "big")
+    leaf_hash = tagged_hash(b"TapLeaf", b"\xc0" + var_bytes_serialize(script))
+    t = int.from_bytes(tagged_hash(b"TapTweak", internal_key + leaf_hash), "big")
+    Q = secp256k1.add(P, mult(t))
+    script_pub_key = ScriptPubKey(b"\x51\x20" + Q[0].to_bytes(32, "big"))
+    control = (0xC0 | Q[1] % 2).to_bytes(1, "big") + internal_key
+    return TxOut(10_000, script_pub_key), control
+
+
+def test_tapscript_big_push() -> None:
+    "OP_SUCCESSx win over pushes bigger than 520 bytes (BIP342)."
+
+    big_push = b"\x4d\x58\x02" + b"\x00" * 600
+    tx = _tx(1)
+    script = big_push + b"\x50"  # OP_SUCCESS80
+    prevout, control = _single_leaf_p2tr(script)
+    tx.vin[0].script_witness = Witness([script, control])
+    assert_valid_input([prevout], tx, 0)
+
+    script = big_push + b"\x75\x51"  # OP_DROP OP_1
+    prevout, control = _single_leaf_p2tr(script)
+    tx.vin[0].script_witness = Witness([script, control])
+    with pytest.raises(BTClibValueError, match="push too big: 600 bytes"):
+        assert_valid_input([prevout], tx, 0)
+
+
+def test_timelocks() -> None:
+    script = serialize([encode_script_num(100), "OP_CHECKLOCKTIMEVERIFY"])
+    tx = _tx(1, lock_time=100)
+    checker = TxSigChecker(tx, 0, [])
+    assert_valid_script(b"", script, [], checker)
+    tx.lock_time = 99
+    with pytest.raises(BTClibValueError, match="unsatisfied lock_time"):
+        assert_valid_script(b"", script, [], checker)
+    # timestamp lock_time
+    tx.lock_time = 500_000_000
+    with pytest.raises(BTClibValueError, match="unsatisfied lock_time"):
+        assert_valid_script(b"", script, [], checker)
+    # final input
+    tx.lock_time = 100
+    tx.vin[0].sequence = 0xFFFFFFFF
+    with pytest.raises(BTClibValueError, match="unsatisfied lock_time"):
+        assert_valid_script(b"", script, [], checker)
+
+    script = serialize([encode_script_num(10), "OP_CHECKSEQUENCEVERIFY"])
+    tx.vin[0].sequence = 10
+    assert_valid_script(b"", script, [], checker)
+    tx.vin[0].sequence = 9
+    with pytest.raises(BTClibValueError, match="unsatisfied sequence"):
+        assert_valid_script(b"", script, [], checker)
+    # time based relative lock-time
+    tx.vin[0].sequence = 10 | 1 << 22
+    with pytest.raises(BTClibValueError, match="unsatisfied sequence"):
+        assert_valid_script(b"", script, [], checker)
+    # relative lock-times are disabled in version 1 transactions
+    tx.vin[0].sequence = 10
+    tx.version = 1
+    with pytest.raises(BTClibValueError, match="unsatisfied sequence"):
+        assert_valid_script(b"", script, [], checker)
+    # the disable flag makes CHECKSEQUENCEVERIFY a NOP
+    script = serialize([encode_script_num(1 << 31), "OP_CHECKSEQUENCEVERIFY"])
+    assert_valid_script(b"", script, [], checker)
@@ -21,9 +21,11 @@ from btclib.script.script import (
     Command,
     Script,
     _serialize_str_command,
+    command_from_token,
     op_int,
     parse,
     serialize,
+    tokenize,
 )
 from btclib.utils import hex_string
 
@@ -248,3 +250,56 @@ def test_single_byte_serialization() -> None:
         assert len(serialized_byte) == 2
         assert serialized_byte[0] == 1
         assert [hex_str] == parse(serialized_byte)
+
+
+def test_tokenize() -> None:
+    commands: List[Command] = [
+        "OP_0",
+        "OP_1",
+        "0A" * 20,
+        "0B" * 80,
+        "0C" * 300,
+        "OP_CODESEPARATOR",
+        "OP_SUCCESS80",
+        "OP_CHECKSIG",
+    ]
+    script = serialize(commands)
+    tokens = list(tokenize(script))
+    assert [op for op, _, _ in tokens] == [0x00, 0x51, 20, 0x4C, 0x4D, 0xAB, 80, 0xAC]
+    # push data is addressed in place
+    assert tokens[2] == (0x14, 3, 20)
+    assert script[tokens[3][1] : tokens[3][1] + tokens[3][2]] == b"\x0b" * 80
+    # opcodes have no data and an offset following the opcode
+    assert tokens[5][2] == 0 and script[tokens[5][1] - 1] == 0xAB
+
+    assert [command_from_token(script, token) for token in tokens] == commands
+    assert Script(script).asm == parse(script) == commands
+    assert list(Script(script).tokens()) == tokens
+    # equivalent inputs
+    assert list(tokenize(script.hex())) == tokens
+    assert list(tokenize(memoryview(script))) == tokens
+    assert list(tokenize(bytearray(script))) == tokens
+
+    # OP_PUSHDATA4 and non-minimal pushes are supported
+    script = bytes.fromhex("4e0200000001024c0103")
+    assert list(tokenize(script)) == [(0x4E, 5, 2), (0x4C, 9, 1)]
+    assert parse(script) == ["0102", "03"]
+
+    assert parse(serialize(["OP_1", "OP_SUCCESS80", "OP_1"]), True) == ["OP_SUCCESS"]
+
+    # tokens are yielded lazily: the error is met only when reached
+    script = bytes.fromhex("51" + "4c")
+    walk = tokenize(script)
+    assert next(walk) == (0x51, 1, 0)
+    with pytest.raises(BTClibValueError, match="Not enough data for pushdata length"):
+        next(walk)
+    with pytest.raises(BTClibValueError, match="Not enough data for pushdata"):
+        list(tokenize("4c0201"))
+    with pytest.raises(BTClibValueError, match="Invalid pushdata length: "):
+        list(tokenize("4d0902" + "00" * 521))
+    # only the framing is checked
+    assert list(tokenize("4d0902" + "00" * 521, check_push_size=False)) == [
+        (0x4D, 3, 521)
+    ]
+    with pytest.raises(BTClibValueError, match="Not enough data for pushdata"):
+        Script("0201")
@@ -11,12 +11,14 @@
 "Tests for the `btclib.script.script_pub_key` module."
 
 import json
+import random
 from os import path
-from typing import List
+from typing import List, Tuple
 
 import pytest
 
 from btclib import b32, b58, var_bytes
+from btclib.ecc.sec_point import bytes_from_point, point_from_octets
 from btclib.exceptions import BTClibValueError
 from btclib.hashes import hash160, sha256
 from btclib.script.script import Command, Script, parse, serialize
@@ -30,8 +32,15 @@ from btclib.script.script_pub_key import (
     assert_p2tr,
     assert_p2wpkh,
     assert_p2wsh,
+    classify_many,
     is_nulldata,
     is_p2ms,
+    is_p2pk,
+    is_p2pkh,
+    is_p2sh,
+    is_p2tr,
+    is_p2wpkh,
+    is_p2wsh,
     type_and_payload,
 )
 from btclib.script.taproot import output_pubkey
@@ -601,3 +610,77 @@ def test_p2tr() -> None:
     err_msg = "invalid redeem script hash length marker: "
     with pytest.raises(BTClibValueError, match=err_msg):
         assert_p2tr(script_pub_key[:1] + b"\x00" + script_pub_key[2:])
+
+
+def _reference_type_and_payload(script_pub_key: bytes) -> Tuple[str, bytes]:
+    # the template-by-template, exception-based classification
+    if is_p2pk(script_pub_key):
+        return "p2pk", script_pub_key[1:-1]
+    if is_p2ms(script_pub_key):
+        return "p2ms", script_pub_key[:-1]
+    if is_p2pkh(script_pub_key):
+        return "p2pkh", script_pub_key[3:-2]
+    if is_p2sh(script_pub_key):
+        return "p2sh", script_pub_key[2:-1]
+    if is_p2wpkh(script_pub_key):
+        return "p2wpkh", script_pub_key[2:]
+    if is_p2wsh(script_pub_key):
+        return "p2wsh", script_pub_key[2:]
+    if is_p2tr(script_pub_key):
+        return "p2tr", script_pub_key[2:]
+    if is_nulldata(script_pub_key):
+        if len(script_pub_key) < 78:
+            return "nulldata", script_pub_key[2:]
+        return "nulldata", script_pub_key[3:]
+    return "unknown", script_pub_key
+
+
+def test_single_pass_classification() -> None:
+    pub_key = "03a1af804ac108a8a51782198c2d034b28bf90c8803f5a53f76276fa69a4eae77f"
+    unc_pub_key = bytes_from_point(point_from_octets(pub_key), compressed=False)
+    prv_key = "0c28fca386c7a227600b2fe50b7cae11ec86d3bf1fbe471be89827e19d72aa1d"
+    templates: List[bytes] = [
+        b"",
+        ScriptPubKey.p2pk(pub_key).script,
+        ScriptPubKey.p2pkh(pub_key).script,
+        ScriptPubKey.p2sh(ScriptPubKey.p2pkh(pub_key).script).script,
+        ScriptPubKey.p2wpkh(pub_key).script,
+        ScriptPubKey.p2wsh(ScriptPubKey.p2pkh(pub_key).script).script,
+        ScriptPubKey.p2tr(pub_key).script,
+        ScriptPubKey.p2ms(1, [pub_key, prv_key], check_validity=False).script,
+        ScriptPubKey.p2ms(2, [pub_key, pub_key, pub_key]).script,
+        ScriptPubKey.nulldata("hello world").script,
+        ScriptPubKey.nulldata(b"\x01" * 80).script,
+        b"\x41" + unc_pub_key + b"\xac",
+        # p2ms with a private key instead of a public one
+        serialize(["OP_1", bytes.fromhex(prv_key), "OP_1", "OP_CHECKMULTISIG"]),
+        # p2ms with multi-byte var_int
+        b"\x51\xfd" + b"\x00" * 40 + b"\x51\xae",
+    ]
+    scripts = list(templates)
+    # all their single-byte corruptions, truncations and extensions
+    rng = random.Random(42)
+    for script in templates:
+        for i in range(len(script)):
+            scripts.append(script[:i])
+            corrupted = bytearray(script)
+            corrupted[i] ^= 1 << rng.randrange(8)
+            scripts.append(bytes(corrupted))
+        scripts.append(script + b"\xac")
+        scripts.append(script[:-1] + b"\xae")
+    # all leading opcodes for the standard lengths
+    for length in (2, 3, 22, 23, 25, 34, 35, 37, 67, 79, 83):
+        for opcode in range(256):
+            script = bytes([opcode, length - 2]) + b"\x00" * (length - 2)
+            scripts.extend((script, script[:1]))
+
+    types = set()
+    for script in scripts:
+        result = _reference_type_and_payload(script)
+        assert type_and_payload(script) == result
+        assert type_and_payload(script.hex()) == result
+        types.add(result[0])
+    assert len(types) == 9
+
+    assert classify_many(scripts) == [type_and_payload(s) for s in scripts]
+    assert classify_many([]) == []
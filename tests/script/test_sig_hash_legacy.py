@@ -14,11 +14,14 @@ test vector at https://github.com/bitcoin/bitcoin/blob/master/src/test/data/sigh
 """
 
 import json
+from copy import deepcopy
 from os import path
 
 from btclib.ecc import dsa
+from btclib.hashes import hash256
 from btclib.script import sig_hash
 from btclib.script.script import serialize
+from btclib.script.script_pub_key import ScriptPubKey
 from btclib.tx.tx import Tx
 from btclib.tx.tx_in import OutPoint, TxIn
 from btclib.tx.tx_out import TxOut
@@ -168,3 +171,66 @@ def test_test_vectors() -> None:
             hash_type += 0xFFFFFFFF + 1
         actual_hash = sig_hash.legacy(script_, tx, input_index, hash_type)
         assert actual_hash == bytes.fromhex(exp_hash)[::-1]
+
+
+def test_legacy_script_code() -> None:
+    script = serialize(["OP_1", "OP_CODESEPARATOR", "OP_2", "OP_CODESEPARATOR"])
+    assert sig_hash.legacy_script(script) == [b"\x51\x52", b"\x52", b""]
+    assert sig_hash.witness_v0_script(script) == [script, script[2:], b""]
+
+    # the script code is not re-serialized: non-minimal pushes are preserved
+    script = bytes.fromhex("4c01ab" + "ab" + "4c0151")
+    assert sig_hash.legacy_script(script) == [bytes.fromhex("4c01ab4c0151")] + [
+        bytes.fromhex("4c0151")
+    ]
+    assert sig_hash.witness_v0_script(script.hex()) == [script, script[4:]]
+
+
+def _deepcopy_legacy(script_: bytes, tx: Tx, vin_i: int, hash_type: int) -> bytes:
+    # reference implementation, modifying a copy of the transaction
+    new_tx = deepcopy(tx)
+    for txin in new_tx.vin:
+        txin.script_sig = b""
+    new_tx.vin[vin_i].script_sig = script_
+    if hash_type & 0x1F == sig_hash.NONE:
+        new_tx.vout = []
+        for i, txin in enumerate(new_tx.vin):
+            if i != vin_i:
+                txin.sequence = 0
+    if hash_type & 0x1F == sig_hash.SINGLE:
+        if vin_i >= len(new_tx.vout):
+            return (256**31).to_bytes(32, byteorder="big", signed=False)
+        new_tx.vout = new_tx.vout[: vin_i + 1]
+        for txout in new_tx.vout[:-1]:
+            txout.script_pub_key = ScriptPubKey(b"")
+            txout.value = 0xFFFFFFFFFFFFFFFF
+        for i, txin in enumerate(new_tx.vin):
+            if i != vin_i:
+                txin.sequence = 0
+    if hash_type & 0x80:
+        new_tx.vin = [new_tx.vin[vin_i]]
+    preimage = new_tx.serialize(include_witness=False, check_validity=False)
+    preimage += hash_type.to_bytes(4, byteorder="little", signed=False)
+    return hash256(preimage)
+
+
+def test_copy_free_legacy() -> None:
+    script_ = serialize(
+        ["OP_DUP", "OP_HASH160", "0a" * 20, "OP_EQUALVERIFY", "OP_CHECKSIG"]
+    )
+    vin = [
+        TxIn(OutPoint(bytes([i + 1]) * 32, i), "51", 0xFFFFFFFE - i) for i in range(4)
+    ]
+    vout = [TxOut(1000 * (i + 1), script_) for i in range(3)]
+    tx = Tx(2, 700000, vin, vout)
+    tx_copy = deepcopy(tx)
+    for hash_type in sig_hash.SIG_HASH_TYPES + [0x41, 0x1F, 0x83 | 0x40]:
+        for vin_i in range(len(vin)):
+            hash_ = sig_hash.legacy(script_, tx, vin_i, hash_type)
+            assert hash_ == _deepcopy_legacy(script_, tx, vin_i, hash_type)
+    # the transaction has not been modified
+    assert tx == tx_copy
+
+    # sig_hash single bug
+    hash_ = sig_hash.legacy(script_, tx, 3, sig_hash.SINGLE)
+    assert hash_ == b"\x01" + b"\x00" * 31
@@ -13,6 +13,9 @@
 test vector at https://github.com/bitcoin/bips/blob/master/bip-0143.mediawiki
 """
 
+import pytest
+
+from btclib.exceptions import BTClibValueError
 from btclib.script import sig_hash
 from btclib.script.witness import Witness
 from btclib.tx.tx import Tx
@@ -158,3 +161,35 @@ def test_wrapped_p2wsh() -> None:
     assert hash_ == bytes.fromhex(
         "511e8e52ed574121fc1b654970395502128263f62662e076dc6baf05c2e6a99b"
     )
+
+
+def test_sig_hash_cache() -> None:
+    tx_bytes = "0100000002fe3dc9208094f3ffd12645477b3dc56f60ec4fa8e6f5d67c565d1c6b9216b36e0000000000ffffffff0815cf020f013ed6cf91d29f4202e8a58726b1ac6c79da47c23d1bee0a6925f80000000000ffffffff0100f2052a010000001976a914a30741f8145e5acadf23f751864167f32e0963f788ac00000000"
+    tx = Tx.parse(tx_bytes)
+    script_ = "76a9141d0f172a0ecb48aee1be1f2687d2963ae33f71a188ac"
+    cache = sig_hash.SigHashCache(tx)
+    for hash_type in sig_hash.SIG_HASH_TYPES:
+        for vin_i in range(len(tx.vin)):
+            hash_ = sig_hash.segwit_v0(script_, tx, vin_i, hash_type, 10**8)
+            assert hash_ == sig_hash.segwit_v0(
+                script_, tx, vin_i, hash_type, 10**8, cache
+            )
+
+    # digests are computed once and then reused
+    hash_prev_outs = cache.hash_prev_outs
+    tx.vin[0].prev_out.vout += 1
+    assert cache.hash_prev_outs is hash_prev_outs
+    assert sig_hash.SigHashCache(tx).hash_prev_outs != hash_prev_outs
+
+    utxos = [
+        TxOut(156250000, "0014" + "1d0f172a0ecb48aee1be1f2687d2963ae33f71a1"),
+        TxOut(4900000000, "0014" + "1d0f172a0ecb48aee1be1f2687d2963ae33f71a1"),
+    ]
+    cache = sig_hash.SigHashCache(tx)
+    for vin_i in range(len(tx.vin)):
+        hash_ = sig_hash.from_tx(utxos, tx, vin_i, sig_hash.ALL, cache)
+        assert hash_ == sig_hash.from_tx(utxos, tx, vin_i, sig_hash.ALL)
+
+    err_msg = "sig_hash cache bound to a different transaction"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sig_hash.from_tx(utxos, Tx.parse(tx_bytes), 0, sig_hash.ALL, cache)
@@ -18,9 +18,10 @@ from os import path
 
 import pytest
 
+from btclib import var_bytes
 from btclib.ecc import ssa
 from btclib.exceptions import BTClibRuntimeError, BTClibValueError
-from btclib.hashes import hash160
+from btclib.hashes import hash160, sha256, tagged_hash
 from btclib.script import sig_hash
 from btclib.script.script import parse, serialize
 from btclib.script.script_pub_key import is_p2tr, type_and_payload
@@ -206,10 +207,93 @@ def test_bip_test_vector():
         utxos.append(TxOut(utxo["amountSats"], utxo["scriptPubKey"]))
 
     for vin in unsigned_tx.vin:
-        vin.script_witness.stack.append(["00"])
+        # the key path signature placeholder (no annex)
+        vin.script_witness.stack.append(b"\x00")
 
     for test in data["inputSpending"]:
         index = test["given"]["txinIndex"]
         hash_type = test["given"]["hashType"]
         signature_hash = sig_hash.from_tx(utxos, unsigned_tx, index, hash_type)
         assert signature_hash.hex() == test["intermediary"]["sigHash"]
+
+
+def test_taproot_sig_hash_cache() -> None:
+
+    fname = "taproot_test_vector.json"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "r", encoding="ascii") as file_:
+        data = json.load(file_)["keyPathSpending"][0]
+
+    unsigned_tx = Tx.parse(data["given"]["rawUnsignedTx"])
+    utxos = [
+        TxOut(utxo["amountSats"], utxo["scriptPubKey"])
+        for utxo in data["given"]["utxosSpent"]
+    ]
+    for vin in unsigned_tx.vin:
+        # the key path signature placeholder (no annex)
+        vin.script_witness.stack.append(b"\x00")
+
+    cache = sig_hash.SigHashCache(unsigned_tx, utxos)
+    intermediary = data["intermediary"]
+    assert cache.sha_amounts.hex() == intermediary["hashAmounts"]
+    assert cache.sha_outputs.hex() == intermediary["hashOutputs"]
+    assert cache.sha_prevouts.hex() == intermediary["hashPrevouts"]
+    assert cache.sha_script_pub_keys.hex() == intermediary["hashScriptPubkeys"]
+    assert cache.sha_sequences.hex() == intermediary["hashSequences"]
+
+    for test in data["inputSpending"]:
+        index = test["given"]["txinIndex"]
+        hash_type = test["given"]["hashType"]
+        signature_hash = sig_hash.from_tx(utxos, unsigned_tx, index, hash_type, cache)
+        assert signature_hash.hex() == test["intermediary"]["sigHash"]
+
+    # a cache without prevouts gets them from from_tx
+    cache = sig_hash.SigHashCache(unsigned_tx)
+    for test in data["inputSpending"]:
+        index = test["given"]["txinIndex"]
+        hash_type = test["given"]["hashType"]
+        signature_hash = sig_hash.from_tx(utxos, unsigned_tx, index, hash_type, cache)
+        assert signature_hash.hex() == test["intermediary"]["sigHash"]
+    # new prevouts drop the digests of the previous ones
+    cache = sig_hash.SigHashCache(unsigned_tx, utxos[::-1])
+    assert cache.sha_amounts.hex() != intermediary["hashAmounts"]
+    cache.set_prevouts(utxos)
+    assert cache.sha_amounts.hex() == intermediary["hashAmounts"]
+    assert cache.sha_script_pub_keys.hex() == intermediary["hashScriptPubkeys"]
+    cache = sig_hash.SigHashCache(unsigned_tx)
+    with pytest.raises(BTClibValueError, match="missing prevouts"):
+        cache.sha_amounts  # pylint: disable=pointless-statement
+    cache = sig_hash.SigHashCache(unsigned_tx, utxos[:-1])
+    with pytest.raises(BTClibValueError, match="invalid number of prevouts: "):
+        cache.sha_amounts  # pylint: disable=pointless-statement
+
+
+def test_annex_and_tapleaf() -> None:
+
+    utxo = TxOut(
+        100000000,
+        serialize(
+            ["OP_1", "cc71eb30d653c0c3163990c47b976f3fb3f37cccdcbedb169a1dfef58bbfbfaf"]
+        ),
+    )
+    annex = b"\x50\x01\x02"
+    tapscript = serialize(["OP_1"])
+    control_block = b"\xc0" + b"\x01" * 32
+    witness = Witness([b"\x02" * 64, tapscript, control_block, annex])
+    tx_in = TxIn(OutPoint(b"\x01" * 32, 0), "", 1, witness)
+    tx = Tx(vin=[tx_in], vout=[TxOut(100000000, "")])
+
+    tapleaf_hash = tagged_hash(b"TapLeaf", b"\xc0" + var_bytes.serialize(tapscript))
+    ext = tapleaf_hash + b"\x00\xff\xff\xff\xff"
+    for hash_type in sig_hash.SIG_HASH_TYPES:
+        expected = sig_hash.taproot(
+            tx, 0, [utxo.value], [utxo.script_pub_key], hash_type, 1, annex, ext
+        )
+        assert sig_hash.from_tx([utxo], tx, 0, hash_type) == expected
+    # the witness is left untouched
+    assert tx.vin[0].script_witness.stack[-1] == annex
+
+    cache = sig_hash.SigHashCache(tx, [utxo])
+    annex_hash = sha256(var_bytes.serialize(annex))
+    assert cache.taproot_witness_hashes(0) == (annex_hash, tapleaf_hash)
+    assert cache.taproot_witness_hashes(0) == (annex_hash, tapleaf_hash)
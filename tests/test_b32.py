@@ -244,6 +244,42 @@ def test_address_witness() -> None:
         b32.witness_from_address(addr)
 
 
+def test_address_witness_many() -> None:
+
+    witnesses = [
+        (0, 20 * b"\x05"),
+        (0, 32 * b"\x05"),
+        (1, 32 * b"\x05"),
+        (16, 2 * b"\x05"),
+    ]
+    for net in ("mainnet", "testnet", "regtest"):
+        addresses = b32.address_from_witness_many(witnesses, net)
+        assert addresses == [b32.address_from_witness(v, p, net) for v, p in witnesses]
+        expected = [(v, p, net) for v, p in witnesses]
+        assert b32.witness_from_address_many(addresses) == expected
+    assert b32.address_from_witness_many([]) == []
+
+    with pytest.raises(BTClibValueError, match="invalid checksum: "):
+        b32.witness_from_address_many(["bc1qg9stkxrszkdqsuj92lm4c7akvk36zvhqw7p6cc"])
+
+
+def test_power_of_2_base_conversion() -> None:
+
+    for wit_prg in (b"", b"\x00", b"\xff" * 20, bytes(range(40))):
+        data = b32.power_of_2_base_conversion(wit_prg, 8, 5)
+        assert data == b32.power_of_2_base_conversion(iter(wit_prg), 8, 5)
+        assert bytes(b32.power_of_2_base_conversion(data, 5, 8, False)) == wit_prg
+
+    with pytest.raises(BTClibValueError, match="invalid value: "):
+        b32.power_of_2_base_conversion([1, 32], 5, 8, False)
+    err_msg = "zero padding of more than 4 bits in 5-to-8 conversion"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        b32.power_of_2_base_conversion([0], 5, 8, False)
+    err_msg = "non-zero padding in 5-to-8 conversion"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        b32.power_of_2_base_conversion([0, 1], 5, 8, False)
+
+
 def test_p2wpkh_p2sh() -> None:
     # https://matthewdowney.github.io/create-segwit-address.html
     pub = " 03 a1af804ac108a8a51782198c2d034b28bf90c8803f5a53f76276fa69a4eae77f"
@@ -18,9 +18,11 @@ from btclib.base58 import (
     _b58encode,
     _b58encode_from_int,
     b58decode,
+    b58decode_many,
     b58encode,
+    b58encode_many,
 )
-from btclib.exceptions import BTClibValueError
+from btclib.exceptions import BTClibTypeError, BTClibValueError
 
 
 def test_empty() -> None:
@@ -107,3 +109,37 @@ def test_integers() -> None:
     n = int(number, 16)
     assert _b58decode_to_int(digits) == n
     assert _b58encode_from_int(n) == digits[1:]
+
+
+def test_large_integers() -> None:
+    digits = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    # limb boundaries
+    for n in (9, 10, 11, 19, 20, 21, 111):
+        for i in (58**n - 1, 58**n, 58**n + 1):
+            encoded = _b58encode_from_int(i)
+            assert _b58decode_to_int(encoded) == i
+            assert len(encoded) == n + (i >= 58**n)
+    assert _b58encode_from_int(58**20) == b"2" + b"1" * 20
+    assert _b58decode_to_int(digits * 3) == int.from_bytes(
+        _b58decode(digits * 3), "big"
+    )
+
+    err_msg = "Base58 string contains invalid characters"
+    for invalid in (b"0", b"O", b"I", b"l", b"+", b"/", b"\xff", b"1111O"):
+        with pytest.raises(BTClibValueError, match=err_msg):
+            _b58decode(invalid)
+
+
+def test_many() -> None:
+    data = [b"", b"hello world", b"\x00\x00hello world", bytes(range(78))]
+    encoded = b58encode_many(data)
+    assert encoded == [b58encode(v) for v in data]
+    assert b58decode_many(encoded) == data
+    assert b58decode_many([e.decode("ascii") for e in encoded]) == data
+    assert b58decode_many([memoryview(e) for e in encoded]) == data
+    assert b58decode_many([bytearray(e) for e in encoded]) == data
+    with pytest.raises(BTClibTypeError, match="not a bytes-like object: int"):
+        b58decode_many([0], 11)  # type: ignore
+    assert b58decode_many(b58encode_many(data[1:2], 11), 11) == data[1:2]
+    with pytest.raises(BTClibValueError, match="invalid decoded size: "):
+        b58decode_many(encoded, 11)
@@ -10,7 +10,8 @@
 
 "Tests for the `btclib.hashes` module."
 
-from btclib.hashes import hash160, hash256
+from btclib.hashes import hash160, hash160_many, hash256, ripemd160
+from btclib.ripemd import ripemd160 as _ripemd160_fallback
 from tests.test_to_key import (
     net_unaware_compressed_pub_keys,
     net_unaware_uncompressed_pub_keys,
@@ -27,3 +28,42 @@ def test_hash160_hash256() -> None:
     for hexstring in test_vectors:
         hash160(hexstring)
         hash256(hexstring)
+
+
+def test_ripemd160_fallback() -> None:
+    # https://homes.esat.kuleuven.be/~bosselae/ripemd160.html
+    test_vectors = [
+        ("", "9c1185a5c5e9fc54612808977ee8f548b2258d31"),
+        ("a", "0bdc9d2d256b3ee9daae347be6f4dc835a467ffe"),
+        ("abc", "8eb208f7e05d987a9b044a8e98c6b087f15a0bfc"),
+        ("message digest", "5d0689ef49d2fae572b881b123a85ffa21595f36"),
+        ("abcdefghijklmnopqrstuvwxyz", "f71c27109c692c1b56bbdceb5b9d2865b3708dbc"),
+        (
+            "abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq",
+            "12a053384a9c0c88e405a06c27dcf49ada62eb2b",
+        ),
+        (
+            "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+            "b0e20b6e3116640286ed3a87a5713079b21f5189",
+        ),
+        ("1234567890" * 8, "9b752e45573d4b39f4dbd3323cab82bf63326bfb"),
+        ("a" * 1000000, "52783243c1697bdbe16d37f97f68f08325dc1528"),
+    ]
+    for msg, digest in test_vectors:
+        assert _ripemd160_fallback(msg.encode()) == bytes.fromhex(digest)
+        assert ripemd160(msg.encode()) == bytes.fromhex(digest)
+
+    for i in range(130):
+        data = bytes(range(i))
+        assert _ripemd160_fallback(data) == ripemd160(data)
+        assert _ripemd160_fallback(memoryview(data)) == ripemd160(data)
+
+
+def test_hash160_many() -> None:
+    test_vectors = (
+        plain_prv_keys
+        + net_unaware_compressed_pub_keys
+        + net_unaware_uncompressed_pub_keys
+    )
+    assert hash160_many(test_vectors) == [hash160(v) for v in test_vectors]
+    assert hash160_many([]) == []
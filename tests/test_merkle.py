@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.merkle` module."
+
+from typing import List
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash256, merkle_root
+from btclib.merkle import (
+    MerkleRootBuilder,
+    MerkleTree,
+    extract_partial_tree,
+    merkle_root_and_mutation,
+    verify_proof,
+)
+
+
+def _reference_root(hashes: List[bytes]) -> bytes:
+    # straightforward level by level computation
+    while len(hashes) != 1:
+        if len(hashes) % 2:
+            hashes = hashes + hashes[-1:]
+        hashes = [hash256(hashes[i] + hashes[i + 1]) for i in range(0, len(hashes), 2)]
+    return hashes[0]
+
+
+def test_streaming_merkle_root() -> None:
+    for n in range(1, 70):
+        leaves = [hash256(i.to_bytes(4, "little")) for i in range(n)]
+        root, mutated = merkle_root_and_mutation(iter(leaves), hash256)
+        assert root == _reference_root(leaves)
+        assert not mutated
+
+    data = [i.to_bytes(4, "little") for i in range(11)]
+    assert merkle_root(iter(data), hash256) == _reference_root(
+        [hash256(d) for d in data]
+    )
+
+    # the builder is not consumed by root()
+    builder = MerkleRootBuilder(hash256)
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(9)]
+    for i, leaf in enumerate(leaves):
+        builder.add(leaf)
+        assert builder.root() == _reference_root(leaves[: i + 1])
+    assert builder.count == 9
+
+    with pytest.raises(BTClibValueError, match="empty Merkle tree"):
+        MerkleRootBuilder(hash256).root()
+
+
+def test_mutation() -> None:
+    # CVE-2012-2459: [a, b, c] and [a, b, c, c] share the same root
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(3)]
+    root, mutated = merkle_root_and_mutation(leaves, hash256)
+    assert not mutated
+    mutated_root, mutated = merkle_root_and_mutation(leaves + leaves[-1:], hash256)
+    assert mutated_root == root
+    assert mutated
+
+    # mutation at a higher level
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(6)]
+    root, mutated = merkle_root_and_mutation(leaves, hash256)
+    assert not mutated
+    mutated_root, mutated = merkle_root_and_mutation(leaves + leaves[-2:], hash256)
+    assert mutated_root == root
+    assert mutated
+
+
+def test_merkle_tree_proofs() -> None:
+    for n in (1, 2, 3, 5, 8, 13, 33):
+        leaves = [hash256(i.to_bytes(4, "little")) for i in range(n)]
+        tree = MerkleTree(leaves, hash256)
+        assert tree.root == _reference_root(leaves)
+        assert not tree.mutated
+        for i, leaf in enumerate(leaves):
+            assert tree.leaf(i) == leaf
+            branch = tree.proof(i)
+            assert verify_proof(leaf, i, branch, tree.root, hash256)
+            assert not verify_proof(hash256(leaf), i, branch, tree.root, hash256)
+            assert not verify_proof(leaf, i + (1 << 20), branch, tree.root, hash256)
+
+    with pytest.raises(BTClibValueError, match="empty Merkle tree"):
+        MerkleTree([], hash256)
+    with pytest.raises(BTClibValueError, match="invalid leaf hash size: "):
+        MerkleTree([b"\x00" * 31], hash256)
+    with pytest.raises(BTClibValueError, match="invalid leaf index: "):
+        tree.proof(n)
+    with pytest.raises(BTClibValueError, match="invalid leaf index: "):
+        tree.leaf(-1)
+
+
+def test_merkle_tree_replace() -> None:
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(11)]
+    tree = MerkleTree(leaves, hash256)
+    for i in (0, 5, 10):
+        leaves[i] = hash256(leaves[i])
+        tree.replace(i, leaves[i])
+        assert tree.root == _reference_root(leaves)
+        assert tree.root == MerkleTree(leaves, hash256).root
+
+    # replacement creating, then removing, a mutation
+    original = leaves[1]
+    tree.replace(1, leaves[0])
+    assert tree.mutated
+    tree.replace(1, original)
+    assert not tree.mutated
+
+    with pytest.raises(BTClibValueError, match="invalid leaf index: "):
+        tree.replace(11, leaves[0])
+    with pytest.raises(BTClibValueError, match="invalid leaf hash size: "):
+        tree.replace(0, leaves[0][1:])
+
+
+def test_partial_merkle_tree() -> None:
+    for n in (1, 2, 3, 7, 16, 21):
+        leaves = [hash256(i.to_bytes(4, "little")) for i in range(n)]
+        tree = MerkleTree(leaves, hash256)
+        indexes_list: List[List[int]] = [
+            [], [0], [n - 1], list(range(0, n, 3)), list(range(n))
+        ]
+        for indexes in indexes_list:
+            hashes, flags = tree.partial_tree(indexes)
+            root, matches = extract_partial_tree(n, hashes, flags, hash256)
+            assert root == tree.root
+            assert matches == [(i, leaves[i]) for i in sorted(set(indexes))]
+
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(7)]
+    tree = MerkleTree(leaves, hash256)
+    hashes, flags = tree.partial_tree([6])
+
+    with pytest.raises(BTClibValueError, match="invalid leaf index: "):
+        tree.partial_tree([7])
+    with pytest.raises(BTClibValueError, match="empty Merkle tree"):
+        extract_partial_tree(0, hashes, flags, hash256)
+    with pytest.raises(BTClibValueError, match="too many hashes: "):
+        extract_partial_tree(2, hashes, flags, hash256)
+    with pytest.raises(BTClibValueError, match="not enough flag bits"):
+        extract_partial_tree(7, hashes, b"", hash256)
+    with pytest.raises(BTClibValueError, match="overflowed the hash list"):
+        extract_partial_tree(7, hashes[:-1], flags, hash256)
+    with pytest.raises(BTClibValueError, match="not all hashes have been consumed"):
+        extract_partial_tree(7, hashes + hashes[:1], flags, hash256)
+    with pytest.raises(BTClibValueError, match="not all flag bits have been "):
+        extract_partial_tree(7, hashes, flags + b"\x00", hash256)
+    with pytest.raises(BTClibValueError, match="overflowed the flag bits"):
+        extract_partial_tree(7, hashes * 2, b"\xff", hash256)
+
+    # CVE-2012-2459: [a, b, c, c] would prove the same root as [a, b, c]
+    leaves = [hash256(i.to_bytes(4, "little")) for i in range(3)]
+    tree = MerkleTree(leaves + leaves[-1:], hash256)
+    assert tree.mutated
+    hashes, flags = tree.partial_tree([3])
+    with pytest.raises(BTClibValueError, match="mutated partial Merkle tree"):
+        extract_partial_tree(4, hashes, flags, hash256)
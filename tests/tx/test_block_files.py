@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.block_files` module."
+
+from os import path
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx.block_files import BlockFile, block_file_names, map_blocks
+from btclib.tx.blocks import Block
+
+MAGIC = NETWORKS["mainnet"].magic_bytes
+
+
+def _raw_block(fname: str) -> bytes:
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as file_:
+        return file_.read()
+
+
+RAW_BLOCKS = [_raw_block(f"block_{i}.bin") for i in (1, 170, 200000)]
+
+
+def _write_block_file(filename: Path, raw_blocks: List[bytes]) -> None:
+    records = [MAGIC + len(b).to_bytes(4, "little") + b for b in raw_blocks]
+    # preallocated zero padding
+    filename.write_bytes(b"".join(records) + b"\x00" * 1000)
+
+
+def _n_transactions(block: Block) -> int:
+    return len(block.transactions)
+
+
+def test_block_file(tmp_path: Path) -> None:
+    filename = tmp_path / "blk00000.dat"
+    _write_block_file(filename, RAW_BLOCKS)
+
+    with BlockFile(str(filename)) as block_file:
+        offsets = list(block_file.offsets())
+        assert [size for _, size in offsets] == [len(b) for b in RAW_BLOCKS]
+        assert offsets[0][0] == 8
+        assert offsets[1][0] == 8 + len(RAW_BLOCKS[0]) + 8
+
+        for (_, data), raw_block in zip(block_file.raw_blocks(), RAW_BLOCKS):
+            assert data == raw_block
+            del data
+        blocks = list(block_file.blocks())
+        assert blocks == [Block.parse(raw_block) for raw_block in RAW_BLOCKS]
+        headers = [header for _, header in block_file.headers()]
+        assert headers == [block.header for block in blocks]
+
+        # random access
+        offset = offsets[2][0]
+        assert block_file.raw_block(offset) == RAW_BLOCKS[2]
+        assert block_file.header(offset) == blocks[2].header
+        assert block_file.block(offset, check_validity=True) == blocks[2]
+
+        with pytest.raises(BTClibValueError, match="invalid block offset: "):
+            block_file.raw_block(4)
+        with pytest.raises(BTClibValueError, match="invalid magic bytes at offset "):
+            block_file.raw_block(offset + 1)
+
+
+def test_invalid_block_file(tmp_path: Path) -> None:
+    filename = tmp_path / "blk00000.dat"
+    filename.write_bytes(b"")
+    with BlockFile(str(filename)) as block_file:
+        assert not list(block_file.offsets())
+
+    # testnet block file read as mainnet one
+    testnet_magic = NETWORKS["testnet"].magic_bytes
+    size = len(RAW_BLOCKS[0]).to_bytes(4, "little")
+    filename.write_bytes(testnet_magic + size + RAW_BLOCKS[0])
+    with BlockFile(str(filename), "testnet") as block_file:
+        assert len(list(block_file.blocks())) == 1
+    with BlockFile(str(filename)) as block_file:
+        with pytest.raises(BTClibValueError, match="invalid magic bytes at offset "):
+            list(block_file.offsets())
+
+    filename.write_bytes(MAGIC + size + RAW_BLOCKS[0][:-1])
+    with BlockFile(str(filename)) as block_file:
+        with pytest.raises(BTClibValueError, match="truncated block at offset "):
+            list(block_file.offsets())
+
+
+def test_map_blocks(tmp_path: Path) -> None:
+    _write_block_file(tmp_path / "blk00010.dat", RAW_BLOCKS[2:])
+    _write_block_file(tmp_path / "blk00002.dat", RAW_BLOCKS[:2])
+    (tmp_path / "rev00002.dat").write_bytes(b"\x00")
+    (tmp_path / "xor.dat").write_bytes(b"\x00" * 8)
+
+    filenames = block_file_names(str(tmp_path))
+    assert [path.basename(f) for f in filenames] == ["blk00002.dat", "blk00010.dat"]
+
+    expected = [1, 2, 388]
+    assert list(map_blocks(_n_transactions, str(tmp_path), max_workers=1)) == expected
+    assert list(map_blocks(_n_transactions, str(tmp_path))) == expected
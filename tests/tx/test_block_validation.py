@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.block_validation` module."
+
+from typing import Dict, List, Optional, Tuple
+
+from btclib.ecc import dsa, ssa
+from btclib.ecc.sig_cache import SigCache, set_sig_cache
+from btclib.hashes import hash160
+from btclib.script import sig_hash
+from btclib.script.script import serialize
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.script.witness import Witness
+from btclib.to_prv_key import PrvKey
+from btclib.to_pub_key import pub_keyinfo_from_key
+from btclib.tx.block_header import BlockHeader
+from btclib.tx.block_validation import verify_block_signatures
+from btclib.tx.blocks import Block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.signer import sign_tx
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+
+PRV_KEYS = [
+    "KwDiBf89QgGbjEhKnhXJuH7LrciVrZi3qYjgd9M7rFU73sVHnoWn",
+    "5HpHagT65TZzG1PH3CSu63k8DbpvD8s5ip4nEB3kF1Aqsafvmsg",
+    "L1Knwj9W3qK3qMKdTvmg3VfzUs3ij2LETTFhxza9LfD5dngnoLG1",
+]
+PUB_KEY = pub_keyinfo_from_key(PRV_KEYS[0], compressed=True)[0]
+SCRIPT_PUB_KEYS = [
+    ScriptPubKey.p2pkh(PRV_KEYS[0]),
+    ScriptPubKey.p2pkh(PRV_KEYS[1]),
+    ScriptPubKey.p2wpkh(PRV_KEYS[2]),
+    ScriptPubKey.p2sh(serialize(["OP_0", hash160(PUB_KEY)])),
+    ScriptPubKey.p2tr(PRV_KEYS[2]),
+]
+KEYS = dict(zip((s.script for s in SCRIPT_PUB_KEYS), [0, 1, 2, 0, 2]))
+
+
+def _key_provider(_: int, prevout: TxOut) -> Optional[PrvKey]:
+    key_index = KEYS.get(prevout.script_pub_key.script)
+    return None if key_index is None else PRV_KEYS[key_index]
+
+
+UTXOS_TX = Tx(
+    1,
+    0,
+    [TxIn(OutPoint(b"\x01" * 32, 0), "", 0xFFFFFFFF)],
+    [TxOut(2000 + i, s) for i, s in enumerate(SCRIPT_PUB_KEYS)]
+    + [TxOut(3000, ScriptPubKey.p2wsh(serialize(["OP_1"])))],
+)
+UTXOS: Dict[Tuple[bytes, int], TxOut] = {
+    (UTXOS_TX.id, i): tx_out for i, tx_out in enumerate(UTXOS_TX.vout)
+}
+
+
+def _prevout_provider(prev_out: OutPoint) -> TxOut:
+    return UTXOS[(prev_out.tx_id, prev_out.vout)]
+
+
+def _spending_tx(prev_outs: List[OutPoint], prevouts: List[TxOut]) -> Tx:
+    vin = [TxIn(prev_out, "", 0xFFFFFFFF) for prev_out in prev_outs]
+    vout = [TxOut(1000, s) for s in SCRIPT_PUB_KEYS]
+    tx = Tx(2, 0, vin, vout)
+    sign_tx(tx, prevouts, _key_provider)
+    return tx
+
+
+def _block() -> Block:
+    "Return a block spending both in-block and previous outputs."
+
+    coinbase_in = TxIn(OutPoint(), "03e8030000", 0xFFFFFFFF)
+    coinbase_outs = [TxOut(5000, s) for s in SCRIPT_PUB_KEYS]
+    coinbase = Tx(1, 0, [coinbase_in], coinbase_outs)
+
+    # spending the coinbase outputs
+    prev_outs = [OutPoint(coinbase.id, i) for i in range(5)]
+    tx1 = _spending_tx(prev_outs, coinbase_outs)
+
+    # spending outputs of a previous block
+    prev_outs = [OutPoint(UTXOS_TX.id, i) for i in range(len(UTXOS_TX.vout))]
+    tx2 = _spending_tx(prev_outs, UTXOS_TX.vout)
+
+    header = BlockHeader(check_validity=False)
+    return Block(header, [coinbase, tx1, tx2], check_validity=False)
+
+
+def test_valid_block() -> None:
+    block = _block()
+    report = verify_block_signatures(block, _prevout_provider)
+    assert report.is_valid
+    assert report.failures == []
+    assert report.unsupported == [(2, 5)]
+    assert report.verified == 10
+
+    # parallel ECDSA verification
+    assert verify_block_signatures(block, _prevout_provider, 2) == report
+
+
+def test_invalid_block() -> None:
+    block = _block()
+    tx1, tx2 = block.transactions[1:]
+
+    # tampered ECDSA p2pkh signature
+    script_sig = bytearray(tx1.vin[0].script_sig)
+    script_sig[10] ^= 1
+    tx1.vin[0].script_sig = bytes(script_sig)
+    # tampered BIP340 signature
+    ssa_sig = bytearray(tx1.vin[4].script_witness.stack[0])
+    ssa_sig[40] ^= 1
+    tx1.vin[4].script_witness = Witness([bytes(ssa_sig)])
+    # p2wpkh witness with the wrong public key
+    sig, _ = tx2.vin[2].script_witness.stack
+    tx2.vin[2].script_witness = Witness([sig, PUB_KEY])
+    # invalid BIP340 hash type
+    tx2.vin[4].script_witness = Witness([b"\x01" * 64 + b"\x00"])
+
+    report = verify_block_signatures(block, _prevout_provider, 1)
+    assert not report.is_valid
+    assert report.failures == [(1, 0), (1, 4), (2, 2), (2, 4)]
+    assert report.unsupported == [(2, 5)]
+    assert report.verified == 6
+
+
+def test_invalid_ssa_r() -> None:
+    block = _block()
+    tx1 = block.transactions[1]
+
+    # r is not a valid x-coordinate: later BIP340 signatures are still verified
+    sig = tx1.vin[4].script_witness.stack[0]
+    tx1.vin[4].script_witness = Witness([b"\xff" * 32 + sig[32:]])
+
+    report = verify_block_signatures(block, _prevout_provider)
+    assert report.failures == [(1, 4)]
+    assert report.verified == 9
+
+
+def test_sig_cache() -> None:
+    block = _block()
+    cache = SigCache()
+    set_sig_cache(cache)
+    try:
+        report = verify_block_signatures(block, _prevout_provider)
+        assert cache.cache_info().currsize == report.verified == 10
+        hits = cache.cache_info().hits
+        assert verify_block_signatures(block, _prevout_provider) == report
+        assert cache.cache_info().hits == hits + 10
+
+        # the cache is shared with dsa.verify_ and ssa.verify_
+        cache.clear()
+        tx = block.transactions[1]
+        sig, pub_key = tx.vin[2].script_witness.stack
+        prevouts = block.transactions[0].vout
+        msg_hash = sig_hash.from_tx(prevouts, tx, 2, sig[-1])
+        assert dsa.verify_(msg_hash, pub_key, sig[:-1], lower_s=False)
+        sig = tx.vin[4].script_witness.stack[0]
+        msg_hash = sig_hash.from_tx(prevouts, tx, 4, sig_hash.DEFAULT)
+        assert ssa.verify_(msg_hash, prevouts[4].script_pub_key.script[2:], sig)
+        verify_block_signatures(block, _prevout_provider)
+        assert cache.cache_info().hits == 2
+    finally:
+        set_sig_cache(None)
@@ -10,15 +10,20 @@
 
 "Tests for the `btclib.blocks` module."
 
+import io
 import json
+import tracemalloc
 from datetime import datetime, timezone
 from os import path
+from typing import List
 
 import pytest
 
 from btclib.exceptions import BTClibValueError
 from btclib.network import NETWORKS
+from btclib.tx import blocks
 from btclib.tx.blocks import Block, BlockHeader
+from btclib.tx.tx_out import TxOut
 
 datadir = path.join(path.dirname(__file__), "_generated_files")
 
@@ -110,6 +115,9 @@ def test_exceptions() -> None:
     err_msg = "invalid timestamp \\(before genesis\\): "
     with pytest.raises(BTClibValueError, match=err_msg):
         header.assert_valid()
+    header.timestamp = 0xFFFFFFFF + 1
+    with pytest.raises(BTClibValueError, match="invalid timestamp: "):
+        header.assert_valid()
 
     header = BlockHeader.parse(header_bytes)
     header.nonce = 0
@@ -173,6 +181,13 @@ def test_block_200000() -> None:
     assert block == Block.parse(block.serialize())
     assert block == Block.from_dict(block.to_dict())
 
+    # CVE-2012-2459: 388 = 4 * 97, duplicating the last four transactions
+    # does not change the merkle root, but it is detected as mutation
+    mutated_block = Block.parse(block_bytes)
+    mutated_block.transactions += mutated_block.transactions[-4:]
+    with pytest.raises(BTClibValueError, match="mutated merkle tree: "):
+        mutated_block.assert_valid_merkle_root()
+
     header = block.header
     assert header.version == 2
     prev_block = "00000000000003a20def7a05a77361b9657ff954b2f2080e135ea6f5970da215"
@@ -246,6 +261,197 @@ def test_block_481824() -> None:
             assert block.vsize == 988_436
 
 
+def test_frozen_block() -> None:
+    fname = "block_481824_complete.bin"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as file_:
+        block_bytes = file_.read()
+
+    block = Block.parse(block_bytes)
+    frozen_block = Block.parse(block_bytes, frozen=True)
+    assert frozen_block.is_frozen
+    assert frozen_block.header.is_frozen
+    assert all(tx.is_frozen for tx in frozen_block.transactions)
+    assert frozen_block == block
+    for block_ in (frozen_block, Block.parse(block_bytes).freeze()):
+        assert block_.header.hash == block.header.hash
+        assert block_.size == block.size == 989_323
+        assert block_.weight == block.weight
+        assert [tx.id for tx in block_.transactions] == [
+            tx.id for tx in block.transactions
+        ]
+    frozen_block.assert_valid_merkle_root()
+
+    # assignments drop the cached values
+    frozen_block.transactions = frozen_block.transactions[:1]
+    assert not frozen_block.is_frozen
+    assert frozen_block.size < block.size
+    frozen_block.header.nonce += 1
+    assert not frozen_block.header.is_frozen
+    assert frozen_block.header.hash != block.header.hash
+
+    frozen_block.freeze()
+    frozen_block.unfreeze()
+    assert not frozen_block.header.is_frozen
+    assert not frozen_block.transactions[0].is_frozen
+
+
+def test_witness_commitment() -> None:
+    fname = "block_481824_complete.bin"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as file_:
+        block_bytes = file_.read()
+    block = Block.parse(block_bytes)
+
+    commitment = "6c3c4dff76b5760d58694147264d208689ee07823e5694c4872f856eacf5a5d8"
+    assert block.witness_commitment() == bytes.fromhex(commitment)
+    assert block.compute_witness_commitment() == bytes.fromhex(commitment)
+    block.assert_valid_witness_commitment()
+    frozen_block = Block.parse(block_bytes, frozen=True)
+    assert frozen_block.witness_merkle_root() == block.witness_merkle_root()
+
+    # stripped block: commitment without coinbase witness
+    stripped_block = Block.parse(block.serialize(include_witness=False))
+    assert stripped_block.witness_commitment() == bytes.fromhex(commitment)
+    err_msg = "invalid coinbase witness reserved value"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        stripped_block.assert_valid_witness_commitment()
+
+    # block template: the commitment is added to the coinbase
+    coinbase = stripped_block.transactions[0]
+    coinbase.vout = coinbase.vout[:1]
+    assert stripped_block.witness_commitment() is None
+    stripped_block.transactions[1:] = block.transactions[1:]
+    with pytest.raises(BTClibValueError, match="unexpected witness data: "):
+        stripped_block.assert_valid_witness_commitment()
+    assert stripped_block.add_witness_commitment() == bytes.fromhex(commitment)
+    assert stripped_block == block
+    # an existing commitment is replaced
+    other_commitment = stripped_block.add_witness_commitment(b"\x01" * 32)
+    assert other_commitment != bytes.fromhex(commitment)
+    assert len(stripped_block.transactions[0].vout) == 2
+    stripped_block.assert_valid_witness_commitment()
+    err_msg = "invalid witness reserved value length: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        stripped_block.add_witness_commitment(b"\x00" * 31)
+
+    # the last matching output is the commitment
+    tx_out = block.transactions[0].vout[1]
+    invalid_commitment = TxOut(0, tx_out.script_pub_key.script[:-1] + b"\x00")
+    block.transactions[0].vout.append(invalid_commitment)
+    with pytest.raises(BTClibValueError, match="invalid witness commitment: "):
+        block.assert_valid_witness_commitment()
+
+    # witness malleation
+    block = Block.parse(block_bytes)
+    block.transactions[12].vin[0].script_witness.stack[0] += b"\x00"
+    assert block.transactions[12].id == Block.parse(block_bytes).transactions[12].id
+    block.assert_valid_merkle_root()
+    with pytest.raises(BTClibValueError, match="invalid witness commitment: "):
+        block.assert_valid()
+
+    # no segwit transactions
+    filename = path.join(path.dirname(__file__), "_data", "block_170.bin")
+    with open(filename, "rb") as file_:
+        block = Block.parse(file_.read())
+    assert block.witness_commitment() is None
+    block.assert_valid_witness_commitment()
+
+
+def test_parallel_parse(monkeypatch: pytest.MonkeyPatch) -> None:
+    fname = "block_481824_complete.bin"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as file_:
+        block_bytes = file_.read()
+    block = Block.parse(block_bytes)
+
+    parallel_block = Block.parse(block_bytes, max_workers=2)
+    assert parallel_block == block
+    assert not parallel_block.is_frozen
+    assert not any(tx.is_frozen for tx in parallel_block.transactions)
+
+    frozen_block = Block.parse(block_bytes, frozen=True, max_workers=2)
+    assert frozen_block == block
+    assert frozen_block.is_frozen
+    assert all(tx.is_frozen for tx in frozen_block.transactions)
+    assert frozen_block.size == block.size
+    assert [tx.id for tx in frozen_block.transactions] == [
+        tx.id for tx in block.transactions
+    ]
+
+    # trailing data is left in the stream
+    stream = io.BytesIO(block_bytes + b"\x01\x02")
+    assert Block.parse(stream, max_workers=2) == block
+    assert stream.read() == b"\x01\x02"
+
+    # few transactions: sequential parse
+    stream = io.BytesIO(block_bytes)
+    assert Block.parse(stream, max_workers=None) == block
+    assert stream.tell() == len(block_bytes)
+    monkeypatch.setattr(blocks, "_MIN_PARALLEL_TRANSACTIONS", 2)
+    assert Block.parse(block_bytes, max_workers=None) == block
+
+    # invalid transactions are detected by the workers
+    tx = block.transactions[1]
+    tx.version = 0
+    invalid_block_bytes = block_bytes[:80] + b"\x02"
+    invalid_block_bytes += block.transactions[0].serialize(True)
+    invalid_block_bytes += tx.serialize(True, check_validity=False)
+    with pytest.raises(BTClibValueError, match="invalid version: "):
+        Block.parse(invalid_block_bytes, max_workers=2)
+    # even without block validation, as in the sequential parse
+    for max_workers in (1, 2):
+        with pytest.raises(BTClibValueError, match="invalid version: "):
+            Block.parse(invalid_block_bytes, False, max_workers=max_workers)
+
+    # parsed transactions are not validated again
+    block_checks: List[bool] = []
+
+    def _assert_valid(self: Block, check_transactions: bool = True) -> None:
+        block_checks.append(check_transactions)
+
+    monkeypatch.setattr(Block, "_assert_valid", _assert_valid)
+    for max_workers in (1, 2):
+        Block.parse(block_bytes, max_workers=max_workers)
+    assert block_checks == [False, False]
+    # the per-tx checks are skipped only on request
+    block.assert_valid()
+    assert block_checks == [False, False, True]
+
+
+def test_slots() -> None:
+    fname = "block_481824_complete.bin"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as file_:
+        block_bytes = file_.read()
+
+    tracemalloc.start()
+    block = Block.parse(block_bytes)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # about 1.9kB per transaction, 2.5kB without __slots__
+    assert size < 2_200 * len(block.transactions)
+
+    tx = block.transactions[12]
+    tx_in = tx.vin[0]
+    objects = [block, block.header, tx, tx_in, tx_in.prev_out, tx_in.script_witness]
+    objects += [tx.vout[0], tx.vout[0].script_pub_key]
+    for obj in objects:
+        assert not hasattr(obj, "__dict__")
+        with pytest.raises(AttributeError):
+            obj.not_a_field = 0  # type: ignore
+
+    # the raw timestamp is kept, the datetime is built on access
+    header = block.header
+    assert header.timestamp == 1503539857
+    assert header.time == datetime(2017, 8, 24, 1, 57, 37, tzinfo=timezone.utc)
+    header.time = header.time
+    assert header == Block.parse(block_bytes).header
+    assert header == BlockHeader.parse(header.serialize())
+    assert "time=datetime.datetime(2017, 8, 24, 1, 57, 37" in repr(header)
+    assert "_timestamp" not in repr(header)
+
+
 def test_dataclasses_json_dict() -> None:
 
     fname = "block_481824.bin"
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.header_store` module."
+
+from os import path
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.tx import header_store
+from btclib.tx.block_header import BlockHeader
+from btclib.tx.header_store import (
+    HeaderStore,
+    bits_from_target,
+    retarget_bits,
+    target_from_bits,
+    work_from_bits,
+    write_header_file,
+)
+
+GENESIS_MERKLE_ROOT = "4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b"
+GENESIS = BlockHeader(
+    1, b"\x00" * 32, GENESIS_MERKLE_ROOT, 1231006505, "1d00ffff", 2083236893
+)
+REGTEST_LIMIT = 0x207FFFFF
+
+
+def _block_1_header() -> BlockHeader:
+    filename = path.join(path.dirname(__file__), "_data", "block_1.bin")
+    with open(filename, "rb") as file_:
+        return BlockHeader.parse(file_.read(80))
+
+
+def _mine(prev_hash: bytes, timestamp: int, bits: int) -> BlockHeader:
+    bits_ = bits.to_bytes(4, byteorder="big")
+    header = BlockHeader(1, prev_hash, b"\x01" * 32, timestamp, bits_, 1, False)
+    target = target_from_bits(bits)
+    while int.from_bytes(header.hash, byteorder="big") >= target:
+        header.nonce += 1
+    return header
+
+
+def _regtest_chain(
+    first_height: int, last_height: int, bits: Callable[[List[BlockHeader]], int]
+) -> List[BlockHeader]:
+    "Mine a regtest chain, with blocks every five minutes."
+    headers: List[BlockHeader] = []
+    prev_hash = NETWORKS["regtest"].genesis_block
+    for height in range(first_height, last_height + 1):
+        timestamp = 1296688602 + 300 * height
+        headers.append(_mine(prev_hash, timestamp, bits(headers)))
+        prev_hash = headers[-1].hash
+    return headers
+
+
+def test_bits() -> None:
+    for bits in (0x1D00FFFF, REGTEST_LIMIT, 0x1B0404CB, 0x03123456, 0x05009234):
+        assert bits_from_target(target_from_bits(bits)) == bits
+    assert target_from_bits(0x1D00FFFF) == int.from_bytes(GENESIS.target, "big")
+    # the sign bit is not part of the significand
+    assert bits_from_target(0x80) == 0x02008000
+    # negative targets, as in Bitcoin Core
+    assert target_from_bits(0x1D80FFFF) == -target_from_bits(0x1D00FFFF)
+    assert target_from_bits(0x1D800000) == 0
+    assert work_from_bits(0x1D80FFFF) == 0
+    assert work_from_bits(0x1D00FFFF) == 0x100010001
+    assert work_from_bits(REGTEST_LIMIT) == 2
+
+    assert retarget_bits(0x1D00FFFF, header_store.TARGET_TIMESPAN) == 0x1D00FFFF
+    # the pow limit cannot be exceeded
+    assert retarget_bits(0x1D00FFFF, header_store.TARGET_TIMESPAN * 2) == 0x1D00FFFF
+    # clamped to a factor of four
+    assert retarget_bits(0x1C00FFFF, 1) == 0x1B3FFFC0
+    assert retarget_bits(0x1C00FFFF, 1) == retarget_bits(0x1C00FFFF, 100)
+    assert retarget_bits(0x1B3FFFC0, header_store.TARGET_TIMESPAN * 10) == 0x1C00FFFF
+
+
+def test_mainnet(tmp_path: Path) -> None:
+    block_1 = _block_1_header()
+    filename = str(tmp_path / "headers")
+    write_header_file(filename, [GENESIS])
+    write_header_file(filename, [block_1.serialize()], append=True)
+
+    with HeaderStore(filename) as store:
+        assert len(store) == 2
+        assert store.tip_height == 1
+        assert store.hash(0) == NETWORKS["mainnet"].genesis_block
+        assert store.hash(1) == block_1.hash
+        assert store.header(1) == block_1
+        assert list(store.headers()) == [GENESIS, block_1]
+        assert bytes(store.raw_header(0)) == GENESIS.serialize()
+        store.assert_valid()
+
+        assert store.chainwork() == [0x100010001, 0x200020002]
+        assert store.hash_rate(window=1) == 0x100010001 // (1231469665 - 1231006505)
+        with pytest.raises(BTClibValueError, match="invalid window: "):
+            store.hash_rate(window=2)
+        with pytest.raises(BTClibValueError, match="invalid height: "):
+            store.raw_header(2)
+
+    # the genesis block has no previous header
+    write_header_file(filename, [block_1])
+    with HeaderStore(filename, height=1) as store:
+        assert store.header(1) == block_1
+        store.assert_valid()
+    with HeaderStore(filename) as store:
+        with pytest.raises(BTClibValueError, match="invalid genesis block"):
+            store.assert_valid()
+
+    write_header_file(filename, [GENESIS, GENESIS])
+    with HeaderStore(filename) as store:
+        err_msg = "invalid previous block hash at height 1"
+        with pytest.raises(BTClibValueError, match=err_msg):
+            store.assert_valid()
+
+    # minimum and maximum timestamps of the window, as Bitcoin Core
+    headers = [BlockHeader.parse(block_1.serialize()) for _ in range(3)]
+    headers[1].timestamp += 600
+    headers[2].timestamp += 300
+    write_header_file(filename, headers)
+    with HeaderStore(filename, height=1) as store:
+        assert store.hash_rate(window=2) == 0x200020002 // 600
+        assert store.hash_rate(window=1) == 0x100010001 // 300
+    write_header_file(filename, [block_1, block_1])
+    with HeaderStore(filename, height=1) as store:
+        assert store.hash_rate(window=1) == 0
+
+
+def test_regtest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # crossing the retargeting at height 4032
+    first_height = 2000
+    retarget_index = 4032 - first_height
+    new_bits = retarget_bits(REGTEST_LIMIT, 2015 * 300, REGTEST_LIMIT)
+    assert new_bits != REGTEST_LIMIT
+
+    def bits(headers: List[BlockHeader]) -> int:
+        return REGTEST_LIMIT if len(headers) < retarget_index else new_bits
+
+    headers = _regtest_chain(first_height, 4040, bits)
+    filename = str(tmp_path / "headers")
+    write_header_file(filename, headers)
+    with HeaderStore(filename, "regtest", first_height) as store:
+        # regtest has no retargeting
+        store.assert_valid()
+        monkeypatch.setitem(header_store._POW_PARAMS, "regtest", (REGTEST_LIMIT, True))
+        store.assert_valid()
+        chainwork = store.chainwork()
+        assert chainwork[-1] == 2 * retarget_index + work_from_bits(new_bits) * 9
+        assert store.hash_rate() == (chainwork[-1] - chainwork[-121]) // (120 * 300)
+
+    def invalid_store_error(headers: List[BlockHeader], err_msg: str) -> None:
+        write_header_file(filename, headers)
+        with HeaderStore(filename, "regtest", first_height) as store:
+            with pytest.raises(BTClibValueError, match=err_msg):
+                store.assert_valid()
+
+    # missing retarget
+    err_msg = "invalid bits at height 4032: 207fffff instead of "
+    invalid_headers = _regtest_chain(first_height, 4033, lambda _: REGTEST_LIMIT)
+    invalid_store_error(invalid_headers, err_msg)
+    # difficulty change without retarget
+    err_msg = f"invalid bits at height 4033: 207fffff instead of {new_bits:08x}"
+    header = headers[retarget_index]
+    invalid_header = _mine(header.hash, header.timestamp + 300, REGTEST_LIMIT)
+    invalid_store_error(headers[: retarget_index + 1] + [invalid_header], err_msg)
+
+    # the last header is replaced
+    last = headers[-1]
+    invalid_header = _mine(last.previous_block_hash, last.timestamp, 0x2100FFFF)
+    err_msg = "invalid bits at height 4040: "
+    invalid_store_error(headers[:-1] + [invalid_header], err_msg)
+    # negative target: the sign bit is set, as in 0x20ffffff
+    invalid_header = BlockHeader(
+        1, last.previous_block_hash, b"\x01" * 32, last.timestamp, "20ffffff", 1, False
+    )
+    invalid_store_error(headers[:-1] + [invalid_header], f"{err_msg}20ffffff$")
+    invalid_header = _mine(last.previous_block_hash, last.timestamp, new_bits)
+    target = target_from_bits(new_bits)
+    while int.from_bytes(invalid_header.hash, byteorder="big") < target:
+        invalid_header.nonce += 1
+    err_msg = "invalid proof-of-work at height 4040"
+    invalid_store_error(headers[:-1] + [invalid_header], err_msg)
+    # median time past of the previous 11 blocks, i.e. the one at height 4034
+    invalid_header = _mine(last.previous_block_hash, headers[-7].timestamp, new_bits)
+    err_msg = "invalid timestamp at height 4040: "
+    invalid_store_error(headers[:-1] + [invalid_header], err_msg)
+    valid_header = _mine(last.previous_block_hash, headers[-6].timestamp, new_bits)
+    write_header_file(filename, headers[:-1] + [valid_header])
+    with HeaderStore(filename, "regtest", first_height) as store:
+        store.assert_valid()
+
+
+def test_invalid_header_file(tmp_path: Path) -> None:
+    filename = str(tmp_path / "headers")
+    write_header_file(filename, [])
+    with HeaderStore(filename) as store:
+        assert len(store) == 0
+        store.assert_valid()
+        assert store.chainwork() == []
+
+    with pytest.raises(BTClibValueError, match="invalid header size: "):
+        write_header_file(filename, [GENESIS.serialize()[:-1]])
+    with open(filename, "wb") as file_:
+        file_.write(GENESIS.serialize()[:-1])
+    with pytest.raises(BTClibValueError, match="invalid header file size: "):
+        HeaderStore(filename)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.miner` module."
+
+from os import path
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.network import NETWORKS
+from btclib.script.witness import Witness
+from btclib.tx.block_header import BlockHeader
+from btclib.tx.blocks import Block
+from btclib.tx.miner import mine_block
+from btclib.tx.out_point import OutPoint
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+
+
+def _block_template(bits: str, n_transactions: int = 1) -> Block:
+    "Return an unmined regtest block at height 1."
+
+    coinbase_in = TxIn(OutPoint(), b"\x01\x01", 0xFFFFFFFF, Witness())
+    coinbase_out = TxOut(50 * 100_000_000, b"\x51")
+    transactions = [Tx(1, 0, [coinbase_in], [coinbase_out])]
+
+    filename = path.join(path.dirname(__file__), "_data", "block_200000.bin")
+    with open(filename, "rb") as file_:
+        transactions += Block.parse(file_.read()).transactions[1:n_transactions]
+
+    prev_hash = NETWORKS["regtest"].genesis_block
+    header = BlockHeader(1, prev_hash, b"\x00" * 32, 1296688603, bits, 0, False)
+    return Block(header, transactions, check_validity=False)
+
+
+def test_mine_block() -> None:
+    block = _block_template("207fffff", 5)
+    stats = mine_block(block)
+    block.assert_valid()
+    assert 0 < stats.hashes
+    assert stats.hash_rate > 0
+    assert block.transactions[0].vin[0].script_sig == b"\x01\x01" + b"\x00" * 4
+
+    # frozen blocks are unfrozen
+    block = Block.parse(block.serialize(), frozen=True)
+    mine_block(block, extranonce_size=1)
+    assert not block.is_frozen
+    block.assert_valid()
+
+    with pytest.raises(BTClibValueError, match="first transaction is not a coinbase"):
+        mine_block(Block(block.header, block.transactions[1:], False))
+
+
+def test_extranonce() -> None:
+    # about 65536 hashes
+    block = _block_template("1f00ffff", 3)
+    sequential_block = _block_template("1f00ffff", 3)
+    stats = mine_block(sequential_block, max_nonce=50_000, batch_size=10_000)
+    sequential_block.assert_valid()
+
+    # same result with a process pool
+    parallel_stats = mine_block(
+        block, max_nonce=50_000, batch_size=10_000, max_workers=2
+    )
+    assert block == sequential_block
+    assert parallel_stats.hashes >= stats.hashes
+
+    # nonce and extranonce roll
+    extranonce = block.transactions[0].vin[0].script_sig[-4:]
+    assert extranonce != b"\x00" * 4
+    extranonce_int = int.from_bytes(extranonce, byteorder="little")
+    assert extranonce_int * 50_000 + block.header.nonce == stats.hashes
+
+    block = _block_template("03000001")
+    err_msg = "nonce and extranonce space exhausted"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        mine_block(block, extranonce_size=1, max_nonce=10)
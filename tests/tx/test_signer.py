@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.signer` module."
+
+from typing import List, Optional
+
+import pytest
+
+from btclib.ecc import dsa, ssa
+from btclib.exceptions import BTClibValueError
+from btclib.hashes import hash160
+from btclib.script import sig_hash
+from btclib.script.script import parse, serialize
+from btclib.script.script_pub_key import ScriptPubKey
+from btclib.script.taproot import output_pubkey
+from btclib.to_prv_key import PrvKey
+from btclib.to_pub_key import pub_keyinfo_from_key
+from btclib.tx.out_point import OutPoint
+from btclib.tx.signer import sign_tx
+from btclib.tx.tx import Tx
+from btclib.tx.tx_in import TxIn
+from btclib.tx.tx_out import TxOut
+
+PRV_KEYS = [
+    "KwDiBf89QgGbjEhKnhXJuH7LrciVrZi3qYjgd9M7rFU73sVHnoWn",
+    "5HpHagT65TZzG1PH3CSu63k8DbpvD8s5ip4nEB3kF1Aqsafvmsg",
+    "L1Knwj9W3qK3qMKdTvmg3VfzUs3ij2LETTFhxza9LfD5dngnoLG1",
+]
+
+
+def _p2sh_p2wpkh(prv_key: PrvKey) -> ScriptPubKey:
+    pub_key = pub_keyinfo_from_key(prv_key, compressed=True)[0]
+    return ScriptPubKey.p2sh(serialize(["OP_0", hash160(pub_key)]))
+
+
+def _unsigned_tx(n: int) -> Tx:
+    prev_outs = [OutPoint((i + 1).to_bytes(32, "big"), i) for i in range(n)]
+    vin = [TxIn(prev_out, "", 0xFFFFFFFD) for prev_out in prev_outs]
+    # as many outputs as inputs, for SIGHASH_SINGLE
+    vout = [TxOut(1000, ScriptPubKey.p2wpkh(PRV_KEYS[0])) for _ in range(n)]
+    return Tx(2, 0, vin, vout)
+
+
+SCRIPT_PUB_KEYS = [
+    ScriptPubKey.p2pkh(PRV_KEYS[0]),
+    # uncompressed key
+    ScriptPubKey.p2pkh(PRV_KEYS[1]),
+    ScriptPubKey.p2wpkh(PRV_KEYS[2]),
+    _p2sh_p2wpkh(PRV_KEYS[0]),
+    ScriptPubKey.p2tr(PRV_KEYS[2]),
+]
+KEYS = dict(zip((s.script for s in SCRIPT_PUB_KEYS), [0, 1, 2, 0, 2]))
+
+
+def _prevouts(n: int = 5) -> List[TxOut]:
+    return [TxOut(1100 + i, SCRIPT_PUB_KEYS[i % 5]) for i in range(n)]
+
+
+def _key_provider(_: int, prevout: TxOut) -> Optional[PrvKey]:
+    key_index = KEYS.get(prevout.script_pub_key.script)
+    return None if key_index is None else PRV_KEYS[key_index]
+
+
+def _assert_signed(tx: Tx, prevouts: List[TxOut], i: int) -> None:
+    tx_in = tx.vin[i]
+    script_type = prevouts[i].script_pub_key.type
+    if script_type == "p2tr":
+        sig = tx_in.script_witness.stack[0]
+        hash_type = sig[64] if len(sig) == 65 else sig_hash.DEFAULT
+        msg_hash = sig_hash.from_tx(prevouts, tx, i, hash_type)
+        pub_key = output_pubkey(_key_provider(i, prevouts[i]))[0]
+        assert ssa.verify_(msg_hash, pub_key, sig[:64])
+        return
+    if script_type == "p2pkh":
+        sig, pub_key = [bytes.fromhex(str(push)) for push in parse(tx_in.script_sig)]
+        assert not tx_in.script_witness.stack
+        msg_hash = sig_hash.from_tx(prevouts, tx, i, sig[-1])
+    else:
+        sig, pub_key = tx_in.script_witness.stack
+        script_code = ScriptPubKey.p2pkh(pub_key).script
+        amount = prevouts[i].value
+        msg_hash = sig_hash.segwit_v0(script_code, tx, i, sig[-1], amount)
+        if script_type == "p2sh":
+            redeem_script = serialize(["OP_0", hash160(pub_key)])
+            assert tx_in.script_sig == serialize([redeem_script])
+        else:
+            assert tx_in.script_sig == b""
+    assert dsa.verify_(msg_hash, pub_key, sig[:-1])
+
+
+def _taproot_key_provider(i: int, prevout: TxOut) -> Optional[PrvKey]:
+    return _key_provider(i, prevout) if i % 5 == 4 else None
+
+
+def test_sign_tx() -> None:
+    prevouts = _prevouts()
+    # not signed
+    prevouts.append(TxOut(1000, ScriptPubKey.p2wpkh(1)))
+    tx = _unsigned_tx(len(prevouts))
+    assert sign_tx(tx, prevouts, _key_provider) == [0, 1, 2, 3, 4]
+    for i in range(5):
+        _assert_signed(tx, prevouts, i)
+    assert tx.vin[1].script_sig[-65] == 0x04
+    assert len(tx.vin[4].script_witness.stack[0]) == 64
+    assert tx.vin[5].script_sig == b""
+    assert not tx.vin[5].script_witness.stack
+    assert tx.is_segwit()
+
+    # frozen transactions are unfrozen
+    frozen_tx = Tx.parse(_unsigned_tx(len(prevouts)).serialize(True), frozen=True)
+    sign_tx(frozen_tx, prevouts, _key_provider)
+    assert not frozen_tx.is_frozen
+    assert frozen_tx.hash == Tx.parse(frozen_tx.serialize(True)).hash
+
+    # deterministic (RFC6979) ECDSA signatures
+    tx2 = _unsigned_tx(len(prevouts))
+    sign_tx(tx2, prevouts, _key_provider, max_workers=1)
+    assert tx2.vin[:4] == tx.vin[:4]
+
+    hash_types = (sig_hash.ALL | sig_hash.ANYONECANPAY, sig_hash.SINGLE, sig_hash.NONE)
+    for hash_type in hash_types:
+        tx = _unsigned_tx(len(prevouts))
+        sign_tx(tx, prevouts, _key_provider, hash_type)
+        for i in range(5):
+            _assert_signed(tx, prevouts, i)
+        assert tx.vin[4].script_witness.stack[0][-1] == hash_type
+
+    # explicit SIGHASH_DEFAULT, taproot input only
+    tx = _unsigned_tx(len(prevouts))
+    assert sign_tx(tx, prevouts, _taproot_key_provider, sig_hash.DEFAULT) == [4]
+    _assert_signed(tx, prevouts, 4)
+    assert len(tx.vin[4].script_witness.stack[0]) == 64
+
+
+def test_parallel_sign_tx() -> None:
+    prevouts = _prevouts(20)
+    tx = _unsigned_tx(len(prevouts))
+    tx2 = _unsigned_tx(len(prevouts))
+    sign_tx(tx, prevouts, _key_provider, max_workers=2)
+    sign_tx(tx2, prevouts, _key_provider, max_workers=1)
+    for i in range(len(prevouts)):
+        _assert_signed(tx, prevouts, i)
+        # BIP340 signatures use random auxiliary data
+        if i % 5 != 4:
+            assert tx.vin[i] == tx2.vin[i]
+
+
+def test_invalid_sign_tx() -> None:
+    prevouts = _prevouts()
+    tx = _unsigned_tx(len(prevouts))
+
+    err_msg = "invalid number of prevouts: "
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sign_tx(tx, prevouts[:-1], _key_provider)
+
+    with pytest.raises(BTClibValueError, match="invalid sig_hash type: "):
+        sign_tx(tx, prevouts, _key_provider, 0x04)
+
+    err_msg = "invalid hash type for ECDSA input 0: SIGHASH_DEFAULT"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sign_tx(tx, prevouts, _key_provider, sig_hash.DEFAULT)
+
+    for i in range(5):
+
+        def wrong_key_provider(j: int, prevout: TxOut) -> Optional[PrvKey]:
+            wrong_key = PRV_KEYS[0 if j in (1, 2, 4) else 1]
+            return wrong_key if j == i else _key_provider(j, prevout)
+
+        with pytest.raises(BTClibValueError, match=f"key mismatch for input {i}"):
+            sign_tx(tx, prevouts, wrong_key_provider)
+
+    prevouts[0] = TxOut(1000, ScriptPubKey.p2wsh(serialize(["OP_1"])))
+    err_msg = "unsupported script type for input 0: p2wsh"
+    with pytest.raises(BTClibValueError, match=err_msg):
+        sign_tx(tx, prevouts, lambda *_: PRV_KEYS[0])
+    # the transaction has not been modified
+    assert tx == _unsigned_tx(len(prevouts))
@@ -315,6 +315,44 @@ def test_double_witness() -> None:
     assert not tx.is_coinbase()
 
 
+def test_frozen_tx() -> None:
+    tx_bytes = "01000000000102322d4f05c3a4f78e97deda01bd8fc5ff96777b62c8f2daa72b02b70fa1e3e1051600000017160014e123a5263695be634abf3ad3456b4bf15f09cc6afffffffffdfee6e881f12d80cbcd6dc54c3fe390670678ebd26c3ae2dd129f41882e3efc25000000171600145946c8c3def6c79859f01b34ad537e7053cf8e73ffffffff02c763ac050000000017a9145ffd6df9bd06dedb43e7b72675388cbfc883d2098727eb180a000000001976a9145f9e96f739198f65d249ea2a0336e9aa5aa0c7ed88ac024830450221009b364c1074c602b2c5a411f4034573a486847da9c9c2467596efba8db338d33402204ccf4ac0eb7793f93a1b96b599e011fe83b3e91afdc4c7ab82d765ce1da25ace01210334d50996c36638265ad8e3cd127506994100dd7f24a5828155d531ebaf736e160247304402200c6dd55e636a2e4d7e684bf429b7800a091986479d834a8d462fbda28cf6f8010220669d1f6d963079516172f5061f923ef90099136647b38cc4b3be2a80b820bdf90121030aa2a1c2344bc8f38b7a726134501a2a45db28df8b4bee2df4428544c62d731400000000"
+    tx = Tx.parse(tx_bytes)
+    assert not tx.is_frozen
+    frozen_tx = Tx.parse(tx_bytes, frozen=True)
+    assert frozen_tx.is_frozen
+    assert frozen_tx == tx
+    properties = ("id", "hash", "size", "vsize", "weight")
+    for tx_ in (frozen_tx, Tx.parse(tx_bytes).freeze()):
+        assert [getattr(tx_, p) for p in properties] == [
+            getattr(tx, p) for p in properties
+        ]
+
+    # assignments drop the cached values
+    frozen_tx.lock_time = 1
+    assert not frozen_tx.is_frozen
+    assert frozen_tx.id != tx.id
+    # in place changes require unfreezing
+    frozen_tx.freeze()
+    tx_id = frozen_tx.id
+    frozen_tx.vout[0].value += 1
+    assert frozen_tx.id == tx_id
+    frozen_tx.unfreeze()
+    assert frozen_tx.id != tx_id
+
+    # non-segwit transaction
+    tx = Tx.parse(tx.serialize(include_witness=False), frozen=True)
+    assert tx.is_frozen
+    assert tx.id == tx.hash
+    assert tx.weight == tx.size * 4
+    # segwit marker without witnesses
+    tx_bytes = tx.serialize(include_witness=False)
+    tx_bytes = tx_bytes[:4] + b"\x00\x01" + tx_bytes[4:-4] + b"\x00\x00" + tx_bytes[-4:]
+    frozen_tx = Tx.parse(tx_bytes, frozen=True)
+    assert frozen_tx.is_frozen
+    assert frozen_tx.id == frozen_tx.hash == tx.id
+
+
 def test_dataclasses_json_dict() -> None:
     fname = "d4f3c2c3c218be868c77ae31bedb497e2f908d6ee5bbbe91e4933e6da680c970.bin"
     filename = path.join(path.dirname(__file__), "_data", fname)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2022 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"Tests for the `btclib.tx.tx_view` module."
+
+from os import path
+
+import pytest
+
+from btclib.exceptions import BTClibValueError
+from btclib.tx.blocks import Block
+from btclib.tx.tx_view import TxView, block_tx_views
+
+
+@pytest.mark.parametrize("fname", ["block_170.bin", "block_481824_complete.bin"])
+def test_block_tx_views(fname: str) -> None:
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as binary_file_:
+        data = binary_file_.read()
+    block = Block.parse(data)
+
+    tx_views = list(block_tx_views(data))
+    assert len(tx_views) == len(block.transactions)
+    for tx_view, tx in zip(tx_views, block.transactions):
+        assert tx_view.id == tx.id
+        assert tx_view.hash == tx.hash
+        assert tx_view.size == tx.size
+        assert tx_view.weight == tx.weight
+        assert tx_view.vsize == tx.vsize
+        assert tx_view.version == tx.version
+        assert tx_view.lock_time == tx.lock_time
+        assert tx_view.is_segwit() == tx.is_segwit()
+        assert tx_view.is_coinbase() == tx.is_coinbase()
+
+        for tx_in_view, tx_in in zip(tx_view.vin, tx.vin):
+            assert tx_in_view.prev_tx_id == tx_in.prev_out.tx_id
+            assert tx_in_view.prev_vout == tx_in.prev_out.vout
+            assert tx_in_view.script_sig == tx_in.script_sig
+            assert tx_in_view.sequence == tx_in.sequence
+            assert tx_in_view.witness == tx_in.script_witness.stack
+            assert tx_in_view.to_tx_in(check_validity=False) == tx_in
+        for tx_out_view, tx_out in zip(tx_view.vout, tx.vout):
+            assert tx_out_view.value == tx_out.value
+            assert tx_out_view.script_pub_key == tx_out.script_pub_key.script
+            assert tx_out_view.to_tx_out() == tx_out
+
+        assert tx_view.to_tx(check_validity=False) == tx
+    assert any(tx_view.is_segwit() for tx_view in tx_views) == block.has_segwit_tx()
+
+
+def test_tx_view() -> None:
+    fname = "block_481824_complete.bin"
+    filename = path.join(path.dirname(__file__), "_data", fname)
+    with open(filename, "rb") as binary_file_:
+        data = binary_file_.read()
+    block = Block.parse(data)
+    tx = block.transactions[12]
+    assert tx.is_segwit()
+
+    tx_bytes = tx.serialize(include_witness=True)
+    tx_view = TxView(tx_bytes)
+    assert tx_view.offset == 0
+    assert tx_view.end == len(tx_bytes)
+    assert tx_view.id == tx.id != tx_view.hash
+    assert tx_view.to_tx() == tx
+
+    # views of a larger buffer
+    tx_view = TxView(b"\x00" * 7 + tx_bytes + b"\x00" * 5, 7)
+    assert tx_view.end == 7 + len(tx_bytes)
+    assert tx_view.id == tx.id
+
+    with pytest.raises(BTClibValueError, match="not enough data at offset "):
+        TxView(tx_bytes[:-1])
+    with pytest.raises(BTClibValueError, match="not enough data at offset "):
+        TxView(tx_bytes[:10])